@@ -10,6 +10,8 @@ from typing import Dict, Tuple, List, Optional, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from image_features import ImageFeatures, block_moments
+
 # Try to import OpenCV
 try:
     import cv2
@@ -56,7 +58,7 @@ class SceneConsistencyResult:
     details: Dict[str, Any]
 
 
-def analyze_color_banding(image: Image.Image) -> Tuple[float, Dict]:
+def analyze_color_banding(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Detect color banding which is common in AI-generated images.
     AI images often have subtle gradient banding in smooth areas.
@@ -67,13 +69,13 @@ def analyze_color_banding(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available'}
     
-    img_array = np.array(image.convert('RGB'))
+    features = features or ImageFeatures(image)
     
     # Convert to grayscale
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    gray = features.gray
     
     # Apply edge detection to find gradient boundaries
-    edges = cv2.Canny(gray, 10, 30)
+    edges = features.canny(10, 30)
     
     # Calculate edge density in smooth areas
     # Smooth areas have low variance
@@ -103,7 +105,7 @@ def analyze_color_banding(image: Image.Image) -> Tuple[float, Dict]:
     return banding_score, details
 
 
-def analyze_texture_uniformity(image: Image.Image) -> Tuple[float, Dict]:
+def analyze_texture_uniformity(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Analyze texture uniformity - AI images often have too uniform/too perfect textures.
     
@@ -113,11 +115,10 @@ def analyze_texture_uniformity(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available'}
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    features = features or ImageFeatures(image)
     
     # Calculate local texture variance using Laplacian
-    laplacian = cv2.Laplacian(gray, cv2.CV_64F)
+    laplacian = features.laplacian
     texture_var = np.var(laplacian)
     texture_mean = np.mean(np.abs(laplacian))
     
@@ -139,7 +140,7 @@ def analyze_texture_uniformity(image: Image.Image) -> Tuple[float, Dict]:
     return uniformity_score, details
 
 
-def detect_dalle_signature(image: Image.Image) -> Tuple[float, Dict]:
+def detect_dalle_signature(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Detect DALL-E specific signatures:
     - Characteristic color palette
@@ -156,11 +157,11 @@ def detect_dalle_signature(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available', 'signatures': []}
     
-    img_array = np.array(image.convert('RGB'))
+    features = features or ImageFeatures(image)
     
     # 1. Check for DALL-E color characteristics
     # DALL-E tends to have saturated, vibrant colors with specific distributions
-    hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+    hsv = features.hsv
     saturation = hsv[:, :, 1]
     value = hsv[:, :, 2]
     
@@ -173,10 +174,8 @@ def detect_dalle_signature(image: Image.Image) -> Tuple[float, Dict]:
         total_score += 0.15
     
     # 2. Check for gradient smoothness typical in DALL-E
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-    sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-    gradient_mag = np.sqrt(sobel_x**2 + sobel_y**2)
+    gray = features.gray
+    gradient_mag = features.gradient_magnitude()
     
     # DALL-E has smooth gradients with sharp edges
     gradient_std = np.std(gradient_mag)
@@ -196,9 +195,7 @@ def detect_dalle_signature(image: Image.Image) -> Tuple[float, Dict]:
         total_score += 0.15
     
     # 4. FFT analysis for periodic patterns
-    f_transform = np.fft.fft2(gray)
-    f_shift = np.fft.fftshift(f_transform)
-    magnitude = np.log(np.abs(f_shift) + 1)
+    magnitude = np.log(features.fft_magnitude + 1)
     
     # Check for unusual frequency patterns
     center = magnitude[magnitude.shape[0]//4:-magnitude.shape[0]//4, 
@@ -223,7 +220,7 @@ def detect_dalle_signature(image: Image.Image) -> Tuple[float, Dict]:
     return min(total_score, 1.0), details
 
 
-def detect_midjourney_signature(image: Image.Image) -> Tuple[float, Dict]:
+def detect_midjourney_signature(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Detect Midjourney specific signatures:
     - Painterly/artistic style
@@ -240,10 +237,10 @@ def detect_midjourney_signature(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available', 'signatures': []}
     
-    img_array = np.array(image.convert('RGB'))
+    features = features or ImageFeatures(image)
     
     # 1. Check for Midjourney's characteristic high contrast lighting
-    lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
+    lab = features.lab
     l_channel = lab[:, :, 0]
     
     l_std = np.std(l_channel)
@@ -255,7 +252,7 @@ def detect_midjourney_signature(image: Image.Image) -> Tuple[float, Dict]:
         total_score += 0.15
     
     # 2. Check for painterly texture (artistic brush strokes)
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    gray = features.gray
     
     # Detect directional textures using oriented filters
     kernel_size = 7
@@ -274,7 +271,7 @@ def detect_midjourney_signature(image: Image.Image) -> Tuple[float, Dict]:
     
     # 3. Check for characteristic color grading
     # Midjourney often has specific color tones (warm highlights, cool shadows)
-    hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+    hsv = features.hsv
     h_channel = hsv[:, :, 0]
     
     # Check hue distribution
@@ -318,7 +315,7 @@ def detect_midjourney_signature(image: Image.Image) -> Tuple[float, Dict]:
     return min(total_score, 1.0), details
 
 
-def detect_stable_diffusion_signature(image: Image.Image) -> Tuple[float, Dict]:
+def detect_stable_diffusion_signature(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Detect Stable Diffusion specific signatures:
     - Denoising artifacts (characteristic noise patterns)
@@ -335,8 +332,8 @@ def detect_stable_diffusion_signature(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available', 'signatures': []}
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    features = features or ImageFeatures(image)
+    gray = features.gray
     
     # 1. Check for SD's characteristic noise pattern (from denoising process)
     # Extract high-frequency noise
@@ -353,7 +350,7 @@ def detect_stable_diffusion_signature(image: Image.Image) -> Tuple[float, Dict]:
         total_score += 0.2
     
     # 2. Check for artifact at edges (SD's latent space upscaling artifacts)
-    edges = cv2.Canny(gray, 50, 150)
+    edges = features.canny(50, 150)
     
     # Dilate edges to get edge regions
     kernel = np.ones((5, 5), np.uint8)
@@ -371,9 +368,8 @@ def detect_stable_diffusion_signature(image: Image.Image) -> Tuple[float, Dict]:
             total_score += 0.15
     
     # 3. Check for repetitive patterns (SD's tiling artifacts)
-    # Use autocorrelation
-    f_transform = np.fft.fft2(gray)
-    power_spectrum = np.abs(f_transform) ** 2
+    # Use autocorrelation (of the unshifted spectrum)
+    power_spectrum = np.fft.ifftshift(features.fft_magnitude) ** 2
     autocorr = np.fft.ifft2(power_spectrum).real
     autocorr = np.fft.fftshift(autocorr)
     
@@ -394,7 +390,7 @@ def detect_stable_diffusion_signature(image: Image.Image) -> Tuple[float, Dict]:
     
     # 4. Check for color quantization in skin tones (common in SD)
     # Convert to LAB for skin detection
-    lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
+    lab = features.lab
     
     # Simple skin mask (LAB values typical for skin)
     skin_mask = ((lab[:, :, 1] > 125) & (lab[:, :, 1] < 145) & 
@@ -419,27 +415,29 @@ def detect_stable_diffusion_signature(image: Image.Image) -> Tuple[float, Dict]:
     return min(total_score, 1.0), details
 
 
-def detect_ai_art_signature(image: Image.Image) -> AIArtSignature:
+def detect_ai_art_signature(image: Image.Image, features: Optional[ImageFeatures] = None) -> AIArtSignature:
     """
     Comprehensive AI art detection analyzing multiple generator signatures.
     
     Args:
         image: PIL Image to analyze
+        features: Shared feature planes of `image` (created if not given)
     
     Returns:
         AIArtSignature with detected generator and confidence
     """
     all_signatures = []
     analysis_details = {}
+    features = features or ImageFeatures(image)
     
     # Run all detections
-    dalle_score, dalle_details = detect_dalle_signature(image)
-    midjourney_score, mj_details = detect_midjourney_signature(image)
-    sd_score, sd_details = detect_stable_diffusion_signature(image)
+    dalle_score, dalle_details = detect_dalle_signature(image, features)
+    midjourney_score, mj_details = detect_midjourney_signature(image, features)
+    sd_score, sd_details = detect_stable_diffusion_signature(image, features)
     
     # General AI indicators
-    banding_score, banding_details = analyze_color_banding(image)
-    uniformity_score, uniformity_details = analyze_texture_uniformity(image)
+    banding_score, banding_details = analyze_color_banding(image, features)
+    uniformity_score, uniformity_details = analyze_texture_uniformity(image, features)
     
     analysis_details['dalle'] = dalle_details
     analysis_details['midjourney'] = mj_details
@@ -483,7 +481,7 @@ def detect_ai_art_signature(image: Image.Image) -> AIArtSignature:
     )
 
 
-def analyze_background_artifacts(image: Image.Image) -> BackgroundAnalysis:
+def analyze_background_artifacts(image: Image.Image, features: Optional[ImageFeatures] = None) -> BackgroundAnalysis:
     """
     Analyze background for AI generation artifacts.
     
@@ -508,26 +506,24 @@ def analyze_background_artifacts(image: Image.Image) -> BackgroundAnalysis:
             details={'error': 'OpenCV not available'}
         )
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    features = features or ImageFeatures(image)
+    gray = features.gray
     
     # 1. Detect foreground/background separation
     # Use edge density to find main subject vs background
-    edges = cv2.Canny(gray, 50, 150)
+    edges = features.canny(50, 150)
     
     # Divide image into grid
     grid_size = 8
     h, w = gray.shape
     cell_h, cell_w = h // grid_size, w // grid_size
     
-    edge_densities = []
-    for i in range(grid_size):
-        for j in range(grid_size):
-            cell = edges[i*cell_h:(i+1)*cell_h, j*cell_w:(j+1)*cell_w]
-            density = np.sum(cell > 0) / cell.size
-            edge_densities.append(density)
-    
-    edge_densities = np.array(edge_densities)
+    if cell_h == 0 or cell_w == 0:
+        # Image smaller than the grid: every cell is empty
+        edge_densities = np.full(grid_size * grid_size, np.nan)
+    else:
+        edge_densities, _ = block_moments(edges > 0, cell_h, cell_w)
+        edge_densities = edge_densities[:grid_size, :grid_size].ravel()
     background_threshold = np.percentile(edge_densities, 30)
     
     # 2. Analyze background texture consistency
@@ -545,13 +541,11 @@ def analyze_background_artifacts(image: Image.Image) -> BackgroundAnalysis:
     blur_diff = np.abs(gray.astype(float) - blurred.astype(float))
     
     # Grid analysis of blur patterns
-    blur_variances = []
-    for i in range(grid_size):
-        for j in range(grid_size):
-            cell = blur_diff[i*cell_h:(i+1)*cell_h, j*cell_w:(j+1)*cell_w]
-            blur_variances.append(np.var(cell))
-    
-    blur_variances = np.array(blur_variances)
+    if cell_h == 0 or cell_w == 0:
+        blur_variances = np.full(grid_size * grid_size, np.nan)
+    else:
+        _, blur_variances = block_moments(blur_diff, cell_h, cell_w)
+        blur_variances = blur_variances[:grid_size, :grid_size].ravel()
     blur_inconsistency = np.std(blur_variances) / (np.mean(blur_variances) + 0.001)
     
     if blur_inconsistency > 2.0:
@@ -559,8 +553,7 @@ def analyze_background_artifacts(image: Image.Image) -> BackgroundAnalysis:
         total_score += 0.15
     
     # 4. Check for repeating patterns (common in AI backgrounds)
-    f_transform = np.fft.fft2(gray)
-    magnitude = np.abs(np.fft.fftshift(f_transform))
+    magnitude = features.fft_magnitude
     
     # Look for unusual periodic peaks
     log_mag = np.log(magnitude + 1)
@@ -595,7 +588,7 @@ def analyze_background_artifacts(image: Image.Image) -> BackgroundAnalysis:
     )
 
 
-def analyze_scene_consistency(image: Image.Image) -> SceneConsistencyResult:
+def analyze_scene_consistency(image: Image.Image, features: Optional[ImageFeatures] = None) -> SceneConsistencyResult:
     """
     Analyze scene for physical consistency.
     
@@ -620,10 +613,8 @@ def analyze_scene_consistency(image: Image.Image) -> SceneConsistencyResult:
             details={'error': 'OpenCV not available'}
         )
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
-    l_channel = lab[:, :, 0]
+    features = features or ImageFeatures(image)
+    l_channel = features.lab[:, :, 0]
     
     # 1. Lighting direction analysis
     # Calculate gradient to estimate light source direction
@@ -676,7 +667,7 @@ def analyze_scene_consistency(image: Image.Image) -> SceneConsistencyResult:
         details['shadow_sharpness'] = round(float(shadow_sharpness), 2)
     
     # 3. Perspective analysis using line detection
-    edges = cv2.Canny(gray, 50, 150)
+    edges = features.canny(50, 150)
     lines = cv2.HoughLinesP(edges, 1, np.pi/180, 50, minLineLength=50, maxLineGap=10)
     
     if lines is not None and len(lines) > 5:
@@ -713,21 +704,23 @@ def analyze_scene_consistency(image: Image.Image) -> SceneConsistencyResult:
     )
 
 
-def comprehensive_no_face_analysis(image: Image.Image) -> Dict[str, Any]:
+def comprehensive_no_face_analysis(image: Image.Image, features: Optional[ImageFeatures] = None) -> Dict[str, Any]:
     """
     Comprehensive analysis for images without faces.
     Combines AI art detection, background analysis, and scene consistency.
     
     Args:
         image: PIL Image to analyze
+        features: Shared feature planes of `image` (created if not given)
     
     Returns:
         Dictionary with all analysis results and overall score
     """
-    # Run all analyses
-    ai_signature = detect_ai_art_signature(image)
-    background = analyze_background_artifacts(image)
-    scene = analyze_scene_consistency(image)
+    # Run all analyses on one set of feature planes
+    features = features or ImageFeatures(image)
+    ai_signature = detect_ai_art_signature(image, features)
+    background = analyze_background_artifacts(image, features)
+    scene = analyze_scene_consistency(image, features)
     
     # Calculate combined suspicion score
     ai_score = ai_signature.confidence if ai_signature.generator != AIGenerator.LIKELY_REAL else 0
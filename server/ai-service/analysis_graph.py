@@ -0,0 +1,144 @@
+"""
+Analyzer Graph for TrueVibe AI Service
+Concurrent execution of the independent forensic analyzers of one image.
+
+Stylization, compression, EXIF, filter, blending and landmark analysis and
+frame generation are independent NumPy/OpenCV work that mostly runs with
+the GIL released. Each is declared as a node together with the nodes whose
+results it consumes, and is submitted to a bounded, process-wide thread
+pool as soon as those have finished. Results are returned by node name, so
+whatever the caller combines from them does not depend on completion order.
+
+OpenCV also parallelizes inside single calls; with more than one analyzer
+thread its thread count is lowered to CPU count / analyzer threads so the
+two levels do not oversubscribe the cores.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Sequence
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Analyzer threads shared by all analyses: 0 = min(4, CPU count), 1 = run nodes in order on the caller
+ANALYZER_THREADS = int(os.environ.get("ANALYZER_THREADS", "0"))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def analyzer_threads() -> int:
+    if ANALYZER_THREADS > 0:
+        return ANALYZER_THREADS
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = analyzer_threads()
+            if cv2 is not None:
+                cv2.setNumThreads(max(1, (os.cpu_count() or 1) // workers))
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyzer")
+            print(f"🧵 Analyzer pool: {workers} threads, OpenCV threads {cv2.getNumThreads() if cv2 else 'n/a'}")
+        return _pool
+
+
+class _Node:
+    __slots__ = ('name', 'fn', 'args', 'kwargs', 'inputs')
+
+    def __init__(self, name: str, fn: Callable[..., Any], args: tuple, kwargs: dict, inputs: tuple):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.inputs = inputs
+
+
+class AnalyzerGraph:
+    """
+    DAG of analyzer calls for one image.
+
+    A node's inputs must be declared before it, so declaration order is a
+    valid sequential order (used when only one analyzer thread is
+    configured). If a node raises, no further nodes are started and the
+    exception is re-raised from run() once the running ones have finished.
+    """
+
+    def __init__(self):
+        self.workers = analyzer_threads()
+        self._nodes: Dict[str, _Node] = {}
+        self.timings: Dict[str, float] = {}
+        self.wall_ms = 0.0
+
+    def add(self, name: str, fn: Callable[..., Any], *args, inputs: Sequence[str] = (), **kwargs) -> None:
+        """Declare node `name`, run as fn(*input_results, *args, **kwargs) once its `inputs` are done."""
+        if name in self._nodes:
+            raise ValueError(f"Duplicate analyzer node: {name}")
+        missing = [i for i in inputs if i not in self._nodes]
+        if missing:
+            raise ValueError(f"Analyzer node {name} depends on undeclared node(s): {', '.join(missing)}")
+        self._nodes[name] = _Node(name, fn, args, kwargs, tuple(inputs))
+
+    def _call(self, node: _Node, results: Dict[str, Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            return node.fn(*(results[i] for i in node.inputs), *node.args, **node.kwargs)
+        finally:
+            self.timings[node.name] = round((time.perf_counter() - start) * 1000, 1)
+
+    def run(self) -> Dict[str, Any]:
+        """Execute every node and return {name: result}."""
+        start = time.perf_counter()
+        results: Dict[str, Any] = {}
+        try:
+            if self.workers <= 1:
+                for node in self._nodes.values():
+                    results[node.name] = self._call(node, results)
+            else:
+                self._run_parallel(results)
+        finally:
+            self.wall_ms = round((time.perf_counter() - start) * 1000, 1)
+            # Report in declaration order, not completion order
+            self.timings = {name: self.timings[name] for name in self._nodes if name in self.timings}
+        return results
+
+    def _run_parallel(self, results: Dict[str, Any]) -> None:
+        pool = _get_pool()
+        pending = dict(self._nodes)
+        running: Dict[Future, str] = {}
+        error: Optional[BaseException] = None
+
+        while pending or running:
+            if error is None:
+                # Submit in declaration order whatever has all its inputs
+                for name, node in list(pending.items()):
+                    if all(i in results for i in node.inputs):
+                        del pending[name]
+                        running[pool.submit(self._call, node, results)] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except BaseException as e:
+                    error = error or e
+
+        if error is not None:
+            raise error
+
+    def summary(self) -> dict:
+        """Workers, wall time and summed node time (their ratio is the overlap achieved)."""
+        return {
+            'workers': self.workers,
+            'wall_ms': self.wall_ms,
+            'busy_ms': round(sum(self.timings.values()), 1),
+        }
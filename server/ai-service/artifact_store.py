@@ -0,0 +1,214 @@
+"""
+Artifact Store Module for TrueVibe AI Service
+Lazily rendered visual artifacts of recent face analyses: the annotated
+image and the heatmap.
+
+An analysis stores only the compact inputs of its artifacts under its
+analysis id (the media content hash): a JPEG copy of the working image,
+downscaled to ARTIFACT_IMAGE_SIZE (about the PDF's 6-inch image at print
+resolution), the face boxes and scores, and the artifact markers, with
+boxes and marker positions scaled to that copy. JPEGs are rendered the
+first time the artifact endpoint or the PDF generator asks for them, then
+cached with those inputs.
+
+Debug-frame thumbnails are not deferred: they are small and are what
+callers persist with the analysis (debug_frames[].image_base64).
+
+Entries are per process, evicted least recently used first once their
+JPEG bytes exceed ARTIFACT_CACHE_MB, and expire after
+ARTIFACT_TTL seconds (the artifact endpoint then answers 404; PDF reports
+leave out the annotated image, as they did before it was stored).
+"""
+
+import io
+import os
+import time
+import base64
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    from visual_annotations import create_full_annotated_image
+    ANNOTATIONS_AVAILABLE = True
+except ImportError:
+    ANNOTATIONS_AVAILABLE = False
+
+# Store configuration
+ARTIFACT_CACHE_MB = int(os.environ.get("ARTIFACT_CACHE_MB", "32"))
+ARTIFACT_TTL = int(os.environ.get("ARTIFACT_TTL", "3600"))  # Seconds, same as the analysis cache
+ARTIFACT_IMAGE_SIZE = int(os.environ.get("ARTIFACT_IMAGE_SIZE", "1280"))  # Longer side of the stored copy
+ARTIFACT_IMAGE_QUALITY = 90
+# false: render the annotated image and heatmap during the analysis and embed them as base64
+LAZY_ARTIFACTS = os.environ.get("LAZY_ARTIFACTS", "true").lower() == "true"
+
+ARTIFACT_NAMES = ('annotated', 'heatmap')
+
+
+def _jpeg(image: Image.Image, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", **options)
+    return buffer.getvalue()
+
+
+class _FaceBox:
+    """Face box in stored-image coordinates (the renderer only reads .bbox)."""
+    __slots__ = ('bbox',)
+
+    def __init__(self, bbox: Tuple[int, int, int, int]):
+        self.bbox = bbox
+
+
+class AnalysisArtifacts:
+    """Inputs of one analysis' annotated image and heatmap, and the JPEGs rendered from them."""
+
+    def __init__(self, analysis_id: str, image: Image.Image, faces: Sequence[Any],
+                 face_scores: Sequence[float], markers: Sequence[Dict] = ()):
+        self.analysis_id = analysis_id
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        scale = min(1.0, ARTIFACT_IMAGE_SIZE / max(image.size))
+        if scale < 1.0:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = Image.fromarray(cv2.resize(np.asarray(image), size, interpolation=cv2.INTER_AREA))
+        self.source = _jpeg(image, quality=ARTIFACT_IMAGE_QUALITY)
+        self.faces = [_FaceBox(tuple(round(v * scale) for v in face.bbox)) for face in faces]
+        self.face_scores = list(face_scores)
+        # Artifact detections drawn as arrows
+        self.markers = [{**marker, 'position': tuple(round(v * scale) for v in marker['position'])}
+                        if 'position' in marker else dict(marker) for marker in markers]
+        self.rendered: Dict[str, bytes] = {}
+        self.stored_at = time.time()
+        self.size = len(self.source)
+        self._lock = Lock()
+
+    def image(self) -> Image.Image:
+        """Decoded copy of the stored image."""
+        return Image.open(io.BytesIO(self.source)).convert('RGB')
+
+    def names(self) -> List[str]:
+        return list(ARTIFACT_NAMES) if ANNOTATIONS_AVAILABLE and self.faces else []
+
+    def render(self, name: str) -> Tuple[Optional[bytes], int]:
+        """JPEG of an artifact (None if unknown) and the bytes it newly added."""
+        # Concurrent requests for the same analysis render each artifact once
+        with self._lock:
+            if name in self.rendered:
+                return self.rendered[name], 0
+            if name not in self.names():
+                return None, 0
+
+            # One pass yields both the annotated image and its heatmap
+            annotated, heatmap = create_full_annotated_image(
+                self.image(),
+                self.faces,
+                self.face_scores,
+                self.markers,
+                include_heatmap=True,
+                include_boxes=True,
+                include_arrows=len(self.markers) > 0
+            )
+            new = {'annotated': _jpeg(annotated.convert('RGB'))}
+            if heatmap:
+                new['heatmap'] = _jpeg(heatmap.convert('RGB'))
+
+            self.rendered.update(new)
+            return self.rendered.get(name), sum(len(data) for data in new.values())
+
+
+class _Entry:
+    __slots__ = ('artifacts', 'size')
+
+    def __init__(self, artifacts: AnalysisArtifacts):
+        self.artifacts = artifacts
+        self.size = artifacts.size  # Grows as artifacts are rendered
+
+
+class ArtifactStore:
+    """Per-process LRU of AnalysisArtifacts bounded by bytes, with a TTL."""
+
+    def __init__(self, max_bytes: int = ARTIFACT_CACHE_MB * 1024 * 1024, ttl_seconds: int = ARTIFACT_TTL):
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._max_bytes = max_bytes
+        self._ttl = ttl_seconds
+        self._lock = Lock()
+        self._stats = {'stored': 0, 'rendered': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def put(self, artifacts: AnalysisArtifacts) -> None:
+        if artifacts.size > self._max_bytes:
+            return  # Larger than the whole budget - not worth keeping
+        with self._lock:
+            if artifacts.analysis_id in self._entries:
+                self._remove(artifacts.analysis_id)
+            self._entries[artifacts.analysis_id] = _Entry(artifacts)
+            self._bytes += artifacts.size
+            self._stats['stored'] += 1
+            self._evict()
+
+    def get(self, analysis_id: str) -> Optional[AnalysisArtifacts]:
+        with self._lock:
+            entry = self._entries.get(analysis_id)
+            if entry is not None and time.time() - entry.artifacts.stored_at >= self._ttl:
+                self._remove(analysis_id)
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(analysis_id)
+            return entry.artifacts
+
+    def render(self, analysis_id: str, name: str) -> Optional[bytes]:
+        """JPEG bytes of a named artifact, rendered on first use; None if unknown or expired."""
+        artifacts = self.get(analysis_id)
+        data, added = None, 0
+        if artifacts is not None:
+            try:
+                data, added = artifacts.render(name)
+            except Exception as e:
+                print(f"⚠️ Artifact rendering error ({name}): {e}")
+        with self._lock:
+            if data is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['rendered' if added else 'hits'] += 1
+            entry = self._entries.get(analysis_id)
+            # Only charge an entry that was not evicted while rendering
+            if added and entry is not None and entry.artifacts is artifacts:
+                entry.size += added
+                self._bytes += added
+                self._evict()
+        return data
+
+    def base64(self, analysis_id: str, name: str) -> Optional[str]:
+        data = self.render(analysis_id, name)
+        return base64.b64encode(data).decode('utf-8') if data is not None else None
+
+    def embed(self, analysis_id: str, details: dict) -> None:
+        """Render the artifacts now and attach them as base64 (LAZY_ARTIFACTS=false)."""
+        for name in ARTIFACT_NAMES:
+            encoded = self.base64(analysis_id, name)
+            if encoded:
+                details[f"{name}_image"] = encoded
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the budget fits (caller holds the lock)."""
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def _remove(self, analysis_id: str) -> None:
+        self._bytes -= self._entries.pop(analysis_id).size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'analyses': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'lazy': LAZY_ARTIFACTS,
+                **self._stats,
+            }
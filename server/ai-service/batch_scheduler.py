@@ -0,0 +1,177 @@
+"""
+Dynamic Micro-Batching Scheduler for TrueVibe AI Service
+Lets concurrent analyses share SigLIP forward passes.
+
+Callers submit preprocessed pixel_values tensors. A single scheduler thread
+collects queued frames into a batch of at most `max_batch_size` rows, waiting
+up to `max_wait_ms` after the first frame arrives for more work to show up,
+runs one forward pass and hands every caller back its own slice of logits.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Thread
+from typing import Callable, List, Optional
+
+import torch
+
+# Scheduler configuration
+MICROBATCH_MAX_SIZE = int(os.environ.get("MICROBATCH_MAX_SIZE", "16"))
+MICROBATCH_MAX_WAIT_MS = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "5"))
+
+
+class _BatchItem:
+    """A slice of one caller's frames waiting for a forward pass."""
+    __slots__ = ('pixel_values', 'future', 'enqueued_at')
+
+    def __init__(self, pixel_values: torch.Tensor):
+        self.pixel_values = pixel_values
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+    @property
+    def rows(self) -> int:
+        return int(self.pixel_values.shape[0])
+
+
+class MicroBatchScheduler:
+    """
+    Collects frames from concurrent requests into bounded batches.
+
+    Args:
+        forward_fn: Maps a (N, C, H, W) pixel_values tensor to (N, num_labels) logits
+        max_batch_size: Maximum frames per forward pass
+        max_wait_ms: How long the first queued frame may wait for the batch to fill
+    """
+
+    def __init__(self, forward_fn: Callable[[torch.Tensor], torch.Tensor],
+                 max_batch_size: int = MICROBATCH_MAX_SIZE,
+                 max_wait_ms: float = MICROBATCH_MAX_WAIT_MS):
+        self.forward_fn = forward_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "deque[_BatchItem]" = deque()
+        self._queued_rows = 0
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+        self._stopped = False
+
+        self._stats = {
+            'batches': 0,
+            'frames': 0,
+            'requests': 0,
+            'total_wait_ms': 0.0,
+            'max_queue_depth': 0,
+            'last_batch_size': 0,
+        }
+
+    # ==================== CALLER API ====================
+
+    def infer(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """Run pixel_values through shared batches and return this caller's logits (blocking)."""
+        items = self.submit(pixel_values)
+        return torch.cat([item.future.result() for item in items], dim=0)
+
+    def submit(self, pixel_values: torch.Tensor) -> List[_BatchItem]:
+        """Queue frames, split into pieces no larger than one batch."""
+        self._ensure_started()
+        items = [_BatchItem(chunk) for chunk in torch.split(pixel_values, self.max_batch_size, dim=0)]
+
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Batch scheduler is shut down")
+            self._queue.extend(items)
+            self._queued_rows += sum(item.rows for item in items)
+            self._stats['requests'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queued_rows)
+            self._cond.notify()
+        return items
+
+    def stats(self) -> dict:
+        """Queue depth and batch fill metrics for /health."""
+        with self._cond:
+            batches = self._stats['batches']
+            frames = self._stats['frames']
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+                'queue_depth': self._queued_rows,
+                'queued_items': len(self._queue),
+                'max_queue_depth': self._stats['max_queue_depth'],
+                'batches': batches,
+                'frames': frames,
+                'requests': self._stats['requests'],
+                'last_batch_size': self._stats['last_batch_size'],
+                'avg_batch_size': round(frames / batches, 2) if batches else 0.0,
+                'avg_batch_fill': round(frames / (batches * self.max_batch_size), 3) if batches else 0.0,
+                'avg_wait_ms': round(self._stats['total_wait_ms'] / batches, 2) if batches else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    # ==================== SCHEDULER THREAD ====================
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="microbatch-scheduler", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[_BatchItem]:
+        """Block until a batch is ready: full, or the oldest frame waited max_wait."""
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if self._stopped and not self._queue:
+                return []
+
+            deadline = self._queue[0].enqueued_at + self.max_wait
+            while self._queued_rows < self.max_batch_size and not self._stopped:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch, rows = [], 0
+            while self._queue and rows + self._queue[0].rows <= self.max_batch_size:
+                item = self._queue.popleft()
+                batch.append(item)
+                rows += item.rows
+            self._queued_rows -= rows
+
+            now = time.perf_counter()
+            self._stats['batches'] += 1
+            self._stats['frames'] += rows
+            self._stats['last_batch_size'] = rows
+            self._stats['total_wait_ms'] += (now - batch[0].enqueued_at) * 1000
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            try:
+                if len(batch) == 1:
+                    pixel_values = batch[0].pixel_values
+                else:
+                    pixel_values = torch.cat([item.pixel_values for item in batch], dim=0)
+                logits = self.forward_fn(pixel_values)
+            except Exception as e:
+                for item in batch:
+                    item.future.set_exception(e)
+                continue
+
+            offset = 0
+            for item in batch:
+                item.future.set_result(logits[offset:offset + item.rows])
+                offset += item.rows
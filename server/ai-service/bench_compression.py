@@ -0,0 +1,128 @@
+"""
+Benchmark: vectorized JPEG block-boundary scan vs. the original per-block loop.
+
+Usage:
+    python bench_compression.py                          # synthetic JPEGs, 384-2560 px
+    python bench_compression.py photo.jpg --repeats 10   # plus your own images
+
+Runs DeepfakeDetector.analyze_compression_artifacts and the original 8x8
+double loop (kept here as the reference) on each image. Parity requires the
+same suspicion score and identical compression_score, block_artifacts,
+blocks_analyzed and double_compression_detected; the synthetic set includes
+sizes that are not multiples of 8 and images too small to hold a block.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from model import get_detector
+
+
+def legacy_compression_artifacts(image: Image.Image):
+    """Original analyze_compression_artifacts block loop (reference implementation)."""
+    img_array = np.array(image.convert('L'))
+    h, w = img_array.shape
+    block_size = 8
+
+    horizontal_discontinuity = 0
+    vertical_discontinuity = 0
+    block_count = 0
+
+    for y in range(block_size, h - block_size, block_size):
+        for x in range(block_size, w - block_size, block_size):
+            left_block = img_array[y-block_size:y, x-block_size:x].astype(float)
+            right_block = img_array[y-block_size:y, x:x+block_size].astype(float)
+            if left_block.size > 0 and right_block.size > 0:
+                horizontal_discontinuity += np.abs(left_block[:, -1].mean() - right_block[:, 0].mean())
+
+            top_block = img_array[y-block_size:y, x:x+block_size].astype(float)
+            bottom_block = img_array[y:y+block_size, x:x+block_size].astype(float)
+            if top_block.size > 0 and bottom_block.size > 0:
+                vertical_discontinuity += np.abs(top_block[-1, :].mean() - bottom_block[0, :].mean())
+
+            block_count += 1
+
+    if block_count > 0:
+        artifact_score = (horizontal_discontinuity / block_count + vertical_discontinuity / block_count) / 2
+        normalized_score = min(artifact_score / 25.0, 1.0)
+        double_compression = artifact_score > 8 and artifact_score < 20
+    else:
+        normalized_score = 0
+        double_compression = False
+
+    return normalized_score, {
+        'compression_score': round(float(normalized_score), 3),
+        'double_compression_detected': bool(double_compression),
+        'block_artifacts': round(float(artifact_score), 2) if block_count > 0 else 0,
+        'blocks_analyzed': int(block_count)
+    }
+
+
+def synthetic_jpeg(width: int, height: int, quality: int, seed: int) -> Image.Image:
+    """Smooth gradient plus noise, JPEG round-tripped so the 8x8 grid carries artifacts."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    base = np.stack([xx / max(width, 1) * 200, yy / max(height, 1) * 180 + 30, np.full(xx.shape, 120.0)], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=quality)
+    return Image.open(io.BytesIO(buffer.getvalue())).convert("RGB")
+
+
+def build_cases(paths):
+    cases = [(f"{w}x{h} q{q}", synthetic_jpeg(w, h, q, seed))
+             for seed, (w, h, q) in enumerate([
+                 (15, 15, 90), (17, 24, 90), (101, 77, 60),
+                 (384, 384, 75), (1080, 1350, 85), (2560, 1440, 92),
+             ])]
+    cases += [(os.path.basename(p), Image.open(p).convert("RGB")) for p in paths]
+    return cases
+
+
+def best_time(fn, image, repeats: int):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(image)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(paths, repeats: int) -> bool:
+    detector = get_detector()
+    print(f"{'image':24s} | {'blocks':>7} | {'loop':>10} | {'vectorized':>10} | {'speedup':>7} | parity")
+    print("─" * 76)
+
+    all_ok = True
+    for name, image in build_cases(paths):
+        legacy_time, (legacy_score, legacy_details) = best_time(legacy_compression_artifacts, image, max(1, repeats // 5))
+        vector_time, (score, details) = best_time(detector.analyze_compression_artifacts, image, repeats)
+        ok = score == legacy_score and details == legacy_details
+        all_ok = all_ok and ok
+        print(f"{name[:24]:24s} | {details.get('blocks_analyzed', 0):7d} | {legacy_time*1000:8.1f}ms | "
+              f"{vector_time*1000:8.2f}ms | {legacy_time/vector_time:6.0f}x | {'✅' if ok else '❌'}")
+        if not ok:
+            print(f"   loop:       {legacy_score!r} {legacy_details}")
+            print(f"   vectorized: {score!r} {details}")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="additional images to check")
+    parser.add_argument("--repeats", type=int, default=5, help="timed runs of the vectorized scan (best of)")
+    args = parser.parse_args()
+
+    print("🚀 Compression block-boundary scan benchmark")
+    ok = run(args.images, args.repeats)
+    print("✅ Parity OK" if ok else "❌ Parity mismatch")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,151 @@
+"""
+Benchmark: pooled aiohttp downloader vs. the per-call requests.get path.
+
+Usage:
+    python bench_downloader.py                               # 200 x 300 KB, concurrency 8
+    python bench_downloader.py --requests 500 --size-kb 2000 --handshake-ms 40
+
+Serves a payload from a local keep-alive HTTP/1.1 server. Each new
+connection is delayed by --handshake-ms to stand in for the TCP+TLS setup
+cost to Cloudinary, so the per-call path pays it on every download while
+the pooled path pays it once per connection. Reports throughput, p50/p99
+latency and the number of connections the server accepted.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import requests
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from media_downloader import MediaDownloader
+
+
+class PayloadServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, payload: bytes, handshake_s: float):
+        super().__init__(("127.0.0.1", 0), PayloadHandler)
+        self.payload = payload
+        self.handshake_s = handshake_s
+        self.connections = 0
+        self._lock = threading.Lock()
+
+
+class PayloadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_s)
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(self.server.payload)))
+        self.end_headers()
+        self.wfile.write(self.server.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_download(url: str) -> float:
+    """Original download_with_retry request: a fresh connection per call."""
+    start = time.perf_counter()
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    _ = response.content
+    return time.perf_counter() - start
+
+
+def run_legacy(url: str, count: int, concurrency: int):
+    # The API ran downloads via asyncio.to_thread, i.e. on a thread pool
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies = list(pool.map(legacy_download, [f"{url}?i={i}" for i in range(count)]))
+    return latencies, time.perf_counter() - start
+
+
+async def run_pooled(url: str, count: int, concurrency: int, limit_per_host: int):
+    downloader = MediaDownloader(limit_per_host=limit_per_host)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await downloader.fetch(f"{url}?i={i}", timeout=30)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+
+    # Error semantics: 404 is raised immediately, without retries
+    try:
+        await downloader.fetch(url.replace("/media", "/missing"), timeout=5)
+    except FileNotFoundError:
+        pass
+    stats = downloader.stats()
+    await downloader.close()
+    return latencies, elapsed, stats
+
+
+def report(name: str, latencies, elapsed: float, connections: int, total_mb: float) -> None:
+    ms = np.array(latencies) * 1000
+    print(f"{name:>10} | {len(ms) / elapsed:8.1f}/s | {total_mb / elapsed:7.1f} MB/s | "
+          f"{np.percentile(ms, 50):7.1f} | {np.percentile(ms, 99):7.1f} | {connections:11d}")
+
+
+def run(args) -> None:
+    payload = os.urandom(args.size_kb * 1024)
+    server = PayloadServer(payload, args.handshake_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/media"
+    total_mb = args.requests * len(payload) / 1024 / 1024
+
+    print(f"{'path':>10} | {'throughput':>10} | {'bandwidth':>10} | {'p50 ms':>7} | {'p99 ms':>7} | {'connections':>11}")
+    print("─" * 72)
+
+    latencies, elapsed = run_legacy(url, args.requests, args.concurrency)
+    report("requests", latencies, elapsed, server.connections, total_mb)
+    legacy_rate = len(latencies) / elapsed
+
+    server.connections = 0
+    latencies, elapsed, stats = asyncio.run(run_pooled(url, args.requests, args.concurrency, args.limit_per_host))
+    report("aiohttp", latencies, elapsed, server.connections, total_mb)
+
+    print("─" * 72)
+    print(f"📊 Pooled speedup: {len(latencies) / elapsed / legacy_rate:.2f}x "
+          f"({stats['downloads']} downloads, {stats['retries']} retries, {stats['failed']} failed incl. the 404 probe)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="downloads per path")
+    parser.add_argument("--size-kb", type=int, default=300, help="payload size")
+    parser.add_argument("--concurrency", type=int, default=8, help="downloads in flight at once")
+    parser.add_argument("--limit-per-host", type=int, default=8, help="pooled connections per host")
+    parser.add_argument("--handshake-ms", type=float, default=20.0, help="simulated connection setup cost")
+    args = parser.parse_args()
+
+    print(f"🚀 Downloader benchmark ({args.requests} x {args.size_kb} KB, concurrency {args.concurrency}, "
+          f"{args.handshake_ms:.0f} ms handshake)")
+    run(args)
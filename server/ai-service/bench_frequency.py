@@ -0,0 +1,117 @@
+"""
+Benchmark: radial-geometry FFT engine vs. the original per-pixel Python loops.
+
+Usage:
+    python bench_frequency.py                    # 384, 1080, 2560 px
+    python bench_frequency.py --legacy-max 2560  # also time the slow loops at 2560 px
+
+The legacy loops are O(h * w * rings) in pure Python, so above --legacy-max
+their time is extrapolated from the largest measured size (marked "est.").
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from frequency_analysis import get_radial_geometry, clear_geometry_cache
+
+
+def legacy_spectrum_stats(magnitude: np.ndarray):
+    """Original analyze_frequency_domain mask + ring loops (reference implementation)."""
+    h, w = magnitude.shape
+    center_h, center_w = h // 2, w // 2
+
+    high_freq_mask = np.zeros_like(magnitude, dtype=bool)
+    for i in range(h):
+        for j in range(w):
+            dist = np.sqrt((i - center_h)**2 + (j - center_w)**2)
+            if dist > min(h, w) * 0.35:
+                high_freq_mask[i, j] = True
+
+    radial_profile = []
+    max_radius = min(center_h, center_w)
+    for r in range(1, max_radius, max_radius // 20):
+        ring_mask = np.zeros_like(magnitude, dtype=bool)
+        for i in range(h):
+            for j in range(w):
+                dist = np.sqrt((i - center_h)**2 + (j - center_w)**2)
+                if r - 2 <= dist <= r + 2:
+                    ring_mask[i, j] = True
+        if np.any(ring_mask):
+            radial_profile.append(np.mean(magnitude[ring_mask]))
+
+    return high_freq_mask, radial_profile
+
+
+def vectorized_spectrum_stats(magnitude: np.ndarray):
+    """Same statistics through the shared RadialGeometry engine."""
+    h, w = magnitude.shape
+    geometry = get_radial_geometry(h, w)
+    max_radius = min(h // 2, w // 2)
+    radial_profile = geometry.ring_means(magnitude, range(1, max_radius, max(1, max_radius // 20)), half_width=2)
+    return geometry.high_frequency_mask(0.35), radial_profile
+
+
+def make_magnitude(size: int) -> np.ndarray:
+    rng = np.random.default_rng(size)
+    gray = rng.integers(0, 256, size=(size, size)).astype(np.float32)
+    return np.abs(np.fft.fftshift(np.fft.fft2(gray)))
+
+
+def run(sizes, legacy_max: int, repeats: int) -> bool:
+    print(f"{'size':>6} | {'legacy':>12} | {'cold':>9} | {'warm':>9} | {'speedup':>9} | parity")
+    print("─" * 66)
+
+    all_ok = True
+    legacy_per_pixel = None
+
+    for size in sizes:
+        magnitude = make_magnitude(size)
+
+        clear_geometry_cache()
+        start = time.perf_counter()
+        mask, profile = vectorized_spectrum_stats(magnitude)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            vectorized_spectrum_stats(magnitude)
+        warm = (time.perf_counter() - start) / repeats
+
+        if size <= legacy_max:
+            start = time.perf_counter()
+            legacy_mask, legacy_profile = legacy_spectrum_stats(magnitude)
+            legacy = time.perf_counter() - start
+            legacy_per_pixel = legacy / (size * size)
+            # The loops averaged float32 magnitudes; the engine accumulates in float64
+            parity = bool(np.array_equal(mask, legacy_mask)) and np.allclose(profile, legacy_profile, rtol=1e-5)
+            parity_label = "✅" if parity else "❌"
+            all_ok = all_ok and parity
+            legacy_label = f"{legacy:10.2f}s"
+        else:
+            legacy = legacy_per_pixel * size * size if legacy_per_pixel else float('nan')
+            parity_label = "skipped"
+            legacy_label = f"{legacy:7.1f}s est."
+
+        print(f"{size:>6} | {legacy_label:>12} | {cold*1000:7.1f}ms | {warm*1000:7.1f}ms | {legacy/warm:8.0f}x | {parity_label}")
+
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[384, 1080, 2560])
+    parser.add_argument("--legacy-max", type=int, default=1080, help="largest size to time the legacy loops at")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Radial-geometry FFT benchmark")
+    ok = run(args.sizes, args.legacy_max, args.repeats)
+    print("✅ Parity OK" if ok else "❌ Parity mismatch")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,144 @@
+"""
+Benchmark: vectorized heatmap rendering vs. the original per-pixel / per-rectangle loops.
+
+Usage:
+    python bench_heatmap.py                       # 512, 1280, 2560 px
+    python bench_heatmap.py --sizes 2560 --repeats 10
+
+For region heatmaps (faces), the unblurred heatmap must equal the nested
+rectangles exactly. For suspicion maps, the LUT colormap quantizes scores to
+1/SEVERITY_LEVELS: away from a color threshold the color must match
+get_severity_color with alpha within ±1.
+Region heatmaps are blurred only around the boxes. Once blurred (at reduced resolution above HEATMAP_BLUR_SIZE) and
+composited, the max / mean per-channel difference from the original
+rendering is reported. Also times the full create_full_annotated_image.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from visual_annotations import (
+    ManipulationRegion, get_severity_color, generate_heatmap, create_full_annotated_image,
+    _SEVERITY_LUT, SEVERITY_LEVELS, _region_gradient, HEATMAP_BLUR_SIZE,
+)
+
+
+class Face:
+    def __init__(self, bbox):
+        self.bbox = bbox
+
+
+def legacy_region_heatmap(size, regions) -> np.ndarray:
+    """Original nested-rectangle gradient (reference implementation, before blurring)."""
+    heatmap = Image.new('RGBA', size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(heatmap)
+    for region in regions:
+        x, y, w, h = region.bbox
+        color = get_severity_color(region.score, as_rgba=True)
+        for i in range(min(w, h) // 2):
+            alpha = int(color[3] * (1 - i / (min(w, h) // 2)))
+            draw.rectangle([(x + i, y + i), (x + w - i, y + h - i)], fill=(*color[:3], alpha))
+    return np.array(heatmap)
+
+
+def legacy_map_heatmap(suspicion_map: np.ndarray) -> np.ndarray:
+    """Original per-pixel colormap loop (reference implementation, before blurring)."""
+    height, width = suspicion_map.shape
+    heatmap_array = np.zeros((height, width, 4), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            score = suspicion_map[y, x]
+            if score > 0.1:
+                heatmap_array[y, x] = get_severity_color(score, as_rgba=True)
+    return heatmap_array
+
+
+def legacy_render(image: Image.Image, heatmap_array: np.ndarray) -> np.ndarray:
+    blurred = cv2.GaussianBlur(heatmap_array, (31, 31), 0)
+    return np.array(Image.alpha_composite(image.convert('RGBA'), Image.fromarray(blurred)))
+
+
+def timed(fn, repeats: int):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def case(size: int):
+    """Photo-sized noise image with two faces and a quarter-resolution suspicion map."""
+    rng = np.random.default_rng(size)
+    width, height = size, size * 9 // 16
+    image = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    faces = [Face((width // 4, height // 6, width * 2 // 5, height * 2 // 3)),
+             Face((width * 3 // 5, height // 4, width // 4, height // 2))]
+    yy, xx = np.mgrid[0:height // 4, 0:width // 4]
+    suspicion = (0.5 + 0.5 * np.sin(xx / 9.0) * np.cos(yy / 7.0)).astype(np.float32)
+    return image, faces, [0.82, 0.41], suspicion
+
+
+def run(sizes, repeats: int, legacy_max: int) -> bool:
+    print(f"{'size':>6} | {'path':10s} | {'legacy':>9} | {'vectorized':>10} | {'speedup':>7} | unblurred | rendered Δ max/mean")
+    print("─" * 92)
+    all_ok = True
+    for size in sizes:
+        image, faces, scores, suspicion = case(size)
+        regions = [ManipulationRegion(face.bbox, score) for face, score in zip(faces, scores)]
+        full_map = cv2.resize(suspicion, image.size)
+
+        # Region heatmap: exact before the blur
+        gradient = np.zeros((image.height, image.width, 4), dtype=np.uint8)
+        for region in regions:
+            _region_gradient(gradient, region)
+        region_exact = bool(np.array_equal(gradient, legacy_region_heatmap(image.size, regions)))
+
+        paths = [("regions", lambda: legacy_region_heatmap(image.size, regions),
+                  lambda: generate_heatmap(image, regions=regions), region_exact)]
+        if size <= legacy_max:
+            # Suspicion map: quantized colors, alpha within ±1 away from the color thresholds
+            lut_colors = _SEVERITY_LUT[np.rint(np.clip(full_map, 0.0, 1.0) * SEVERITY_LEVELS).astype(np.intp)]
+            legacy_colors = legacy_map_heatmap(full_map)
+            near_threshold = np.min(np.abs(full_map[..., None] - np.array([0.1, 0.3, 0.5, 0.7])), axis=-1) < 1 / SEVERITY_LEVELS
+            color_delta = np.abs(lut_colors.astype(np.int16) - legacy_colors)[~near_threshold]
+            map_ok = bool(color_delta[:, :3].max(initial=0) == 0 and color_delta[:, 3].max(initial=0) <= 1)
+            paths.append(("map", lambda: legacy_map_heatmap(full_map),
+                          lambda: generate_heatmap(image, suspicion_map=suspicion), map_ok))
+
+        for name, legacy_fn, vector_fn, exact in paths:
+            legacy_time, legacy_heatmap = timed(legacy_fn, 1)
+            legacy_start = time.perf_counter()
+            reference = legacy_render(image, legacy_heatmap)
+            legacy_time += time.perf_counter() - legacy_start
+            vector_time, rendered = timed(vector_fn, repeats)
+            delta = np.abs(np.array(rendered).astype(np.int16) - reference)
+            all_ok = all_ok and exact
+            print(f"{size:>6} | {name:10s} | {legacy_time*1000:7.0f}ms | {vector_time*1000:8.1f}ms | "
+                  f"{legacy_time/vector_time:6.0f}x | {'✅' if exact else '❌':9s} | {delta.max():3d} / {delta.mean():.3f}")
+
+        annotated_time, _ = timed(lambda: create_full_annotated_image(image, faces, scores), repeats)
+        print(f"{size:>6} | {'annotated':10s} | {'':>9} | {annotated_time*1000:8.1f}ms | (heatmap + boxes, blur at ≤{HEATMAP_BLUR_SIZE}px)")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[512, 1280, 2560])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--legacy-max", type=int, default=1280, help="largest size to run the per-pixel map loop at")
+    args = parser.parse_args()
+
+    print("🚀 Heatmap rendering benchmark")
+    ok = run(args.sizes, args.repeats, args.legacy_max)
+    print("✅ Parity OK" if ok else "❌ Parity mismatch")
+    sys.exit(0 if ok else 1)
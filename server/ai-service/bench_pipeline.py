@@ -0,0 +1,203 @@
+"""
+Benchmark: image analysis latency per pipeline branch, staged vs. legacy.
+
+Usage:
+    python bench_pipeline.py portrait.jpg group.jpg     # + synthetic no-face images
+    python bench_pipeline.py --runs 5                   # synthetic no-face images only
+    python bench_pipeline.py --staged-only              # skip the legacy baseline
+
+Runs DeepfakeDetector.classify_content on each image and groups latency by
+the branch the staged pipeline chose (face / screen / no_face), with the
+per-stage breakdown, feature-plane reuse and analyzer-thread overlap it
+records (compare ANALYZER_THREADS=1 with the default). Synthetic screen and
+scene images cover the no-face branches. Images whose analysis raises are
+still timed and reported.
+
+Each image is also run through legacy_analyze, the plan before face-first
+staging: every analyzer runs ahead of the face check and frame generation
+detects the faces again. Both timings are printed side by side; run with
+ANALYZER_THREADS=1 to compare the staging alone, without the concurrent
+analyzers.
+
+Note: analyses rewrite debug_images/, so pass face images from elsewhere.
+"""
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+from collections import defaultdict
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from model import get_detector, MediaType, STYLIZATION_DETECTION_AVAILABLE, MAX_IMAGE_SIZE
+from media_ingest import ingest_bytes
+from image_features import ImageFeatures
+
+if STYLIZATION_DETECTION_AVAILABLE:
+    from stylization_detector import detect_stylization
+
+
+def synthetic_images():
+    """Monitor on a dark desk (screen branch) and a textured scene (no-face branch)."""
+    screen = Image.new("RGB", (1280, 800), (14, 14, 20))
+    draw = ImageDraw.Draw(screen)
+    draw.rectangle((280, 160, 1000, 565), fill=(236, 238, 242))
+    draw.rectangle((280, 160, 1000, 200), fill=(40, 44, 52))
+    for row in range(8):
+        y = 220 + row * 42
+        draw.rectangle((300, y, 980, y + 30), outline=(190, 190, 198), fill=(255, 255, 255))
+        draw.text((312, y + 9), f"Item {row + 1}  -  lorem ipsum dolor sit amet", fill=(20, 20, 20))
+    draw.rectangle((0, 700, 1280, 730), fill=(255, 0, 200))  # RGB strip
+    draw.rectangle((0, 740, 1280, 770), fill=(0, 230, 255))
+
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:800, 0:1200]
+    base = np.stack([(xx / 1200) * 180, (yy / 800) * 160 + 40, np.full_like(xx, 90.0)], axis=-1)
+    scene = Image.fromarray(np.clip(base + rng.normal(0, 25, base.shape), 0, 255).astype(np.uint8))
+    return [("synthetic_screen.png", screen), ("synthetic_scene.png", scene)]
+
+
+def legacy_analyze(detector, content: bytes) -> tuple:
+    """
+    Pre-staging plan of _analyze_image (reference implementation): all forensic
+    analyzers run in sequence before the face check, and generate_image_frames
+    detects the faces itself. Ends in _finalize like the staged pipeline (where
+    the original failed for no-face images). Returns (branch, faces, stages_ms).
+    """
+    timings = {}
+    media = ingest_bytes(content, MediaType.IMAGE)
+    decoded = media.decode(MAX_IMAGE_SIZE)
+    try:
+        image = decoded.image
+        features = ImageFeatures(image)
+        if STYLIZATION_DETECTION_AVAILABLE:
+            detector._timed(timings, 'stylization', detect_stylization, image, features)
+        detector._timed(timings, 'compression', detector.analyze_compression_artifacts, image)
+        detector._timed(timings, 'exif', detector.analyze_exif_metadata, exif=decoded.exif)
+        detector._timed(timings, 'filters', detector.detect_social_media_filters, image, features)
+        frames, faces, content_info = detector._timed(timings, 'frames', detector.generate_image_frames, image, None, features)
+
+        if not faces:
+            is_screen, _, _ = detector._timed(timings, 'screen', detector.detect_screen_content, image, features)
+            probs = {'fake': 0.02, 'real': 0.98} if is_screen else {'fake': 0.05, 'real': 0.95}
+            detector._finalize(probs, {'faces_detected': 0, 'debug_frames': []}, MediaType.IMAGE, content_info)
+            return ('screen' if is_screen else 'no_face'), 0, timings
+
+        detector._timed(timings, 'blending', detector.detect_blending_boundaries, image, faces[0])
+        probs, results, details = detector._timed(timings, 'inference', detector.analyze_frames, frames, faces,
+                                                  is_video=False, content_info=content_info)
+        face_crop = detector.extract_face_crop(image, faces[0])
+        detector._timed(timings, 'landmarks', detector.analyze_facial_landmarks, face_crop)
+        detector._timed(timings, 'debug_frames', detector.save_debug, frames, results, MediaType.IMAGE)
+        details['faces_detected'] = len(faces)
+        detector._finalize(probs, details, MediaType.IMAGE, content_info)
+        return 'face', len(faces), timings
+    finally:
+        decoded.release()
+        media.cleanup()
+
+
+def staged_analyze(detector, content: bytes, planes, analyzers) -> tuple:
+    """Current pipeline via classify_content; returns (branch, faces, stages_ms)."""
+    _, _, _, details = detector.classify_content(content, "image")
+    pipeline = details.get('pipeline') or {}
+    faces = details.get('faces_detected', 0)
+    branch = pipeline.get('branch', 'face' if faces else 'no_face')
+    for kind, count in pipeline.get('planes', {}).items():
+        planes[branch][kind].append(count)
+    for key, value in pipeline.get('analyzers', {}).items():
+        analyzers[branch][key].append(value)
+    return branch, faces, pipeline.get('stages_ms', {})
+
+
+def timed_runs(analyze, content: bytes, runs: int, stages) -> tuple:
+    """Mean ms over `runs` analyses, with the branch and face count of the last one."""
+    times, branch, faces = [], "error", 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                branch, faces, stages_ms = analyze(content)
+            for stage, ms in stages_ms.items():
+                stages[branch][stage].append(ms)
+        except Exception as e:
+            branch = f"error ({type(e).__name__})"
+        times.append((time.perf_counter() - start) * 1000)
+    return times, branch, faces
+
+
+def encode(image: Image.Image, name: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG" if name.endswith(".png") else "JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def run(paths, runs: int, baseline: bool = True) -> None:
+    detector = get_detector()
+    with contextlib.redirect_stdout(io.StringIO()):
+        detector.load_model()
+
+    inputs = [(os.path.basename(p), open(p, "rb").read()) for p in paths]
+    inputs += [(name, encode(image, name)) for name, image in synthetic_images()]
+
+    latencies = defaultdict(list)
+    legacy_latencies = defaultdict(list)
+    stages = defaultdict(lambda: defaultdict(list))
+    legacy_stages = defaultdict(lambda: defaultdict(list))
+    planes = defaultdict(lambda: defaultdict(list))
+    analyzers = defaultdict(lambda: defaultdict(list))
+    print(f"{'image':32s} | {'branch':8s} | {'legacy ms':>9} | {'staged ms':>9} | {'speedup':>7} | {'faces':>5}")
+    print("─" * 84)
+    for name, content in inputs:
+        times, branch, faces = timed_runs(lambda c: staged_analyze(detector, c, planes, analyzers),
+                                          content, runs, stages)
+        latencies[branch].extend(times)
+        legacy_ms, speedup = "-", "-"
+        if baseline:
+            legacy_times, legacy_branch, _ = timed_runs(lambda c: legacy_analyze(detector, c),
+                                                        content, runs, legacy_stages)
+            # Grouped under the staged branch so both columns compare the same images
+            legacy_latencies[branch].extend(legacy_times)
+            legacy_ms = f"{np.mean(legacy_times):.0f}"
+            speedup = f"{np.mean(legacy_times) / np.mean(times):.2f}x"
+            if legacy_branch != branch:
+                legacy_ms += f" ({legacy_branch})"
+        print(f"{name[:32]:32s} | {branch:8s} | {legacy_ms:>9} | {np.mean(times):9.0f} | {speedup:>7} | {faces:5d}")
+
+    print("─" * 84)
+    for branch, times in latencies.items():
+        print(f"📊 {branch}: mean {np.mean(times):.0f} ms, p50 {np.percentile(times, 50):.0f} ms over {len(times)} run(s)")
+        if legacy_latencies[branch]:
+            legacy_times = legacy_latencies[branch]
+            print(f"   legacy: mean {np.mean(legacy_times):.0f} ms, p50 {np.percentile(legacy_times, 50):.0f} ms "
+                  f"({np.mean(legacy_times) / np.mean(times):.2f}x the staged mean)")
+        if stages[branch]:
+            breakdown = ", ".join(f"{stage} {np.mean(ms):.0f}" for stage, ms in stages[branch].items())
+            print(f"   stages (ms): {breakdown}")
+        if legacy_stages[branch]:
+            breakdown = ", ".join(f"{stage} {np.mean(ms):.0f}" for stage, ms in legacy_stages[branch].items())
+            print(f"   legacy stages (ms): {breakdown}")
+        if planes[branch]:
+            print(f"   feature planes: {np.mean(planes[branch]['computed']):.0f} computed, "
+                  f"{np.mean(planes[branch]['reused']):.0f} reused per image")
+        if analyzers[branch]:
+            print(f"   analyzers: {np.mean(analyzers[branch]['busy_ms']):.0f} ms of work in "
+                  f"{np.mean(analyzers[branch]['wall_ms']):.0f} ms on {analyzers[branch]['workers'][0]} thread(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="images to analyze (e.g. portraits for the face branch)")
+    parser.add_argument("--runs", type=int, default=3, help="analyses per image")
+    parser.add_argument("--staged-only", action="store_true", help="skip the legacy (pre-staging) baseline")
+    args = parser.parse_args()
+
+    print(f"🚀 Pipeline latency by branch ({len(args.images)} image(s) + 2 synthetic, {args.runs} run(s) each)")
+    run(args.images, args.runs, baseline=not args.staged_only)
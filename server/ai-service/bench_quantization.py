@@ -0,0 +1,122 @@
+"""
+Benchmark: INT8 dynamic quantization vs. fp32 for the deepfake classifier.
+
+Usage:
+    python bench_quantization.py                     # corpus: debug_images/
+    python bench_quantization.py ./corpus --batch 8  # any folder of jpg/png/webp
+
+Each precision runs in its own process so RSS is measured in isolation.
+Reports model load time, RSS after load, per-frame latency (batch of 1 and
+batched) and the per-image difference in `fake` probability against fp32.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+
+def load_corpus(folder: str):
+    patterns = ("*.jpg", "*.jpeg", "*.png", "*.webp")
+    return sorted(p for pattern in patterns for p in glob.glob(os.path.join(folder, pattern)))
+
+
+def run_precision(precision: str, paths, batch: int, queue) -> None:
+    """Child process: load one precision, classify the corpus, report timings."""
+    import psutil
+    import torch
+    from PIL import Image
+    from transformers import AutoImageProcessor, SiglipForImageClassification
+    from model import MODEL_PATH, HUGGINGFACE_MODEL_ID
+    from quantization import load_int8_model
+
+    model_source = MODEL_PATH if os.path.exists(MODEL_PATH) else HUGGINGFACE_MODEL_ID
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    start = time.perf_counter()
+    model = load_int8_model(model_source) if precision == "int8" else None
+    if model is None:
+        model = SiglipForImageClassification.from_pretrained(model_source).eval()
+    processor = AutoImageProcessor.from_pretrained(model_source)
+    load_time = time.perf_counter() - start
+    rss_loaded = process.memory_info().rss
+
+    images = [Image.open(p).convert("RGB") for p in paths]
+    pixel_values = processor(images=images, return_tensors="pt")['pixel_values']
+
+    with torch.no_grad():
+        model(pixel_values=pixel_values[:1])  # Warm up kernels
+
+        single = []
+        for i in range(len(images)):
+            start = time.perf_counter()
+            model(pixel_values=pixel_values[i:i + 1])
+            single.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        logits = torch.cat([
+            model(pixel_values=pixel_values[i:i + batch]).logits
+            for i in range(0, len(images), batch)
+        ])
+        batched = (time.perf_counter() - start) / len(images)
+
+    queue.put({
+        'precision': precision,
+        'load_s': load_time,
+        'rss_mb': rss_loaded / 1024 / 1024,
+        'rss_model_mb': (rss_loaded - rss_before) / 1024 / 1024,
+        'single_ms': float(np.median(single)) * 1000,
+        'batched_ms': batched * 1000,
+        'fake': torch.softmax(logits, dim=1)[:, 0].tolist(),  # ID2LABEL[0] == 'fake'
+        'peak_rss_mb': process.memory_info().rss / 1024 / 1024,
+    })
+
+
+def measure(precision: str, paths, batch: int) -> dict:
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_precision, args=(precision, paths, batch, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    default_corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug_images")
+    parser.add_argument("corpus", nargs="?", default=default_corpus, help="folder of test images")
+    parser.add_argument("--batch", type=int, default=4, help="batch size for the batched timing")
+    args = parser.parse_args()
+
+    paths = load_corpus(args.corpus)
+    if not paths:
+        print(f"❌ No images found in {args.corpus}")
+        sys.exit(1)
+
+    print(f"🚀 INT8 vs fp32 on {len(paths)} images from {args.corpus}")
+    fp32 = measure("fp32", paths, args.batch)
+    int8 = measure("int8", paths, args.batch)
+
+    print(f"\n{'precision':>9} | {'load':>7} | {'RSS':>9} | {'model RSS':>9} | {'peak RSS':>9} | {'ms/frame (1)':>12} | {'ms/frame (batch)':>16}")
+    print("─" * 92)
+    for r in (fp32, int8):
+        print(f"{r['precision']:>9} | {r['load_s']:6.2f}s | {r['rss_mb']:7.0f}MB | {r['rss_model_mb']:7.0f}MB | "
+              f"{r['peak_rss_mb']:7.0f}MB | {r['single_ms']:12.1f} | {r['batched_ms']:16.1f}")
+
+    delta = np.abs(np.array(int8['fake']) - np.array(fp32['fake']))
+    flips = sum((a > 0.5) != (b > 0.5) for a, b in zip(int8['fake'], fp32['fake']))
+    print("─" * 92)
+    print(f"📊 |Δ fake| mean {delta.mean():.4f} | p95 {np.percentile(delta, 95):.4f} | max {delta.max():.4f} | label flips {flips}/{len(paths)}")
+    print(f"⚡ Speedup: {fp32['single_ms'] / int8['single_ms']:.2f}x (batch 1), {fp32['batched_ms'] / int8['batched_ms']:.2f}x (batch {args.batch})")
+
+    worst = int(delta.argmax())
+    print(f"   Largest delta: {os.path.basename(paths[worst])} (fp32 {fp32['fake'][worst]:.4f} → int8 {int8['fake'][worst]:.4f})")
@@ -0,0 +1,169 @@
+"""
+Benchmark: analysis-cache hit latency under concurrent access.
+
+Usage:
+    python bench_result_store.py                          # 4 procs x 4 threads, 1 writer
+    python bench_result_store.py --procs 2 --threads 8 --entries 200 --payload-kb 400
+
+Fills each backend with results of realistic size (base64 debug frames),
+then hammers it with cache hits from several processes x threads while a
+writer process keeps inserting new results (forcing eviction). Reports
+p50/p99 hit latency and throughput. The memory backend is measured with
+threads only, since its entries are not shared between processes.
+"""
+
+import os
+import sys
+import time
+import base64
+import random
+import argparse
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from result_store import MemoryResultStore, SQLiteResultStore
+
+
+def make_result(i: int, payload_kb: int) -> dict:
+    frame = base64.b64encode(os.urandom(payload_kb * 1024 * 3 // 4 // 8)).decode()
+    return {
+        'fake_score': random.random(),
+        'real_score': random.random(),
+        'classification': 'real',
+        'confidence': 0.9,
+        'processing_time_ms': 1234,
+        'faces_detected': 1,
+        'debug_frames': [{'name': f'frame_{i}_{j}', 'image_base64': frame} for j in range(8)],
+    }
+
+
+def open_store(backend: str, directory: str, max_mb: int, entries: int):
+    if backend == "sqlite":
+        return SQLiteResultStore(directory=directory, max_bytes=max_mb * 1024 * 1024)
+    return MemoryResultStore(max_results=entries)
+
+
+def reader(store, keys, lookups: int, out: list) -> None:
+    latencies = []
+    for _ in range(lookups):
+        key = random.choice(keys)
+        start = time.perf_counter()
+        store.get_index(f"url-{key}", ttl=3600)
+        store.get_result(key, ttl=3600)
+        latencies.append(time.perf_counter() - start)
+    out.extend(latencies)
+
+
+def reader_process(backend, directory, max_mb, entries, keys, threads, lookups, queue) -> None:
+    import threading
+    store = open_store(backend, directory, max_mb, entries)
+    latencies: list = []
+    workers = [threading.Thread(target=reader, args=(store, keys, lookups, latencies)) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    queue.put(latencies)
+
+
+def writer_process(directory, max_mb, payload_kb, stop) -> None:
+    store = SQLiteResultStore(directory=directory, max_bytes=max_mb * 1024 * 1024)
+    i = 0
+    while not stop.is_set():
+        key = f"new-{os.getpid()}-{i}"
+        store.set_result(key, make_result(i, payload_kb))
+        store.set_index(f"url-{key}", key)
+        i += 1
+        time.sleep(0.01)
+
+
+def fill(store, entries: int, payload_kb: int):
+    keys = []
+    for i in range(entries):
+        key = f"content-{i}"
+        store.set_result(key, make_result(i, payload_kb))
+        store.set_index(f"url-{key}", key)
+        keys.append(key)
+    return keys
+
+
+def report(name: str, latencies, elapsed: float) -> None:
+    ms = np.array(latencies) * 1000
+    print(f"{name:>8} | {len(ms):7d} | {np.percentile(ms, 50):8.3f} | {np.percentile(ms, 99):8.3f} | "
+          f"{ms.max():8.2f} | {len(ms) / elapsed:9.0f}/s")
+
+
+def run(args) -> None:
+    print(f"{'backend':>8} | {'lookups':>7} | {'p50 ms':>8} | {'p99 ms':>8} | {'max ms':>8} | {'throughput':>11}")
+    print("─" * 68)
+
+    # Memory: threads in one process
+    store = MemoryResultStore(max_results=args.entries)
+    keys = fill(store, args.entries, args.payload_kb)
+    latencies: list = []
+    import threading
+    workers = [threading.Thread(target=reader, args=(store, keys, args.lookups, latencies))
+               for _ in range(args.procs * args.threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    report("memory", latencies, time.perf_counter() - start)
+    memory_stats = store.stats()
+
+    # SQLite: several processes x threads plus concurrent writers
+    with tempfile.TemporaryDirectory() as directory:
+        store = SQLiteResultStore(directory=directory, max_bytes=args.max_mb * 1024 * 1024)
+        keys = fill(store, args.entries, args.payload_kb)
+
+        ctx = mp.get_context("spawn")
+        queue, stop = ctx.Queue(), ctx.Event()
+        writers = [ctx.Process(target=writer_process, args=(directory, args.max_mb, args.payload_kb, stop))
+                   for _ in range(args.writers)]
+        readers = [ctx.Process(target=reader_process,
+                               args=("sqlite", directory, args.max_mb, args.entries, keys, args.threads, args.lookups, queue))
+                   for _ in range(args.procs)]
+
+        for w in writers:
+            w.start()
+        start = time.perf_counter()
+        for r in readers:
+            r.start()
+        latencies = []
+        for _ in readers:
+            latencies.extend(queue.get())
+        elapsed = time.perf_counter() - start
+        for r in readers:
+            r.join()
+        stop.set()
+        for w in writers:
+            w.join()
+
+        report("sqlite", latencies, elapsed)
+        stats = store.stats()
+        print("─" * 68)
+        print(f"📊 Memory: {memory_stats['results']} results, {memory_stats['bytes'] / 1024 / 1024:.1f} MB held "
+              f"(compressed={memory_stats['compressed']}, {memory_stats['evictions']} evictions)")
+        print(f"📊 SQLite after run: {stats['results']} results, {stats['bytes'] / 1024 / 1024:.1f} MB "
+              f"(budget {args.max_mb} MB), {args.writers} concurrent writer(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procs", type=int, default=4, help="reader processes (sqlite)")
+    parser.add_argument("--threads", type=int, default=4, help="reader threads per process")
+    parser.add_argument("--writers", type=int, default=1, help="concurrent writer processes (sqlite)")
+    parser.add_argument("--entries", type=int, default=100, help="results stored before reading")
+    parser.add_argument("--payload-kb", type=int, default=200, help="approximate size of one result")
+    parser.add_argument("--lookups", type=int, default=500, help="hits per reader thread")
+    parser.add_argument("--max-mb", type=int, default=64, help="sqlite size budget")
+    args = parser.parse_args()
+
+    print(f"🚀 Result store hit latency ({args.procs} procs x {args.threads} threads, {args.entries} entries of ~{args.payload_kb} KB)")
+    run(args)
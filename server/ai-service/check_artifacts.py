@@ -0,0 +1,131 @@
+"""
+Verification: lazily rendered annotated image and heatmap.
+
+Usage:
+    python check_artifacts.py face.jpg group.jpg    # images with faces (needs the model)
+
+For every image, runs a full analysis (LAZY_ARTIFACTS as configured), then:
+- checks that every debug frame still carries its base64 thumbnail
+- renders each artifact from the stored inputs and compares the JPEG bytes
+  with the original inline encoding of the same inputs
+  (create_full_annotated_image + image_to_base64)
+- checks that a second request is served from the cache
+- builds a PDF report through the artifact hook and counts what it rendered
+Reports the time the analysis now spends on artifacts against the eager
+rendering, the base64 payload no longer embedded in the response, and the
+stored image copy against the raw working-image pixels.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from model import get_detector, MAX_IMAGE_SIZE
+from image_decode import decode_image
+from visual_annotations import create_full_annotated_image, image_to_base64
+from pdf_report import generate_pdf_report, PDF_SUPPORT
+
+
+def legacy_artifacts(artifacts) -> dict:
+    """Original eager annotation of _analyze_image (reference implementation)."""
+    encoded = {}
+    if artifacts.faces:
+        annotated_img, heatmap_img = create_full_annotated_image(
+            artifacts.image(),
+            artifacts.faces,
+            artifacts.face_scores,
+            artifacts.markers,
+            include_heatmap=True,
+            include_boxes=True,
+            include_arrows=len(artifacts.markers) > 0
+        )
+        encoded['annotated'] = image_to_base64(annotated_img.convert('RGB'), 'JPEG')
+        if heatmap_img:
+            encoded['heatmap'] = image_to_base64(heatmap_img.convert('RGB'), 'JPEG')
+    return encoded
+
+
+def image_size(path: str) -> tuple:
+    """Size of the working image the analysis ran on (after MAX_IMAGE_SIZE)."""
+    with open(path, 'rb') as f:
+        return decode_image(f.read(), MAX_IMAGE_SIZE).image.size
+
+
+def check(path: str) -> bool:
+    detector = get_detector()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, classification, _, details = detector.classify_content(open(path, 'rb').read(), 'image')
+    name = os.path.basename(path)
+    analysis_id = details.get('analysis_id')
+    artifacts = detector.artifacts.get(analysis_id) if analysis_id else None
+    if artifacts is None:
+        print(f"{name[:22]:22s} | no artifacts stored ({details.get('faces_detected', 0)} faces) - skipped")
+        return True
+
+    lazy_ms = details['pipeline']['stages_ms'].get('artifacts', 0)
+    start = time.perf_counter()
+    legacy = legacy_artifacts(artifacts)
+    eager_ms = (time.perf_counter() - start) * 1000
+
+    frames = details.get('debug_frames') or []
+    ok = all(frame.get('image_base64') for frame in frames)
+    ok = ok and sorted(artifacts.names()) == sorted(legacy)
+    for artifact in artifacts.names():
+        ok = ok and detector.artifacts.base64(analysis_id, artifact) == legacy[artifact]
+    hits_before = detector.artifacts.stats()['hits']
+    start = time.perf_counter()
+    cached = detector.artifacts.render(analysis_id, 'annotated')
+    hit_us = (time.perf_counter() - start) * 1e6
+    ok = ok and sorted(artifacts.rendered) == sorted(legacy)
+    ok = ok and cached is not None and detector.artifacts.stats()['hits'] == hits_before + 1
+
+    pdf_note = "no ReportLab"
+    if PDF_SUPPORT:
+        # A fresh copy of the inputs so the PDF renders instead of hitting the cache above
+        detector.artifacts.put(type(artifacts)(analysis_id, artifacts.image(), artifacts.faces,
+                                                artifacts.face_scores, artifacts.markers))
+        before = detector.artifacts.stats()['rendered']
+        with contextlib.redirect_stdout(io.StringIO()):
+            pdf = generate_pdf_report(details, {'verdict': classification}, artifacts=lambda n: detector.artifacts.base64(analysis_id, n))
+        pdf_renders = detector.artifacts.stats()['rendered'] - before
+        ok = ok and pdf_renders == 1
+        pdf_note = f"{pdf_renders} rendered ({len(pdf) / 1024:.0f} KB)"
+
+    payload = sum(len(v) for v in legacy.values())
+    image = artifacts.image()
+    raw = image_size(path)
+    stored = (f"{artifacts.size / 1024:.0f} KB {image.width}x{image.height} "
+              f"(raw {raw[0] * raw[1] * 3 / 1024 / 1024:.1f} MB)")
+    print(f"{name[:22]:22s} | {len(frames):6d} | {eager_ms:7.1f}ms | {lazy_ms:7.1f}ms | "
+          f"{payload / 1024:6.0f} KB | {hit_us:6.0f}µs | {stored:32s} | {'✅' if ok else '❌'}     | {pdf_note}")
+    return ok
+
+
+def run(paths) -> bool:
+    print(f"{'image':22s} | {'frames':>6} | {'eager':>9} | {'lazy':>9} | {'base64':>9} | {'hit':>8} | "
+          f"{'stored image':32s} | parity | PDF")
+    print("─" * 135)
+    all_ok = True
+    for path in paths:
+        all_ok = check(path) and all_ok
+    print(f"📊 Artifact store: {get_detector().artifacts.stats()}")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="+", help="images to analyze (with faces)")
+    args = parser.parse_args()
+
+    print("🚀 Lazy artifacts: on-demand rendering vs. eager encoding")
+    with contextlib.redirect_stdout(io.StringIO()):
+        get_detector().load_model()
+    ok = run(args.images)
+    print("✅ Artifacts match" if ok else "❌ Artifacts differ")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,100 @@
+"""
+Verification: JPEG bitstream parser vs. PIL.
+
+Usage:
+    python check_jpeg_bitstream.py                  # synthetic encodes
+    python check_jpeg_bitstream.py photo.jpg ...    # plus your own JPEGs
+
+For each file, compares the quantization tables, EXIF tags and progressive
+flag from parse_jpeg with what PIL reports after opening the image. For the
+synthetic encodes (libjpeg via PIL), it also checks that the estimated quality
+and standard-table flag equal the quality the file was saved with. Times the
+marker parse against a full PIL decode.
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+from PIL import Image
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from jpeg_bitstream import parse_jpeg
+
+
+def synthetic_cases():
+    """(name, bytes, saved quality or None) encoded with PIL's libjpeg."""
+    rng = np.random.default_rng(0)
+    yy, xx = np.mgrid[0:1080, 0:1440]
+    base = np.stack([xx / 1440 * 220, yy / 1080 * 200 + 20, np.full(xx.shape, 110.0)], axis=-1)
+    image = Image.fromarray(np.clip(base + rng.normal(0, 10, base.shape), 0, 255).astype(np.uint8))
+    exif = Image.Exif()
+    exif[0x010F], exif[0x0110], exif[0x0131] = "Canon", "EOS R5", "Adobe Photoshop 25.0"
+
+    cases = []
+    for name, quality, options in [
+        ("q30", 30, {}), ("q75", 75, {}), ("q95", 95, {}), ("q100", 100, {}),
+        ("q85 optimized", 85, {'optimize': True}), ("q90 progressive", 90, {'progressive': True}),
+        ("q80 4:4:4 + EXIF", 80, {'subsampling': 0, 'exif': exif.tobytes()}),
+        ("web_high tables", None, {'qtables': 'web_high'}),
+    ]:
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", **({'quality': quality} if quality else {}), **options)
+        cases.append((name, buffer.getvalue(), quality))
+    return cases
+
+
+def check(name: str, data: bytes, saved_quality, repeats: int) -> bool:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        stream = parse_jpeg(data)
+        details = stream.details()
+    parse_time = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    reference = Image.open(io.BytesIO(data))
+    reference.load()
+    decode_time = time.perf_counter() - start
+
+    ok = sorted(stream.quant_tables) == sorted(reference.quantization)
+    ok = ok and all(np.array_equal(stream.quant_tables[i], np.array(reference.quantization[i]))
+                    for i in reference.quantization)
+    ok = ok and dict(stream.exif()) == dict(reference.getexif())
+    ok = ok and stream.progressive == bool(reference.info.get('progressive'))
+    if saved_quality is not None:
+        ok = ok and details['estimated_quality'] == saved_quality and details['standard_tables']
+
+    print(f"{name[:22]:22s} | {details['process'][:11]:11s} | {str(details['estimated_quality']):>3} "
+          f"{'std' if details['standard_tables'] else 'cst'} | {parse_time*1e6:7.0f}µs | {decode_time*1000:7.1f}ms | "
+          f"{'✅' if ok else '❌'} {', '.join(details['resave_indicators'])}")
+    return ok
+
+
+def run(paths, repeats: int) -> bool:
+    print(f"{'file':22s} | {'process':11s} | {'quality':7s} | {'parse':>9} | {'decode':>9} | ok / re-save indicators")
+    print("─" * 96)
+    cases = synthetic_cases() + [(os.path.basename(p), open(p, "rb").read(), None) for p in paths]
+    all_ok = True
+    for name, data, quality in cases:
+        if parse_jpeg(data) is None:
+            print(f"{name[:22]:22s} | not a JPEG - skipped")
+            continue
+        all_ok = check(name, data, quality, repeats) and all_ok
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="additional JPEG files")
+    parser.add_argument("--repeats", type=int, default=50, help="timed parses per file")
+    args = parser.parse_args()
+
+    print("🚀 JPEG bitstream parser vs. PIL")
+    ok = run(args.images, args.repeats)
+    print("✅ Parser matches PIL" if ok else "❌ Parser differs from PIL")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,90 @@
+"""
+Parity check: ONNX Runtime backend vs. eager torch for the deepfake classifier.
+
+Usage:
+    python check_onnx_parity.py                  # fixtures from debug_images/
+    python check_onnx_parity.py img1.jpg img2.png --tolerance 1e-3
+
+Exports (or reuses) the cached ONNX artifact, classifies every fixture with
+both backends in one batch and compares the fake/real probabilities.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import torch
+from PIL import Image
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from model import DeepfakeDetector, ID2LABEL, MODEL_PATH, HUGGINGFACE_MODEL_ID
+from onnx_backend import load_onnx_classifier
+
+
+def default_fixtures():
+    debug_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug_images")
+    return sorted(glob.glob(os.path.join(debug_dir, "*.jpg")) + glob.glob(os.path.join(debug_dir, "*.png")))
+
+
+def run(paths, tolerance: float) -> bool:
+    detector = DeepfakeDetector()
+    detector.load_model()
+
+    model_source = MODEL_PATH if os.path.exists(MODEL_PATH) else HUGGINGFACE_MODEL_ID
+    image_size = getattr(getattr(detector.model.config, 'vision_config', detector.model.config), 'image_size', 384)
+    onnx = detector.onnx_classifier or load_onnx_classifier(detector.model, model_source, image_size)
+    if onnx is None:
+        print("❌ ONNX backend could not be loaded")
+        return False
+
+    images = [Image.open(p).convert("RGB") for p in paths]
+    pixel_values = detector.processor(images=images, return_tensors="pt")['pixel_values']
+
+    start = time.perf_counter()
+    with torch.no_grad():
+        torch_logits = detector.model(pixel_values=pixel_values.to(detector.device)).logits.cpu()
+    torch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    onnx_logits = onnx(pixel_values)
+    onnx_time = time.perf_counter() - start
+
+    torch_probs = torch.softmax(torch_logits, dim=1).numpy()
+    onnx_probs = torch.softmax(onnx_logits, dim=1).numpy()
+
+    print(f"{'fixture':40s} | {'torch fake':>10} | {'onnx fake':>10} | {'|Δ|':>9}")
+    print("─" * 80)
+    fake = [k for k, v in ID2LABEL.items() if v == 'fake'][0]
+    for path, tp, op in zip(paths, torch_probs, onnx_probs):
+        delta = float(np.abs(tp - op).max())
+        icon = "✅" if delta <= tolerance else "❌"
+        print(f"{os.path.basename(path)[:40]:40s} | {tp[fake]:10.4f} | {op[fake]:10.4f} | {delta:9.2e} {icon}")
+
+    max_delta = float(np.abs(torch_probs - onnx_probs).max())
+    labels_match = bool((torch_probs.argmax(1) == onnx_probs.argmax(1)).all())
+    print("─" * 80)
+    print(f"⏱️  torch {torch_time*1000:.0f} ms | onnx {onnx_time*1000:.0f} ms for {len(paths)} images (first call)")
+    print(f"📊 Max |Δp| = {max_delta:.2e} (tolerance {tolerance:.0e}), labels match: {labels_match}")
+    return max_delta <= tolerance and labels_match
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="fixture images (default: debug_images/*.jpg)")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="max allowed probability difference")
+    args = parser.parse_args()
+
+    paths = args.images or default_fixtures()
+    if not paths:
+        print("❌ No fixture images found")
+        sys.exit(1)
+
+    print(f"🚀 ONNX parity check on {len(paths)} fixtures")
+    ok = run(paths, args.tolerance)
+    print("✅ Parity OK" if ok else "❌ Parity mismatch")
+    sys.exit(0 if ok else 1)
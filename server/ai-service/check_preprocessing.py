@@ -0,0 +1,86 @@
+"""
+Verification: tensor-native preprocessing vs. AutoImageProcessor.
+
+Usage:
+    python check_preprocessing.py                 # debug_images/ + synthetic frames
+    python check_preprocessing.py img1.jpg --tolerance 1e-5
+
+Compares pixel_values from TensorPreprocessor.fill with the processor output
+for frames at the model resolution, frames that need resizing, and
+grayscale/RGBA inputs. Also times both paths.
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import AutoImageProcessor
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from model import MODEL_PATH, HUGGINGFACE_MODEL_ID
+from preprocessing import TensorPreprocessor
+
+
+def build_cases(paths, size):
+    """Named groups of PIL images covering each preprocessing branch."""
+    rng = np.random.default_rng(0)
+    height, width = size
+    native = [Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)) for _ in range(8)]
+    fixtures = [Image.open(p).convert("RGB") for p in paths]
+    return {
+        'native size (RGB)': native,
+        'fixtures (resized)': fixtures,
+        'grayscale / RGBA': [native[0].convert("L"), native[1].convert("RGBA")],
+    }
+
+
+def run(paths, tolerance: float) -> bool:
+    model_source = MODEL_PATH if os.path.exists(MODEL_PATH) else HUGGINGFACE_MODEL_ID
+    processor = AutoImageProcessor.from_pretrained(model_source)
+    preprocessor = TensorPreprocessor(processor)
+    if not preprocessor.supported:
+        print(f"❌ {type(processor).__name__} config is not supported by TensorPreprocessor")
+        return False
+
+    print(f"{'case':22s} | {'n':>3} | {'max |Δ|':>9} | {'processor':>10} | {'tensor':>8} | ok")
+    print("─" * 72)
+    all_ok = True
+    for name, images in build_cases(paths, preprocessor.size).items():
+        if not images:
+            continue
+        start = time.perf_counter()
+        expected = processor(images=images, return_tensors="pt")['pixel_values']
+        processor_time = time.perf_counter() - start
+
+        out = torch.empty((len(images), *preprocessor.shape), dtype=torch.float32)
+        start = time.perf_counter()
+        actual = preprocessor.fill(images, out)
+        tensor_time = time.perf_counter() - start
+
+        delta = float((expected - actual).abs().max()) if expected.shape == actual.shape else float('inf')
+        ok = delta <= tolerance
+        all_ok = all_ok and ok
+        print(f"{name:22s} | {len(images):3d} | {delta:9.2e} | {processor_time*1000:8.1f}ms | {tensor_time*1000:6.1f}ms | {'✅' if ok else '❌'}")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="fixture images (default: debug_images/*.jpg)")
+    parser.add_argument("--tolerance", type=float, default=1e-5, help="max allowed pixel_values difference")
+    args = parser.parse_args()
+
+    debug_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "debug_images")
+    paths = args.images or sorted(glob.glob(os.path.join(debug_dir, "*.jpg")))
+
+    print("🚀 Tensor preprocessing vs. AutoImageProcessor")
+    ok = run(paths, args.tolerance)
+    print("✅ Outputs match" if ok else "❌ Outputs differ")
+    sys.exit(0 if ok else 1)
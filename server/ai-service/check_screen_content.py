@@ -0,0 +1,214 @@
+"""
+Verification: block-vectorized, bounded-resolution screen-content check.
+
+Usage:
+    python check_screen_content.py                     # synthetic screens and scenes
+    python check_screen_content.py photo.jpg shot.png  # plus your own images
+
+For every image:
+- the original per-block loop (kept here as the reference) must match
+  detect_screen_content at full resolution (max_size=None) exactly
+- detect_screen_content at the default SCREEN_ANALYSIS_SIZE must reach the
+  same screen decision; indicators that flip are listed
+- the background grid of analyze_background_artifacts must match the
+  original cell loops
+
+Fails if a full-resolution result or a screen decision differs.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add the current directory to sys.path to import the service modules
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from model import get_detector, SCREEN_ANALYSIS_SIZE
+from ai_art_detector import analyze_background_artifacts
+
+
+def legacy_screen_content(image: Image.Image):
+    """Original detect_screen_content with its 32x32 block loop (reference implementation)."""
+    rgb = np.array(image.convert('RGB'))
+    gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    hsv = cv2.cvtColor(rgb, cv2.COLOR_RGB2HSV)
+    indicators = []
+    confidence = 0.0
+
+    _, bright_mask = cv2.threshold(gray, 180, 255, cv2.THRESH_BINARY)
+    bright_ratio = np.sum(bright_mask > 0) / bright_mask.size
+    if 0.05 < bright_ratio < 0.6:
+        contours, _ = cv2.findContours(bright_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        for cnt in contours:
+            if cv2.contourArea(cnt) > 5000:
+                x, y, w, h = cv2.boundingRect(cnt)
+                aspect = w / h if h > 0 else 0
+                if 1.2 < aspect < 2.5 or 0.4 < aspect < 0.85:
+                    indicators.append("rectangular_bright_area")
+                    confidence += 0.2
+                    break
+
+    high_sat_ratio = np.sum(hsv[:, :, 1] > 180) / hsv[:, :, 1].size
+    if high_sat_ratio > 0.08:
+        indicators.append("neon_colors")
+        confidence += 0.15
+
+    dark_ratio = np.sum(gray < 40) / gray.size
+    if dark_ratio > 0.4 and bright_ratio > 0.1:
+        indicators.append("dark_background_bright_spots")
+        confidence += 0.2
+
+    edges = cv2.Canny(gray, 50, 150)
+    edge_ratio = np.sum(edges > 0) / edges.size
+    if edge_ratio > 0.08:
+        indicators.append("high_edge_density")
+        confidence += 0.15
+
+    sobel_v = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+    sobel_h = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+    h_energy, v_energy = np.sum(np.abs(sobel_h)), np.sum(np.abs(sobel_v))
+    if max(h_energy, v_energy) / (min(h_energy, v_energy) + 1) > 1.8:
+        indicators.append("grid_pattern")
+        confidence += 0.1
+
+    block_size = 32
+    h, w = gray.shape
+    uniform_blocks = 0
+    total_blocks = 0
+    for y in range(0, h - block_size, block_size):
+        for x in range(0, w - block_size, block_size):
+            if np.std(gray[y:y+block_size, x:x+block_size]) < 10:
+                uniform_blocks += 1
+            total_blocks += 1
+    if total_blocks > 0 and uniform_blocks / total_blocks > 0.15:
+        indicators.append("uniform_color_blocks")
+        confidence += 0.15
+
+    is_screen = confidence >= 0.35 or len(indicators) >= 3
+    return is_screen, min(confidence, 0.95), {
+        'is_screen_content': is_screen,
+        'confidence': min(confidence, 0.95),
+        'indicators': indicators,
+        'bright_ratio': round(bright_ratio, 3),
+        'dark_ratio': round(dark_ratio, 3),
+        'edge_density': round(edge_ratio, 3),
+        'neon_ratio': round(high_sat_ratio, 3)
+    }
+
+
+def legacy_background_grid(image: Image.Image):
+    """Original analyze_background_artifacts cell loops: (edge densities, blur variances)."""
+    gray = cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2GRAY)
+    edges = cv2.Canny(gray, 50, 150)
+    grid_size = 8
+    h, w = gray.shape
+    cell_h, cell_w = h // grid_size, w // grid_size
+    blur_diff = np.abs(gray.astype(float) - cv2.GaussianBlur(gray, (11, 11), 0).astype(float))
+    densities, variances = [], []
+    for i in range(grid_size):
+        for j in range(grid_size):
+            cell = edges[i*cell_h:(i+1)*cell_h, j*cell_w:(j+1)*cell_w]
+            densities.append(np.sum(cell > 0) / cell.size)
+            variances.append(np.var(blur_diff[i*cell_h:(i+1)*cell_h, j*cell_w:(j+1)*cell_w]))
+    return {
+        'edge_density_std': round(float(np.std(densities)), 4),
+        'blur_variance_std': round(float(np.std(variances)), 4)
+    }
+
+
+def synthetic_screens(width: int, height: int, seed: int):
+    """Desk with a monitor, a code editor and a neon game HUD at the given size."""
+    rng = np.random.default_rng(seed)
+    s = width / 1280
+
+    desk = Image.new("RGB", (width, height), (14, 14, 20))
+    draw = ImageDraw.Draw(desk)
+    draw.rectangle((int(280 * s), int(160 * s), int(1000 * s), int(565 * s)), fill=(236, 238, 242))
+    for row in range(8):
+        y = int((220 + row * 42) * s)
+        draw.rectangle((int(300 * s), y, int(980 * s), y + int(30 * s)), outline=(190, 190, 198), fill=(255, 255, 255))
+    draw.rectangle((0, int(700 * s), width, int(730 * s)), fill=(255, 0, 200))
+
+    editor = Image.new("RGB", (width, height), (30, 30, 36))
+    draw = ImageDraw.Draw(editor)
+    draw.rectangle((0, 0, int(220 * s), height), fill=(37, 37, 45))
+    for line in range(int(height / (18 * s))):
+        y = int(line * 18 * s) + 4
+        x = int(240 * s)
+        for token in range(rng.integers(2, 9)):
+            length = int(rng.integers(20, 120) * s)
+            color = tuple(int(c) for c in rng.choice([(86, 156, 214), (206, 145, 120), (220, 220, 170), (200, 200, 200)]))
+            draw.rectangle((x, y, x + length, y + int(10 * s)), fill=color)
+            x += length + int(10 * s)
+
+    hud = np.zeros((height, width, 3), dtype=np.uint8)
+    hud[:] = (10, 5, 25)
+    hud[::max(1, int(40 * s)), :] = (0, 255, 240)
+    hud[:, ::max(1, int(40 * s))] = (255, 0, 180)
+    hud = np.clip(hud.astype(np.int16) + rng.integers(-6, 6, hud.shape), 0, 255).astype(np.uint8)
+
+    return [(f"desk {width}", desk), (f"editor {width}", editor), (f"neon hud {width}", Image.fromarray(hud))]
+
+
+def synthetic_scenes(width: int, height: int, seed: int):
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    sky = np.stack([xx / width * 60 + 90, yy / height * 80 + 120, np.full(xx.shape, 220.0)], axis=-1)
+    scene = np.clip(sky + rng.normal(0, 18, sky.shape), 0, 255).astype(np.uint8)
+    return [(f"scene {width}", Image.fromarray(scene))]
+
+
+def build_cases(paths):
+    cases = []
+    for width, height in ((1280, 800), (2560, 1600), (2560, 1440)):
+        cases += synthetic_screens(width, height, width + height)
+        cases += synthetic_scenes(width, height, width * height)
+    cases += [(os.path.basename(p), Image.open(p).convert("RGB")) for p in paths]
+    return cases
+
+
+def run(paths) -> bool:
+    detector = get_detector()
+    print(f"{'image':22s} | {'size':>9} | {'loop':>8} | {'full':>8} | {'bounded':>8} | full | screen | indicator changes")
+    print("─" * 100)
+    all_ok, decisions, flips = True, 0, 0
+    for name, image in build_cases(paths):
+        start = time.perf_counter()
+        legacy = legacy_screen_content(image)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = detector.detect_screen_content(image, max_size=None)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        bounded = detector.detect_screen_content(image)
+        bounded_time = time.perf_counter() - start
+
+        full_ok = full == legacy and analyze_background_artifacts(image).details['grid_analysis'] == legacy_background_grid(image)
+        same_decision = bounded[0] == legacy[0]
+        changed = sorted(set(bounded[2]['indicators']) ^ set(legacy[2]['indicators']))
+        all_ok = all_ok and full_ok and same_decision
+        decisions += 1
+        flips += len(changed)
+        print(f"{name[:22]:22s} | {image.width:4d}x{image.height:<4d} | {legacy_time*1000:6.0f}ms | {full_time*1000:6.0f}ms | "
+              f"{bounded_time*1000:6.0f}ms | {'✅' if full_ok else '❌'}   | {'✅' if same_decision else '❌'} "
+              f"{'screen' if bounded[0] else 'other':6s} | {', '.join(changed) or '-'}")
+    print(f"📊 {decisions} image(s), {flips} indicator change(s) at SCREEN_ANALYSIS_SIZE={SCREEN_ANALYSIS_SIZE}")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", help="additional images to check")
+    args = parser.parse_args()
+
+    print("🚀 Screen-content check: block loop vs. vectorized / bounded resolution")
+    ok = run(args.images)
+    print("✅ Decisions match" if ok else "❌ Decisions differ")
+    sys.exit(0 if ok else 1)
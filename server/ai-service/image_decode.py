@@ -0,0 +1,110 @@
+"""
+Image Decode Module for TrueVibe AI Service
+Decode-time downscaling to the working resolution (MAX_IMAGE_SIZE).
+
+JPEGs are decoded in PIL draft mode, which lets libjpeg scale by 1/2, 1/4
+or 1/8 in the DCT domain (never below the target), so a 50 MP phone photo
+is not fully decoded just to be shrunk; one high-quality resize then hits
+the target exactly. EXIF is captured from the original before anything
+is discarded, and analyzers that depend on native pixels (JPEG block grid,
+face-border gradients) can still read full-resolution regions.
+"""
+
+from io import BytesIO
+from threading import Lock
+from typing import Optional, Tuple
+
+from PIL import Image
+
+JPEG_BLOCK = 8
+
+
+class DecodedImage:
+    """Working-resolution RGB image plus the original's metadata and pixels."""
+
+    def __init__(self, image: Image.Image, source: bytes, original_size: Tuple[int, int],
+                 exif: Image.Exif, format: Optional[str]):
+        self.image = image
+        self.original_size = original_size
+        self.exif = exif
+        self.format = format
+        self._source = source
+        self._full: Optional[Image.Image] = None
+        self._full_lock = Lock()
+
+    @property
+    def source(self) -> bytes:
+        """Encoded bytes the image was decoded from."""
+        return self._source
+
+    @property
+    def scale(self) -> float:
+        """Original pixels per working pixel (1.0 when not downscaled)."""
+        return self.original_size[0] / self.image.size[0]
+
+    @property
+    def downscaled(self) -> bool:
+        return self.image.size != self.original_size
+
+    def _full_image(self) -> Image.Image:
+        # Decoded on first use and kept until release(); the lock keeps
+        # concurrent analyzers (compression, blending) from decoding it twice
+        with self._full_lock:
+            if self._full is None:
+                self._full = Image.open(BytesIO(self._source)).convert("RGB")
+            return self._full
+
+    def roi(self, box: Tuple[int, int, int, int], align: int = 1) -> Image.Image:
+        """
+        Native-resolution crop of a box given in working-image coordinates.
+
+        Args:
+            box: (left, top, right, bottom) on the working image
+            align: Snap the native origin down to this grid (8 keeps JPEG blocks aligned)
+        """
+        if not self.downscaled:
+            return self.image.crop(box)
+        scale = self.scale
+        left, top = int(box[0] * scale) // align * align, int(box[1] * scale) // align * align
+        right = min(self.original_size[0], int(round(box[2] * scale)))
+        bottom = min(self.original_size[1], int(round(box[3] * scale)))
+        return self._full_image().crop((left, top, right, bottom))
+
+    def native_center(self, max_side: int) -> Image.Image:
+        """
+        Working image when not downscaled, otherwise a native-resolution
+        center crop of at most `max_side` pixels, aligned to the JPEG grid.
+        """
+        if not self.downscaled:
+            return self.image
+        width, height = self.original_size
+        crop_w, crop_h = min(width, max_side), min(height, max_side)
+        left = (width - crop_w) // 2 // JPEG_BLOCK * JPEG_BLOCK
+        top = (height - crop_h) // 2 // JPEG_BLOCK * JPEG_BLOCK
+        return self._full_image().crop((left, top, left + crop_w, top + crop_h))
+
+    def release(self) -> None:
+        """Drop the full-resolution decode (if any was needed)."""
+        self._full = None
+
+
+def decode_image(data: bytes, max_size: int) -> DecodedImage:
+    """Decode image bytes to RGB with the longer side limited to `max_size`."""
+    image = Image.open(BytesIO(data))
+    original_size = image.size
+    image_format = image.format
+    exif = image.getexif()  # Before draft/convert/resize can drop it
+
+    width, height = original_size
+    target = None
+    if max(width, height) > max_size:
+        ratio = max_size / max(width, height)
+        target = (max(1, round(width * ratio)), max(1, round(height * ratio)))
+        if image_format == "JPEG":
+            # DCT-domain reduction to the smallest scale still >= target
+            image.draft("RGB", target)
+
+    image = image.convert("RGB")
+    if target is not None and image.size != target:
+        image = image.resize(target, Image.LANCZOS)
+    return DecodedImage(image, data, original_size, exif, image_format)
@@ -0,0 +1,149 @@
+"""
+Image Features Module for TrueVibe AI Service
+Per-image cache of the derived planes the forensic analyzers share.
+
+Screen, filter, stylization, face-type and AI-art analyzers each used to
+convert the same image to grayscale, HSV and LAB and run Sobel, Canny,
+Laplacian and FFT on it again. An ImageFeatures object computes each plane
+lazily on first request and hands the same (read-only) array to every later
+caller; the computed / reused counts are reported with the analysis.
+
+Block-level analyzers (uniform blocks, grid statistics) use block_moments,
+which reduces all blocks of a plane in one reshape instead of a Python loop.
+"""
+
+from threading import Lock
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+except ImportError:  # Analyzers check their own CV2_AVAILABLE before asking for planes
+    cv2 = None
+
+
+def block_view(plane: np.ndarray, block_h: int, block_w: int) -> np.ndarray:
+    """
+    (rows, block_h, cols, block_w) view of the whole blocks tiling a 2-D
+    plane from the top-left corner; partial blocks at the right and bottom
+    edges are left out.
+    """
+    rows, cols = plane.shape[0] // block_h, plane.shape[1] // block_w
+    return plane[:rows * block_h, :cols * block_w].reshape(rows, block_h, cols, block_w)
+
+
+def block_moments(plane: np.ndarray, block_h: int, block_w: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and (population) variance of every whole block of a 2-D plane,
+    as (rows, cols) arrays - what np.mean / np.var give per block.
+
+    Integer and boolean planes are summed in int64, so their moments are
+    exact (the variance is the correctly rounded n*sum(x^2) - sum(x)^2 over n^2).
+    """
+    block_w = block_w or block_h
+    blocks = block_view(plane, block_h, block_w)
+    n = block_h * block_w
+    if plane.dtype == bool or np.issubdtype(plane.dtype, np.integer):
+        sums = blocks.sum(axis=(1, 3), dtype=np.int64)
+        squares = np.einsum('iajb,iajb->ij', blocks, blocks, dtype=np.int64)
+        return sums / n, (n * squares - sums * sums) / (n * n)
+    mean = blocks.mean(axis=(1, 3))
+    variance = ((blocks - mean[:, None, :, None]) ** 2).mean(axis=(1, 3))
+    return mean, variance
+
+
+class ImageFeatures:
+    """
+    Lazily evaluated feature planes of one RGB image.
+
+    Planes are identical to what the analyzers computed inline (cv2 color
+    conversions of the uint8 RGB array, CV_64F Sobel/Laplacian), so sharing
+    them does not change any score. Arrays are marked read-only; analyzers
+    must copy before modifying.
+    """
+
+    def __init__(self, image: Image.Image, stats: Optional[Dict[str, int]] = None):
+        self.image = image
+        self.stats = stats if stats is not None else {'computed': 0, 'reused': 0}
+        self._planes: Dict[Hashable, object] = {}
+        self._locks: Dict[Hashable, Lock] = {}
+        self._lock = Lock()
+
+    def derive(self, image: Image.Image) -> 'ImageFeatures':
+        """Features for an image cut from this one (e.g. a face crop), counted in the same stats."""
+        return ImageFeatures(image, self.stats)
+
+    def _plane(self, key: Hashable, compute: Callable[[], object]):
+        # One lock per plane: concurrent analyzers wait for a plane in progress
+        # instead of computing it twice, while other planes proceed
+        with self._lock:
+            lock = self._locks.setdefault(key, Lock())
+        with lock:
+            plane = self._planes.get(key)
+            if plane is None:
+                plane = compute()
+                for array in (plane if isinstance(plane, tuple) else (plane,)):
+                    array.setflags(write=False)
+                self._planes[key] = plane
+                counter = 'computed'
+            else:
+                counter = 'reused'
+        with self._lock:
+            self.stats[counter] += 1
+        return plane
+
+    @property
+    def rgb(self) -> np.ndarray:
+        return self._plane('rgb', lambda: np.array(self.image.convert('RGB')))
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self._plane('gray', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2GRAY))
+
+    @property
+    def hsv(self) -> np.ndarray:
+        return self._plane('hsv', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2HSV))
+
+    @property
+    def lab(self) -> np.ndarray:
+        return self._plane('lab', lambda: cv2.cvtColor(self.rgb, cv2.COLOR_RGB2LAB))
+
+    @property
+    def laplacian(self) -> np.ndarray:
+        """CV_64F Laplacian of the grayscale plane."""
+        return self._plane('laplacian', lambda: cv2.Laplacian(self.gray, cv2.CV_64F))
+
+    def sobel(self, ksize: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """(d/dx, d/dy) CV_64F Sobel derivatives of the grayscale plane."""
+        return self._plane(('sobel', ksize), lambda: (
+            cv2.Sobel(self.gray, cv2.CV_64F, 1, 0, ksize=ksize),
+            cv2.Sobel(self.gray, cv2.CV_64F, 0, 1, ksize=ksize),
+        ))
+
+    def gradient_magnitude(self, ksize: int = 3) -> np.ndarray:
+        def compute():
+            sobel_x, sobel_y = self.sobel(ksize)
+            return np.sqrt(sobel_x**2 + sobel_y**2)
+        return self._plane(('gradient', ksize), compute)
+
+    def canny(self, low: int, high: int, color: bool = False) -> np.ndarray:
+        """Canny edges of the grayscale plane, or of the RGB array with `color`."""
+        return self._plane(('canny', low, high, color),
+                           lambda: cv2.Canny(self.rgb if color else self.gray, low, high))
+
+    def gray_block_moments(self, block_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-block mean and variance of the grayscale plane (see block_moments)."""
+        return self._plane(('gray_blocks', block_size), lambda: block_moments(self.gray, block_size))
+
+    @property
+    def fft_magnitude(self) -> np.ndarray:
+        """|FFT| of the grayscale plane, shifted so DC is at (h // 2, w // 2)."""
+        return self._plane('fft_magnitude', lambda: np.fft.fftshift(np.abs(np.fft.fft2(self.gray))))
+
+    def release(self) -> None:
+        """Drop the cached planes (the counters are kept)."""
+        with self._lock:
+            self._planes.clear()
+            self._locks.clear()
@@ -0,0 +1,142 @@
+"""
+Bounded Inference Executor for TrueVibe AI Service
+Runs blocking detector work (download, OpenCV, torch) off the asyncio event loop.
+
+A fixed number of worker threads ("slots") execute jobs; up to `queue_size`
+further jobs may wait for a slot. Anything beyond that is rejected immediately
+with ExecutorSaturated so the API can answer 429 + Retry-After instead of
+letting callers time out.
+"""
+
+import os
+import math
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+
+# Executor configuration
+INFERENCE_SLOTS = int(os.environ.get("INFERENCE_SLOTS", "1"))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", "4"))
+INFERENCE_RETRY_AFTER = int(os.environ.get("INFERENCE_RETRY_AFTER", "30"))  # Seconds, used until timings exist
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every slot is busy and the wait queue is full."""
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue full - retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """Thread pool with a bounded admission queue and simple timing stats."""
+
+    def __init__(self, slots: int = INFERENCE_SLOTS, queue_size: int = INFERENCE_QUEUE_SIZE,
+                 default_retry_after: int = INFERENCE_RETRY_AFTER):
+        self.slots = max(1, slots)
+        self.queue_size = max(0, queue_size)
+        self._default_retry_after = max(1, default_retry_after)
+        self._pool = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="inference")
+        self._lock = Lock()
+
+        self._admitted = 0  # Running + waiting jobs
+        self._running = 0
+        self._avg_job_seconds: Optional[float] = None
+
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+        }
+
+    @property
+    def capacity(self) -> int:
+        return self.slots + self.queue_size
+
+    def retry_after(self) -> int:
+        """Estimate seconds until a queue position frees up."""
+        with self._lock:
+            avg = self._avg_job_seconds
+            waiting = max(0, self._admitted - self.slots)
+        if avg is None:
+            return self._default_retry_after
+        return int(min(300, max(1, math.ceil(avg * (waiting + 1) / self.slots))))
+
+    def ensure_capacity(self) -> None:
+        """
+        Fail fast before doing preparatory work (e.g. downloads) for a job that
+        would be rejected anyway. Does not reserve a slot.
+
+        Raises:
+            ExecutorSaturated: if all slots are busy and the wait queue is full
+        """
+        with self._lock:
+            saturated = self._admitted >= self.capacity
+            if saturated:
+                self._stats['rejected'] += 1
+        if saturated:
+            raise ExecutorSaturated(self.retry_after())
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` on an inference slot and await its result.
+
+        Raises:
+            ExecutorSaturated: if all slots are busy and the wait queue is full
+        """
+        with self._lock:
+            if self._admitted >= self.capacity:
+                self._stats['rejected'] += 1
+                saturated = True
+            else:
+                self._admitted += 1
+                self._stats['submitted'] += 1
+                saturated = False
+        if saturated:
+            raise ExecutorSaturated(self.retry_after())
+
+        future = self._pool.submit(self._execute, fn, args, kwargs)
+        # Release the admission slot when the job finishes or is cancelled before starting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _execute(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._stats['completed' if ok else 'failed'] += 1
+                # Exponential moving average of job duration for Retry-After
+                if self._avg_job_seconds is None:
+                    self._avg_job_seconds = elapsed
+                else:
+                    self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def stats(self) -> dict:
+        """Snapshot of slot usage and counters for /health."""
+        with self._lock:
+            return {
+                'slots': self.slots,
+                'queue_size': self.queue_size,
+                'running': self._running,
+                'waiting': max(0, self._admitted - self._running),
+                'avg_job_seconds': round(self._avg_job_seconds, 3) if self._avg_job_seconds is not None else None,
+                **self._stats,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
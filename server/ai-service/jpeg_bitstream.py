@@ -0,0 +1,289 @@
+"""
+JPEG Bitstream Module for TrueVibe AI Service
+Forensic facts read from the JPEG marker segments, without decoding pixels.
+
+Walks the segments between SOI and the first SOS (quantization and Huffman
+tables, frame header, APP/COM segments) and reports:
+- the encoder quality estimated from the quantization tables, and whether
+  they are the standard IJG (libjpeg) tables at that quality
+- progressive / optimized-Huffman coding and chroma subsampling
+- the EXIF and XMP payloads, so metadata analysis needs no decoded image
+- indicators that the file was re-saved after capture (editor segments,
+  edit history, camera EXIF in a libjpeg-encoded file, web re-encoding)
+The entropy-coded data is never touched, so a parse takes microseconds
+regardless of the image size.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import ExifTags, Image
+
+# Annex K.1 / K.2 quantization tables (natural order), scaled by libjpeg's quality setting
+STANDARD_LUMINANCE_TABLE = np.array([
+    16, 11, 10, 16, 24, 40, 51, 61,
+    12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56,
+    14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77,
+    24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101,
+    72, 92, 95, 98, 112, 100, 103, 99,
+], dtype=np.int32)
+STANDARD_CHROMINANCE_TABLE = np.full(64, 99, dtype=np.int32)
+STANDARD_CHROMINANCE_TABLE[[0, 1, 2, 3, 8, 9, 10, 11, 16, 17, 18, 24, 25]] = [
+    17, 18, 24, 47, 18, 21, 26, 66, 24, 26, 56, 47, 66]
+
+# Annex K.3 - K.6 Huffman code-length counts (what encoders without optimization write)
+STANDARD_HUFFMAN_COUNTS = {
+    (0, 1, 5, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0),        # DC luminance
+    (0, 3, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0),        # DC chrominance
+    (0, 2, 1, 3, 3, 2, 4, 3, 5, 5, 4, 4, 0, 0, 1, 0x7d),     # AC luminance
+    (0, 2, 1, 2, 4, 4, 3, 4, 7, 5, 4, 4, 0, 1, 2, 0x77),     # AC chrominance
+}
+
+# Position in the 8x8 block (row-major) of each coefficient in zigzag (file) order
+ZIGZAG = np.array(sorted(range(64), key=lambda i: (i // 8 + i % 8, (i // 8) if (i // 8 + i % 8) % 2 else (i % 8))))
+
+SOF_PROCESSES = {
+    0xC0: 'baseline', 0xC1: 'extended', 0xC2: 'progressive', 0xC3: 'lossless',
+    0xC5: 'hierarchical', 0xC6: 'hierarchical', 0xC7: 'hierarchical',
+    0xC9: 'extended', 0xCA: 'progressive', 0xCB: 'lossless',  # Arithmetic coding
+    0xCD: 'hierarchical', 0xCE: 'hierarchical', 0xCF: 'hierarchical',
+}
+
+EXIF_HEADER = b"Exif\x00\x00"
+XMP_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+
+_XMP_ORIENTATION = re.compile(rb'tiff:Orientation(="|>)([0-9])')
+_XMP_TOOLS = re.compile(rb'(?:CreatorTool|softwareAgent)(?:="|>)([^"<]+)')
+
+
+def _scaled_tables(base: np.ndarray) -> np.ndarray:
+    """base scaled for libjpeg quality 1..100 (row q - 1), baseline-clamped to 1..255."""
+    quality = np.arange(1, 101)
+    scale = np.where(quality < 50, 5000 // quality, 200 - quality * 2)
+    return np.clip((base[None, :] * scale[:, None] + 50) // 100, 1, 255)
+
+
+_LUMINANCE_BY_QUALITY = _scaled_tables(STANDARD_LUMINANCE_TABLE)
+_CHROMINANCE_BY_QUALITY = _scaled_tables(STANDARD_CHROMINANCE_TABLE)
+
+
+def estimate_quality(table: np.ndarray, chroma: bool = False) -> Tuple[int, bool]:
+    """Closest libjpeg quality for a quantization table and whether it matches exactly."""
+    candidates = _CHROMINANCE_BY_QUALITY if chroma else _LUMINANCE_BY_QUALITY
+    distance = np.abs(candidates - table[None, :]).sum(axis=1)
+    best = int(np.argmin(distance))
+    return best + 1, bool(distance[best] == 0)
+
+
+class JpegBitstream:
+    """Marker-level description of one JPEG file (see parse_jpeg)."""
+
+    def __init__(self):
+        self.process: Optional[str] = None
+        self.size: Optional[Tuple[int, int]] = None
+        self.components: List[Tuple[int, int, int, int]] = []  # (id, h, v, quant table)
+        self.quant_tables: Dict[int, np.ndarray] = {}  # Natural order
+        self.huffman_counts: List[Tuple[int, ...]] = []
+        self.restart_interval = 0
+        self.segments: List[str] = []
+        self.exif_payload: Optional[bytes] = None  # As PIL's info['exif']
+        self.xmp: Optional[bytes] = None
+        self.comments: List[str] = []
+        self._exif: Optional[Image.Exif] = None
+
+    @property
+    def progressive(self) -> bool:
+        return self.process == 'progressive'
+
+    @property
+    def optimized_huffman(self) -> bool:
+        return any(counts not in STANDARD_HUFFMAN_COUNTS for counts in self.huffman_counts)
+
+    @property
+    def subsampling(self) -> Optional[str]:
+        if len(self.components) != 3:
+            return None
+        (_, h0, v0, _), (_, h1, v1, _) = self.components[:2]
+        ratio = (h0 // max(h1, 1), v0 // max(v1, 1))
+        return {(1, 1): '4:4:4', (2, 1): '4:2:2', (2, 2): '4:2:0', (4, 1): '4:1:1', (1, 2): '4:4:0'}.get(
+            ratio, f"{h0}x{v0},{h1}x{v1}")
+
+    def _component_table(self, index: int) -> Optional[np.ndarray]:
+        if index >= len(self.components):
+            return None
+        return self.quant_tables.get(self.components[index][3])
+
+    def quality(self) -> Tuple[Optional[int], bool]:
+        """Estimated quality (from the luminance table) and whether all tables are standard IJG tables."""
+        luminance = self._component_table(0)
+        if luminance is None:
+            return None, False
+        quality, standard = estimate_quality(luminance)
+        chrominance = self._component_table(1)
+        if chrominance is not None:
+            chroma_quality, chroma_standard = estimate_quality(chrominance, chroma=True)
+            standard = standard and chroma_standard and chroma_quality == quality
+        return quality, standard
+
+    def exif(self) -> Image.Exif:
+        """EXIF tags as PIL's getexif() returns them for the decoded file."""
+        if self._exif is None:
+            exif = Image.Exif()
+            if self.exif_payload:
+                try:
+                    exif.load(self.exif_payload)
+                except Exception:
+                    exif = Image.Exif()  # Corrupt TIFF structure - treat as unreadable
+            if ExifTags.Base.Orientation not in exif and self.xmp:
+                # PIL falls back to the XMP orientation the same way
+                match = _XMP_ORIENTATION.search(self.xmp)
+                if match:
+                    exif[ExifTags.Base.Orientation] = int(match[2])
+            self._exif = exif
+        return self._exif
+
+    def xmp_tools(self) -> List[str]:
+        """Creator tool and edit-history software agents named in the XMP packet."""
+        if not self.xmp:
+            return []
+        tools = []
+        for match in _XMP_TOOLS.finditer(self.xmp):
+            tool = match[1].decode('utf-8', 'replace').strip()
+            if tool and tool not in tools:
+                tools.append(tool)
+        return tools
+
+    def resave_indicators(self) -> List[str]:
+        """Signs that the file was encoded again after capture."""
+        indicators = []
+        quality, standard = self.quality()
+        exif = self.exif()
+        if standard and (ExifTags.Base.Make in exif or ExifTags.Base.Model in exif):
+            # Camera firmware uses its own tables; libjpeg tables mean a software encoder
+            indicators.append('camera_exif_with_libjpeg_tables')
+        if 'Photoshop' in self.segments or 'Adobe' in self.segments:
+            indicators.append('adobe_segments')
+        if self.xmp and b'xmpMM:History' in self.xmp:
+            indicators.append('xmp_edit_history')
+        if self.progressive:
+            indicators.append('progressive_reencode')
+        elif self.optimized_huffman:
+            indicators.append('optimized_huffman')
+        return indicators
+
+    def details(self) -> dict:
+        """JSON-serializable summary for the analysis response."""
+        quality, standard = self.quality()
+        indicators = self.resave_indicators()
+        return {
+            'process': self.process,
+            'estimated_quality': quality,
+            'standard_tables': standard,
+            'quant_tables': len(self.quant_tables),
+            'optimized_huffman': self.optimized_huffman,
+            'subsampling': self.subsampling,
+            'restart_interval': self.restart_interval,
+            'segments': self.segments,
+            'has_exif': bool(self.exif_payload),
+            'has_xmp': bool(self.xmp),
+            'xmp_tools': self.xmp_tools(),
+            'comments': [c[:100] for c in self.comments],
+            'resave_indicators': indicators,
+            'likely_resaved': bool(indicators),
+        }
+
+
+def _parse_dqt(segment: bytes, stream: JpegBitstream) -> None:
+    offset = 0
+    while offset < len(segment):
+        precision, table_id = segment[offset] >> 4, segment[offset] & 0x0F
+        width = 2 if precision else 1
+        raw = segment[offset + 1:offset + 1 + 64 * width]
+        if len(raw) < 64 * width:
+            return
+        values = np.frombuffer(raw, dtype='>u2' if width == 2 else np.uint8).astype(np.int32)
+        table = np.empty(64, dtype=np.int32)
+        table[ZIGZAG] = values
+        stream.quant_tables[table_id] = table
+        offset += 1 + 64 * width
+
+
+def _parse_dht(segment: bytes, stream: JpegBitstream) -> None:
+    offset = 0
+    while offset + 17 <= len(segment):
+        counts = tuple(segment[offset + 1:offset + 17])
+        stream.huffman_counts.append(counts)
+        offset += 17 + sum(counts)
+
+
+def _parse_sof(marker: int, segment: bytes, stream: JpegBitstream) -> None:
+    stream.process = SOF_PROCESSES[marker]
+    if len(segment) < 6:
+        return
+    height, width, count = int.from_bytes(segment[1:3], 'big'), int.from_bytes(segment[3:5], 'big'), segment[5]
+    stream.size = (width, height)
+    for i in range(count):
+        component = segment[6 + 3 * i:9 + 3 * i]
+        if len(component) == 3:
+            stream.components.append((component[0], component[1] >> 4, component[1] & 0x0F, component[2]))
+
+
+def _parse_app(marker: int, segment: bytes, stream: JpegBitstream) -> None:
+    # Same identification and EXIF/XMP handling as PIL's JpegImagePlugin
+    if marker == 0xE0 and segment.startswith(b"JFIF"):
+        stream.segments.append('JFIF')
+    elif marker == 0xE1 and segment.startswith(EXIF_HEADER):
+        stream.segments.append('Exif')
+        stream.exif_payload = segment if stream.exif_payload is None else stream.exif_payload + segment[6:]
+    elif marker == 0xE1 and segment.startswith(XMP_HEADER):
+        stream.segments.append('XMP')
+        stream.xmp = segment.split(b"\x00", 1)[1]
+    elif marker == 0xE2 and segment.startswith(b"ICC_PROFILE\x00"):
+        stream.segments.append('ICC')
+    elif marker == 0xED and segment.startswith(b"Photoshop 3.0\x00"):
+        stream.segments.append('Photoshop')
+    elif marker == 0xEE and segment.startswith(b"Adobe"):
+        stream.segments.append('Adobe')
+    else:
+        stream.segments.append(f"APP{marker & 0x0F}")
+
+
+def parse_jpeg(data: bytes) -> Optional[JpegBitstream]:
+    """Parse the marker segments of a JPEG up to the first scan; None if `data` is not a JPEG."""
+    if not data.startswith(b'\xff\xd8'):
+        return None
+    stream = JpegBitstream()
+    pos, end = 2, len(data)
+    while pos + 4 <= end:
+        if data[pos] != 0xFF:
+            break  # Corrupt or truncated header - keep what was parsed
+        marker = data[pos + 1]
+        if marker == 0xFF:  # Fill byte
+            pos += 1
+            continue
+        pos += 2
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # Standalone markers
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / SOS: the tables for the image are known
+            break
+        length = int.from_bytes(data[pos:pos + 2], 'big')
+        segment = data[pos + 2:pos + length]
+        pos += length
+
+        if marker == 0xDB:
+            _parse_dqt(segment, stream)
+        elif marker == 0xC4:
+            _parse_dht(segment, stream)
+        elif marker in SOF_PROCESSES:
+            _parse_sof(marker, segment, stream)
+        elif marker == 0xDD and len(segment) >= 2:
+            stream.restart_interval = int.from_bytes(segment[:2], 'big')
+        elif 0xE0 <= marker <= 0xEF:
+            _parse_app(marker, segment, stream)
+        elif marker == 0xFE:
+            stream.comments.append(segment.decode('latin-1').strip('\x00 \r\n'))
+    return stream
@@ -11,19 +11,24 @@ Security Hardening:
 
 import os
 import time
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, HttpUrl
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable
 import traceback
 import hashlib
 import time
 from functools import lru_cache
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from threading import Lock
 import numpy as np
 
+from result_store import ResultStore, create_result_store
+
 
 def convert_numpy_types(obj: Any) -> Any:
     """
@@ -46,52 +51,122 @@ def convert_numpy_types(obj: Any) -> Any:
         return obj
 
 
-# Simple in-memory cache with TTL for analysis results
+# Two-level cache with TTL for analysis results
 class AnalysisCache:
-    """Thread-safe in-memory cache with TTL for analysis results."""
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 3600):
-        self._cache: Dict[str, tuple] = {}  # {hash: (result, timestamp)}
+    """
+    Thread-safe two-level cache with TTL for analysis results.
+    
+    Level 1 maps a normalized URL (see normalize_url) to the sha256 of the
+    media it served (computed while streaming, see media_ingest.py).
+    Level 2 maps that content hash to the analysis result, so different URLs
+    for the same bytes (Cloudinary transformations, re-signed links) share
+    one result. Entries live in a ResultStore (in-memory or SQLite,
+    see RESULT_CACHE_BACKEND); hit counters are per process.
+    """
+    def __init__(self, store: ResultStore, ttl_seconds: int = 3600):
+        self._store = store
         self._lock = Lock()
-        self._max_size = max_size
         self._ttl = ttl_seconds
+        self._stats = {'url_hits': 0, 'url_misses': 0, 'content_hits': 0, 'content_misses': 0}
+    
+    # Query parameters that only sign or expire a link (S3, GCS, CloudFront, Azure SAS)
+    SIGNATURE_PARAMS = {'signature', 'expires', 'awsaccesskeyid', 'policy', 'key-pair-id',
+                        'sig', 'se', 'st', 'sp', 'sv', 'sr', 'spr'}
+    SIGNATURE_PREFIXES = ('x-amz-', 'x-goog-')
+    
+    @classmethod
+    def normalize_url(cls, url: str) -> str:
+        """
+        Level-1 key: lowercase scheme and host, no fragment, no signing parameters.
+        
+        Cloudinary query strings only carry signing/analytics parameters and are
+        dropped entirely; elsewhere the remaining parameters may select the
+        content (?id=...), so they are kept in a canonical order.
+        """
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        # Exact domain match - lookalike hosts (evilcloudinary.com) keep their query
+        hostname = parts.hostname or ''
+        if hostname == 'cloudinary.com' or hostname.endswith('.cloudinary.com'):
+            query = ''
+        else:
+            params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                      if k.lower() not in cls.SIGNATURE_PARAMS and not k.lower().startswith(cls.SIGNATURE_PREFIXES)]
+            query = urlencode(sorted(params))
+        return urlunsplit((parts.scheme.lower(), host, parts.path or '/', query, ''))
     
     def _hash_url(self, url: str) -> str:
         return hashlib.md5(url.encode()).hexdigest()
     
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+    
     def get(self, url: str) -> Optional[Dict]:
-        """Get cached result if exists and not expired."""
+        """Get cached result for a URL (level 1 -> level 2) if exists and not expired."""
         key = self._hash_url(url)
-        with self._lock:
-            if key in self._cache:
-                result, timestamp = self._cache[key]
-                if time.time() - timestamp < self._ttl:
-                    return result
-                else:
-                    del self._cache[key]
+        content_hash = self._store.get_index(key, self._ttl)
+        if content_hash is not None:
+            result = self._store.get_result(content_hash, self._ttl)
+            if result is not None:
+                self._count('url_hits')
+                return result
+            self._store.delete_index(key)
+        self._count('url_misses')
         return None
     
-    def set(self, url: str, result: Dict) -> None:
-        """Cache a result with current timestamp."""
-        key = self._hash_url(url)
-        with self._lock:
-            # Evict oldest entries if cache is full
-            if len(self._cache) >= self._max_size:
-                oldest_key = min(self._cache, key=lambda k: self._cache[k][1])
-                del self._cache[oldest_key]
-            self._cache[key] = (result, time.time())
+    def get_content(self, content_hash: str) -> Optional[Dict]:
+        """Get cached result for downloaded bytes (level 2) after a URL miss."""
+        result = self._store.get_result(content_hash, self._ttl)
+        self._count('content_hits' if result is not None else 'content_misses')
+        return result
+    
+    def link(self, url: str, content_hash: str) -> None:
+        """Point a URL at known content (level 1 only)."""
+        self._store.set_index(self._hash_url(url), content_hash)
+    
+    def set(self, url: str, content_hash: str, result: Dict) -> None:
+        """Cache a result for its content and index the URL it came from."""
+        self._store.set_result(content_hash, result)
+        self.link(url, content_hash)
     
     def invalidate(self, url: str) -> None:
-        """Remove a specific URL from cache."""
-        key = self._hash_url(url)
+        """Remove a specific URL and the result of the content it pointed to."""
+        content_hash = self._store.delete_index(self._hash_url(url))
+        if content_hash is not None:
+            self._store.delete_result(content_hash)
+    
+    def stats(self) -> dict:
+        """Store sizes and per-level hit ratios for /health."""
         with self._lock:
-            self._cache.pop(key, None)
+            counters = dict(self._stats)
+        url_lookups = counters['url_hits'] + counters['url_misses']
+        content_lookups = counters['content_hits'] + counters['content_misses']
+        total_hits = counters['url_hits'] + counters['content_hits']
+        return {
+            **self._store.stats(),
+            **counters,
+            'url_hit_ratio': round(counters['url_hits'] / url_lookups, 3) if url_lookups else 0.0,
+            'content_hit_ratio': round(counters['content_hits'] / content_lookups, 3) if content_lookups else 0.0,
+            'overall_hit_ratio': round(total_hits / url_lookups, 3) if url_lookups else 0.0,
+        }
 
 # Global cache instance
-analysis_cache = AnalysisCache(max_size=100, ttl_seconds=3600)  # 1 hour TTL
+analysis_cache = AnalysisCache(create_result_store(max_results=100), ttl_seconds=3600)  # 1 hour TTL
 
 from model import get_detector, DEBUG_DIR
+from inference_executor import InferenceExecutor, ExecutorSaturated
+from single_flight import SingleFlight
+from media_downloader import DownloadTooLarge
+from media_ingest import IngestedMedia, UnsupportedMediaType
 from llm_service import generate_report, AIReport, generate_caption, suggest_hashtags, generate_post_ideas
 
+# Bounded executor for blocking detector work (INFERENCE_SLOTS / INFERENCE_QUEUE_SIZE)
+inference_executor = InferenceExecutor()
+
+# Concurrent /analyze calls for the same URL or content share one computation
+single_flight = SingleFlight()
+
 # PDF Report generation
 try:
     from pdf_report import generate_pdf_report, PDF_SUPPORT
@@ -186,6 +261,7 @@ class AnalyzeResponse(BaseModel):
     landmark_analysis: Optional[dict] = None
     ensemble_analysis: Optional[dict] = None
     debug_frames: Optional[list] = None  # Base64 encoded analysis frames for PDF report
+    analysis_id: Optional[str] = None  # Key for /artifacts/{analysis_id}/{name}
     # NEW: Content classification and filter detection
     content_type: Optional[str] = None  # 'portrait', 'group', 'scene'
     has_filter: Optional[bool] = None
@@ -203,6 +279,10 @@ class HealthResponse(BaseModel):
     model_loaded: bool
     device: str
     memory_usage_mb: Optional[float] = None
+    ready: Optional[bool] = None  # Model loaded and warmup finished
+    cache: Optional[dict] = None  # Analysis cache sizes and per-level hit ratios
+    warmup: Optional[dict] = None  # Warmup status and per-step timings
+    inference: Optional[dict] = None  # Inference executor slot/queue + micro-batching stats
 
 
 class ErrorResponse(BaseModel):
@@ -295,8 +375,16 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting Deepfake Detection Service...")
     detector = get_detector()
     detector.load_model()
+    # Warm up in the background so /health/live answers while kernels are selected
+    warmup_task = asyncio.create_task(asyncio.to_thread(detector.warmup))
     yield
     logger.info("👋 Shutting down service...")
+    warmup_task.cancel()
+    inference_executor.shutdown()
+    if detector.scheduler is not None:
+        detector.scheduler.shutdown()
+    detector._media_cache.clear()
+    await detector._downloader.close()
 
 
 # Create FastAPI app
@@ -336,17 +424,77 @@ async def health_check():
     except ImportError:
         pass
     
+    inference = inference_executor.stats()
+    inference['backend'] = detector.backend
+    inference['precision'] = detector.precision
+    inference['single_flight'] = single_flight.stats()
+    inference['downloads'] = detector._downloader.stats()
+    if detector.scheduler is not None:
+        inference['batching'] = detector.scheduler.stats()
+    
+    cache_stats = await asyncio.to_thread(analysis_cache.stats)
+    
     return HealthResponse(
         status="healthy",
         model_loaded=detector._loaded,
         device=detector.device,
-        memory_usage_mb=memory_mb
+        memory_usage_mb=memory_mb,
+        ready=detector.is_ready,
+        warmup=detector.warmup_state,
+        cache={**cache_stats, 'media': detector._media_cache.stats(),
+               'artifacts': detector.artifacts.stats()},
+        inference=inference
+    )
+
+
+@app.get("/health/live")
+async def liveness_check():
+    """
+    Liveness probe.
+    Only checks that the process and event loop respond.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Readiness probe.
+    Returns 503 until the model is loaded and warmup has finished.
+    """
+    detector = get_detector()
+    ready = detector.is_ready
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up",
+            "model_loaded": detector._loaded,
+            "warmup": detector.warmup_state,
+        }
     )
 
 
+def cache_hit(cached_result: Dict) -> Dict:
+    """Copy of a cached result with processing_time_ms=0 marking the cache hit."""
+    # Convert numpy types to native Python (for old cache entries)
+    return convert_numpy_types({**cached_result, 'processing_time_ms': 0})
+
+
+async def cached_response(lookup: Callable[[str], Optional[Dict]], key: str) -> Optional[Dict]:
+    """
+    Cache lookup and its cache_hit copy in one worker-thread hop, so inflating
+    and walking a result with multi-MB debug frames stays off the event loop.
+    """
+    def lookup_hit() -> Optional[Dict]:
+        cached_result = lookup(key)
+        return cache_hit(cached_result) if cached_result else None
+    return await asyncio.to_thread(lookup_hit)
+
+
 @app.post("/analyze", response_model=AnalyzeResponse, responses={
     400: {"model": ErrorResponse},
     401: {"model": ErrorResponse},
+    429: {"model": ErrorResponse},
     500: {"model": ErrorResponse}
 }, dependencies=[Depends(verify_api_key)])
 async def analyze_image(request: AnalyzeRequest):
@@ -355,6 +503,8 @@ async def analyze_image(request: AnalyzeRequest):
     Requires API key authentication.
     
     Set force_reanalyze=true to bypass cache and force fresh analysis.
+    Concurrent requests for the same URL or media bytes share one analysis.
+    Returns 429 with Retry-After when all inference slots and the wait queue are full.
     """
     start_time = time.time()
     url_str = str(request.image_url)
@@ -362,73 +512,44 @@ async def analyze_image(request: AnalyzeRequest):
     try:
         logger.info(f"📥 New analysis request received (force_reanalyze={request.force_reanalyze})")
         
-        # Check cache unless force_reanalyze is requested
+        detector = get_detector()
+        # Transformation segments / signing parameters do not change the asset
+        cache_url = detector.clean_cloudinary_url(analysis_cache.normalize_url(url_str))
+        
+        # Cache calls run on a worker thread: the SQLite store may wait on its
+        # write lock (busy_timeout) and the memory store (de)compresses results
         if not request.force_reanalyze:
-            cached_result = analysis_cache.get(url_str)
+            cached_result = await cached_response(analysis_cache.get, cache_url)
             if cached_result:
-                logger.info("📦 Returning cached analysis result")
-                # Update processing time to indicate cache hit
-                cached_result['processing_time_ms'] = 0
-                # Convert numpy types to native Python (for old cache entries)
-                cached_result = convert_numpy_types(cached_result)
+                logger.info("📦 Returning cached analysis result (URL)")
                 return AnalyzeResponse(**cached_result)
         else:
             # Invalidate cache when force_reanalyze is requested
-            analysis_cache.invalidate(url_str)
+            await asyncio.to_thread(analysis_cache.invalidate, cache_url)
             logger.info("🔄 Force reanalyze requested - cache invalidated")
         
-        detector = get_detector()
-        
-        # Classify the image/video
-        probs, classification, confidence, details = detector.classify_from_url(url_str)
-        
-        processing_time_ms = int((time.time() - start_time) * 1000)
-        
-        logger.info(f"✅ Analysis complete in {processing_time_ms}ms - {classification}")
-        
-        # Build response
-        result = {
-            'fake_score': probs["fake"],
-            'real_score': probs["real"],
-            'classification': classification,
-            'confidence': confidence,
-            'processing_time_ms': processing_time_ms,
-            'faces_detected': details.get('faces_detected', 0),
-            'face_scores': details.get('face_scores', []),
-            'avg_face_score': details.get('avg_face_score'),
-            'avg_fft_score': details.get('avg_fft_score'),
-            'avg_eye_score': details.get('avg_eye_score'),
-            'fft_boost': details.get('fft_boost'),
-            'eye_boost': details.get('eye_boost'),
-            'temporal_boost': details.get('temporal_boost'),
-            'phase1_boost': details.get('phase1_boost'),
-            'compression_analysis': details.get('compression_analysis'),
-            'exif_analysis': details.get('exif_analysis'),
-            'blending_analysis': details.get('blending_analysis'),
-            'phase2_boost': details.get('phase2_boost'),
-            'landmark_analysis': details.get('landmark_analysis'),
-            'ensemble_analysis': details.get('ensemble_analysis'),
-            'debug_frames': details.get('debug_frames'),
-            # NEW: Content classification and filter detection
-            'content_type': details.get('content_type'),
-            'has_filter': details.get('has_filter'),
-            'filter_intensity': details.get('filter_intensity'),
-            'filter_analysis': details.get('filter_analysis'),
-            'multi_face_analysis': details.get('multi_face_analysis'),
-            # NEW: Individual frame breakdown for detailed report
-            'frame_breakdown': details.get('frame_breakdown'),
-        }
-        
-        # Convert numpy types to native Python types (fixes PydanticSerializationError)
-        result = convert_numpy_types(result)
-        
-        # Cache the result for future requests
-        analysis_cache.set(url_str, result)
-        
+        # Forced runs never join a flight that may have been served from cache
+        flight = "force" if request.force_reanalyze else "url"
+        result = await single_flight.run(
+            f"{flight}:{cache_url}",
+            lambda: analyze_url(url_str, cache_url, request.force_reanalyze, start_time)
+        )
         return AnalyzeResponse(**result)
         
+    except ExecutorSaturated as e:
+        logger.warning(f"⏳ Inference queue full - rejecting (retry after {e.retry_after}s)")
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis queue is full, retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except DownloadTooLarge as e:
+        logger.warning(f"📦 Rejecting oversized media: {e}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedMediaType as e:
+        logger.warning(f"🚫 Rejecting unsupported media: {e}")
+        raise HTTPException(status_code=415, detail=str(e))
     except Exception as e:
-        processing_time_ms = int((time.time() - start_time) * 1000)
         logger.error(f"❌ Analysis error: {str(e)}")
         if not IS_PROD:
             traceback.print_exc()
@@ -445,6 +566,95 @@ async def analyze_image(request: AnalyzeRequest):
         )
 
 
+async def analyze_url(url_str: str, cache_url: str, force: bool, start_time: float) -> Dict:
+    """Download a URL and analyze its bytes (one flight per normalized URL)."""
+    detector = get_detector()
+    
+    # Don't download media for a job the executor would reject anyway
+    inference_executor.ensure_capacity()
+    
+    # Stream on the shared connection pool, outside the inference slots
+    media = await detector.fetch_media_async(url_str)
+    try:
+        content_hash = media.content_hash
+        
+        # Same bytes already analyzed under another URL - skip the pipeline
+        if not force:
+            cached_result = await cached_response(analysis_cache.get_content, content_hash)
+            if cached_result:
+                await asyncio.to_thread(analysis_cache.link, cache_url, content_hash)
+                logger.info("📦 Returning cached analysis result (content hash)")
+                return cached_result
+        
+        # Different URLs with the same bytes in flight at once share one analysis
+        flight = "force" if force else "content"
+        result = await single_flight.run(
+            f"{flight}:{content_hash}",
+            lambda: analyze_content(media, cache_url, start_time)
+        )
+        await asyncio.to_thread(analysis_cache.link, cache_url, content_hash)
+        return result
+    finally:
+        # Removes the spool file of a video download
+        media.cleanup()
+
+
+async def analyze_content(media: IngestedMedia, cache_url: str, start_time: float) -> Dict:
+    """Classify downloaded media on an inference slot and cache the result."""
+    detector = get_detector()
+    
+    # Classify the image/video on an inference slot (keeps the event loop free)
+    probs, classification, confidence, details = await inference_executor.run(
+        detector.classify_media, media
+    )
+    
+    processing_time_ms = int((time.time() - start_time) * 1000)
+    
+    logger.info(f"✅ Analysis complete in {processing_time_ms}ms - {classification}")
+    
+    # Build response
+    result = {
+        'fake_score': probs["fake"],
+        'real_score': probs["real"],
+        'classification': classification,
+        'confidence': confidence,
+        'processing_time_ms': processing_time_ms,
+        'faces_detected': details.get('faces_detected', 0),
+        'face_scores': details.get('face_scores', []),
+        'avg_face_score': details.get('avg_face_score'),
+        'avg_fft_score': details.get('avg_fft_score'),
+        'avg_eye_score': details.get('avg_eye_score'),
+        'fft_boost': details.get('fft_boost'),
+        'eye_boost': details.get('eye_boost'),
+        'temporal_boost': details.get('temporal_boost'),
+        'phase1_boost': details.get('phase1_boost'),
+        'compression_analysis': details.get('compression_analysis'),
+        'exif_analysis': details.get('exif_analysis'),
+        'blending_analysis': details.get('blending_analysis'),
+        'phase2_boost': details.get('phase2_boost'),
+        'landmark_analysis': details.get('landmark_analysis'),
+        'ensemble_analysis': details.get('ensemble_analysis'),
+        'debug_frames': details.get('debug_frames'),
+        'analysis_id': details.get('analysis_id'),
+        # NEW: Content classification and filter detection
+        'content_type': details.get('content_type'),
+        'has_filter': details.get('has_filter'),
+        'filter_intensity': details.get('filter_intensity'),
+        'filter_analysis': details.get('filter_analysis'),
+        'multi_face_analysis': details.get('multi_face_analysis'),
+        # NEW: Individual frame breakdown for detailed report
+        'frame_breakdown': details.get('frame_breakdown'),
+    }
+    
+    # Convert numpy types to native Python types (fixes PydanticSerializationError)
+    result = convert_numpy_types(result)
+    
+    # Cache the result for future requests
+    await asyncio.to_thread(analysis_cache.set, cache_url, media.content_hash, result)
+    
+    return result
+
+
 @app.post("/generate-report", response_model=ReportResponse, responses={
     400: {"model": ErrorResponse},
     401: {"model": ErrorResponse},
@@ -484,6 +694,8 @@ async def root():
         "version": "2.1.0 (Model v7)",
         "endpoints": {
             "health": "GET /health",
+            "liveness": "GET /health/live",
+            "readiness": "GET /health/ready",
             "analyze": "POST /analyze (requires X-API-Key)",
             "generate_report": "POST /generate-report (requires X-API-Key)",
             "generate_caption": "POST /generate-caption (requires X-API-Key)",
@@ -628,12 +840,20 @@ async def generate_pdf_report_endpoint(request: PDFReportRequest):
                 detail="PDF generation not available - ReportLab not installed"
             )
         
-        # Generate PDF with debug frames from the stored analysis
-        pdf_bytes = generate_pdf_report(
+        # The annotated image is rendered from the stored analysis inputs
+        # (debug-frame thumbnails come with the analysis results)
+        analysis_id = request.analysis_results.get('analysis_id')
+        artifacts = get_detector().artifacts
+        
+        # Generate PDF with debug frames from the stored analysis; ReportLab and
+        # the first render of the annotated image run on a worker thread
+        pdf_bytes = await asyncio.to_thread(
+            generate_pdf_report,
             analysis_results=request.analysis_results,
             report_content=request.report_content,
             debug_image_dir=None,  # Don't use disk images - use debug_frames from analysis instead
-            analyzed_image_url=request.analyzed_image_url
+            analyzed_image_url=request.analyzed_image_url,
+            artifacts=(lambda name: artifacts.base64(analysis_id, name)) if analysis_id else None
         )
         
         # Convert to base64
@@ -665,6 +885,24 @@ async def generate_pdf_report_endpoint(request: PDFReportRequest):
         )
 
 
+@app.get("/artifacts/{analysis_id}/{name}", responses={
+    401: {"model": ErrorResponse},
+    404: {"model": ErrorResponse}
+}, dependencies=[Depends(verify_api_key)])
+async def get_artifact(analysis_id: str, name: str):
+    """
+    Annotated image or heatmap ('annotated' / 'heatmap') of a recent face analysis as JPEG.
+    Rendered on first request and cached; requires API key authentication.
+    """
+    data = await asyncio.to_thread(get_detector().artifacts.render, analysis_id, name)
+    if data is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Artifact not found - unknown name or the analysis has expired (re-analyze to rebuild it)"
+        )
+    return Response(content=data, media_type="image/jpeg", headers={"Cache-Control": "private, max-age=3600"})
+
+
 @app.get("/debug-images", responses={
     401: {"model": ErrorResponse},
     500: {"model": ErrorResponse}
@@ -0,0 +1,215 @@
+"""
+Media Download Cache for TrueVibe AI Service
+Byte-budgeted LRU cache of downloaded media, keyed by a stable URL hash.
+
+Small items (images) stay in memory; items above the spill threshold
+(typically videos) are written to a temp-dir file store with its own byte
+budget so they do not count against process RSS. Both tiers evict least
+recently used entries first in O(1) via OrderedDict.
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+from collections import OrderedDict
+from threading import Lock, get_ident
+from typing import Optional
+
+# Cache configuration
+MEDIA_CACHE_MEMORY_MB = int(os.environ.get("MEDIA_CACHE_MB", "64"))
+MEDIA_CACHE_DISK_MB = int(os.environ.get("MEDIA_CACHE_DISK_MB", "512"))
+MEDIA_CACHE_SPILL_MB = float(os.environ.get("MEDIA_CACHE_SPILL_MB", "8"))  # Larger items go to disk
+MEDIA_CACHE_TTL = int(os.environ.get("MEDIA_CACHE_TTL", "300"))  # Seconds
+
+
+class _Entry:
+    __slots__ = ('data', 'path', 'size', 'stored_at')
+
+    def __init__(self, size: int, data: Optional[bytes] = None, path: Optional[str] = None):
+        self.data = data
+        self.path = path
+        self.size = size
+        self.stored_at = time.time()
+
+
+class MediaCache:
+    """Two-tier (memory + spill directory) LRU cache bounded by total bytes."""
+
+    def __init__(self, memory_bytes: int = MEDIA_CACHE_MEMORY_MB * 1024 * 1024,
+                 disk_bytes: int = MEDIA_CACHE_DISK_MB * 1024 * 1024,
+                 spill_bytes: int = int(MEDIA_CACHE_SPILL_MB * 1024 * 1024),
+                 ttl_seconds: int = MEDIA_CACHE_TTL):
+        self._memory: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._disk: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._max_memory = memory_bytes
+        self._max_disk = disk_bytes
+        self._spill = spill_bytes
+        self._ttl = ttl_seconds
+        self._spill_dir: Optional[str] = None
+        self._lock = Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'spilled': 0}
+
+    @staticmethod
+    def key(url: str) -> str:
+        """Stable across processes and restarts (unlike the salted built-in hash)."""
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def get(self, url: str) -> Optional[bytes]:
+        key = self.key(url)
+        with self._lock:
+            tier = self._memory if key in self._memory else self._disk
+            entry = tier.get(key)
+            if entry is not None and time.time() - entry.stored_at >= self._ttl:
+                self._remove(tier, key)
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            tier.move_to_end(key)
+            if entry.data is not None:
+                self._stats['hits'] += 1
+                return entry.data
+            path = entry.path
+
+        # Read spilled files outside the lock; a concurrent eviction is just a miss
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            with self._lock:
+                self._stats['misses'] += 1
+            return None
+        with self._lock:
+            self._stats['hits'] += 1
+        return data
+
+    def set(self, url: str, data: bytes) -> None:
+        key = self.key(url)
+        size = len(data)
+        spill = size > self._spill
+        if (spill and size > self._max_disk) or (not spill and size > self._max_memory):
+            return  # Larger than the whole tier - not worth caching
+
+        path = None
+        if spill:
+            path = os.path.join(self._ensure_spill_dir(), key)
+            tmp_path = self._tmp_path(path)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self._insert(key, size, data=None if spill else data, path=path)
+
+    def set_file(self, url: str, source_path: str) -> None:
+        """
+        Cache the contents of a file (e.g. a spooled video download). Large
+        files are hard-linked into the spill directory instead of being read
+        into memory; the caller keeps ownership of `source_path`.
+        """
+        size = os.path.getsize(source_path)
+        if size <= self._spill:
+            with open(source_path, 'rb') as f:
+                self.set(url, f.read())
+            return
+        if size > self._max_disk:
+            return
+
+        key = self.key(url)
+        path = os.path.join(self._ensure_spill_dir(), key)
+        tmp_path = self._tmp_path(path)
+        try:
+            os.link(source_path, tmp_path)
+        except OSError:
+            shutil.copyfile(source_path, tmp_path)  # Different filesystem
+        os.replace(tmp_path, path)
+        self._insert(key, size, path=path)
+
+    @staticmethod
+    def _tmp_path(path: str) -> str:
+        return f"{path}.{os.getpid()}.{get_ident()}.tmp"
+
+    def _insert(self, key: str, size: int, data: Optional[bytes] = None, path: Optional[str] = None) -> None:
+        """Register a stored item in its tier and evict to fit the budget."""
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= old.size
+            old = self._disk.pop(key, None)
+            if old is not None:
+                self._disk_bytes -= old.size
+                # Same key means same file name; only delete a file we did not just rewrite
+                if old.path != path:
+                    self._delete_file(old.path)
+
+            if path is not None:
+                self._disk[key] = _Entry(size, path=path)
+                self._disk_bytes += size
+                self._stats['spilled'] += 1
+                while self._disk_bytes > self._max_disk and len(self._disk) > 1:
+                    self._evict(self._disk)
+            else:
+                self._memory[key] = _Entry(size, data=data)
+                self._memory_bytes += size
+                while self._memory_bytes > self._max_memory and len(self._memory) > 1:
+                    self._evict(self._memory)
+
+    def _ensure_spill_dir(self) -> str:
+        if self._spill_dir is None or not os.path.isdir(self._spill_dir):
+            self._spill_dir = tempfile.mkdtemp(prefix="truevibe-media-")
+        return self._spill_dir
+
+    def _evict(self, tier: "OrderedDict[str, _Entry]") -> None:
+        """Drop the least recently used entry of a tier (caller holds the lock)."""
+        key = next(iter(tier))
+        self._remove(tier, key)
+        self._stats['evictions'] += 1
+
+    def _remove(self, tier: "OrderedDict[str, _Entry]", key: str) -> None:
+        entry = tier.pop(key)
+        if tier is self._memory:
+            self._memory_bytes -= entry.size
+        else:
+            self._disk_bytes -= entry.size
+        self._delete_file(entry.path)
+
+    @staticmethod
+    def _delete_file(path: Optional[str]) -> None:
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def invalidate(self, url: str) -> None:
+        key = self.key(url)
+        with self._lock:
+            for tier in (self._memory, self._disk):
+                if key in tier:
+                    self._remove(tier, key)
+
+    def clear(self) -> None:
+        """Drop everything and delete the spill directory."""
+        with self._lock:
+            self._memory.clear()
+            self._disk.clear()
+            self._memory_bytes = self._disk_bytes = 0
+            if self._spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'memory_items': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_items': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'max_memory_bytes': self._max_memory,
+                'max_disk_bytes': self._max_disk,
+                **self._stats,
+                'hit_ratio': round(self._stats['hits'] / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,194 @@
+"""
+Media Downloader for TrueVibe AI Service
+Pooled async HTTP downloads for the analysis API.
+
+One aiohttp ClientSession (and its TCPConnector) is shared by every request,
+so keep-alive connections to Cloudinary are reused instead of paying a new
+TCP+TLS handshake per download and per retry. Connections are capped per
+host, bodies are streamed with a size cutoff and retries back off with
+asyncio.sleep, so a slow origin never blocks the event loop.
+"""
+
+import os
+import asyncio
+from typing import Any, Callable, Optional, Tuple
+
+import aiohttp
+
+# Downloader configuration
+DOWNLOAD_MAX_CONNECTIONS = int(os.environ.get("DOWNLOAD_MAX_CONNECTIONS", "32"))
+DOWNLOAD_LIMIT_PER_HOST = int(os.environ.get("DOWNLOAD_LIMIT_PER_HOST", "8"))
+DOWNLOAD_KEEPALIVE = float(os.environ.get("DOWNLOAD_KEEPALIVE", "30"))  # Seconds an idle connection is kept
+DOWNLOAD_MAX_MB = int(os.environ.get("DOWNLOAD_MAX_MB", "100"))
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class DownloadTooLarge(ValueError):
+    """Raised when a response body exceeds the download size limit."""
+    def __init__(self, limit: int, media_type: str = "media"):
+        super().__init__(f"{media_type.capitalize()} exceeds the {limit / 1024 / 1024:.0f} MB download limit")
+        self.limit = limit
+
+
+class MediaDownloader:
+    """
+    Shared keep-alive HTTP client with retry semantics matching
+    DeepfakeDetector.download_with_retry: 404 fails immediately, a 400 on a
+    cleaned Cloudinary URL is retried once with the original URL, and 5xx,
+    timeouts and connection errors are retried with exponential backoff.
+    """
+
+    def __init__(self, limit: int = DOWNLOAD_MAX_CONNECTIONS, limit_per_host: int = DOWNLOAD_LIMIT_PER_HOST,
+                 keepalive: float = DOWNLOAD_KEEPALIVE, max_bytes: int = DOWNLOAD_MAX_MB * 1024 * 1024):
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive = keepalive
+        self.max_bytes = max_bytes
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {'downloads': 0, 'failed': 0, 'retries': 0, 'too_large': 0, 'bytes': 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # A session is bound to the loop it was created on; recreate it for a new loop
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                limit_per_host=self._limit_per_host,
+                keepalive_timeout=self._keepalive,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    async def _get(self, url: str, timeout: float, max_bytes: int, sink=None) -> Tuple[int, Optional[bytes], int]:
+        """
+        GET a URL, returning (status, body, size). The body is only read for
+        2xx responses; with a sink, chunks are fed to it instead of collected.
+        """
+        session = self._get_session()
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status >= 300:
+                return response.status, None, 0
+            if response.content_length is not None and response.content_length > max_bytes:
+                raise DownloadTooLarge(max_bytes)
+            if sink is not None:
+                sink.start(response.content_length)
+            body = bytearray()
+            size = 0
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DownloadTooLarge(max_bytes)
+                if sink is not None:
+                    # Sinks may decode or write files - keep that off the event loop
+                    await asyncio.to_thread(sink.feed, chunk)
+                else:
+                    body += chunk
+            return response.status, (bytes(body) if sink is None else None), size
+
+    async def _attempt(self, url: str, clean_url: str, timeout: float, max_bytes: int, sink=None):
+        """One download attempt with the status handling of download_with_retry."""
+        try:
+            status, body, size = await self._get(clean_url, timeout, max_bytes, sink)
+
+            if status == 404:
+                raise FileNotFoundError(f"Resource not found: {clean_url[:60]}...")
+            if status == 400 and clean_url != url:
+                # Try original URL without cleaning
+                print("   🔄 Retrying with original URL...")
+                status, body, size = await self._get(url, timeout, max_bytes, sink)
+            if status >= 500:
+                # Server error - worth retrying
+                raise ConnectionError(f"Server error {status}")
+            if status >= 300:
+                raise ConnectionError(f"HTTP error {status}")
+        except BaseException:
+            # Partial data from a failed attempt is never reused
+            if sink is not None:
+                sink.abort()
+            raise
+
+        self._stats['downloads'] += 1
+        self._stats['bytes'] += size
+        return body if sink is None else sink
+
+    async def _download(self, url: str, clean_url: Optional[str], timeout: float, max_retries: int,
+                        max_bytes: Optional[int], sink_factory: Optional[Callable[[], Any]] = None):
+        clean_url = clean_url or url
+        max_bytes = max_bytes or self.max_bytes
+        last_error = None
+
+        for attempt in range(max_retries):
+            sink = sink_factory() if sink_factory is not None else None
+            try:
+                return await self._attempt(url, clean_url, timeout, max_bytes, sink)
+            except FileNotFoundError:
+                # Don't retry 404s
+                self._stats['failed'] += 1
+                raise
+            except DownloadTooLarge:
+                self._stats['too_large'] += 1
+                raise
+            except (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError) as e:
+                last_error = e
+                if attempt < max_retries - 1:
+                    wait_time = (2 ** attempt) * 0.5  # 0.5s, 1s, 2s
+                    print(f"   ⏳ Retry {attempt + 1}/{max_retries} in {wait_time:.1f}s (error: {type(e).__name__})")
+                    self._stats['retries'] += 1
+                    await asyncio.sleep(wait_time)
+
+        self._stats['failed'] += 1
+        raise Exception(f"Download failed after {max_retries} attempts: {last_error}")
+
+    async def fetch(self, url: str, clean_url: Optional[str] = None, timeout: float = 60,
+                    max_retries: int = 3, max_bytes: Optional[int] = None) -> bytes:
+        """
+        Download a URL with exponential backoff retry logic.
+
+        Args:
+            url: Original URL
+            clean_url: Normalized URL to try first (defaults to `url`)
+            timeout: Total timeout per attempt in seconds
+            max_retries: Maximum number of attempts
+            max_bytes: Body size limit (defaults to DOWNLOAD_MAX_MB)
+
+        Returns:
+            Downloaded content as bytes
+
+        Raises:
+            FileNotFoundError: on 404 (not retried)
+            DownloadTooLarge: if the body exceeds the size limit (not retried)
+            Exception: If all retries fail
+        """
+        return await self._download(url, clean_url, timeout, max_retries, max_bytes)
+
+    async def stream(self, url: str, sink_factory: Callable[[], Any], clean_url: Optional[str] = None,
+                     timeout: float = 60, max_retries: int = 3, max_bytes: Optional[int] = None):
+        """
+        Like fetch, but feeds the body chunk by chunk to a sink instead of
+        buffering it. Each attempt gets a fresh sink from `sink_factory`
+        (an object with start(content_length), feed(chunk) and abort());
+        failed attempts are aborted and the filled sink is returned.
+
+        Exceptions raised by the sink (e.g. an unsupported media type) are
+        not retried.
+        """
+        return await self._download(url, clean_url, timeout, max_retries, max_bytes, sink_factory)
+
+    def stats(self) -> dict:
+        connector = self._session.connector if self._session is not None and not self._session.closed else None
+        idle = getattr(connector, '_conns', None) or {}
+        return {
+            'limit': self._limit,
+            'limit_per_host': self._limit_per_host,
+            'max_bytes': self.max_bytes,
+            'idle_connections': sum(len(c) for c in idle.values()),
+            **self._stats,
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
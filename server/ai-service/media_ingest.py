@@ -0,0 +1,257 @@
+"""
+Media Ingestion Module for TrueVibe AI Service
+Streaming intake of downloaded media.
+
+Bytes are consumed chunk by chunk as they arrive:
+- the magic bytes of the first chunk decide image vs video (URL patterns are
+  only a fallback for containers not recognised here)
+- each type has its own byte cap, checked against Content-Length up front
+  and against the running total while streaming
+- images are fed to PIL's parser until the header is known (format and
+  dimensions for the log); pixels are decoded once, afterwards, at the
+  working resolution (see image_decode.py)
+- videos are written straight to a spool file that OpenCV reads, so a large
+  video is never held in memory
+The sha256 of the content is computed on the way for the analysis cache.
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional, Tuple
+
+from PIL import ImageFile
+
+from media_downloader import DownloadTooLarge
+from image_decode import DecodedImage, decode_image
+
+# Ingestion configuration
+INGEST_MAX_IMAGE_MB = int(os.environ.get("INGEST_MAX_IMAGE_MB", "25"))
+INGEST_MAX_VIDEO_MB = int(os.environ.get("INGEST_MAX_VIDEO_MB", "100"))
+INGEST_SPOOL_DIR = os.environ.get("INGEST_SPOOL_DIR") or None  # None = system temp dir
+
+SNIFF_BYTES = 32
+
+# Same values as model.MediaType
+IMAGE = "image"
+VIDEO = "video"
+
+# ISO-BMFF brands that are still images rather than video
+_FTYP_IMAGE_BRANDS = (b'heic', b'heix', b'heim', b'heis', b'mif1', b'msf1', b'avif', b'avis')
+# QuickTime files without an ftyp box start with one of these atoms
+_QUICKTIME_ATOMS = (b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot')
+
+
+class UnsupportedMediaType(ValueError):
+    """Raised when downloaded content is neither an image nor a video."""
+
+
+def sniff_media_type(head: bytes) -> Tuple[Optional[str], str]:
+    """Media type and file extension from leading magic bytes, (None, '') if unknown."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return IMAGE, '.jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return IMAGE, '.png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return IMAGE, '.gif'
+    if head[:4] == b'RIFF':
+        if head[8:12] == b'WEBP':
+            return IMAGE, '.webp'
+        if head[8:12] == b'AVI ':
+            return VIDEO, '.avi'
+    if head[:4] in (b'II*\x00', b'MM\x00*'):
+        return IMAGE, '.tiff'
+    if head[:2] == b'BM':
+        return IMAGE, '.bmp'
+    if head[4:8] == b'ftyp':
+        brand = head[8:12]
+        if brand in _FTYP_IMAGE_BRANDS:
+            return IMAGE, '.heic'
+        if brand == b'qt  ':
+            return VIDEO, '.mov'
+        if brand.startswith(b'3g'):
+            return VIDEO, '.3gp'
+        return VIDEO, '.mp4'
+    if head[4:8] in _QUICKTIME_ATOMS:
+        return VIDEO, '.mov'
+    if head.startswith(b'\x1a\x45\xdf\xa3'):  # EBML (WebM / Matroska)
+        return VIDEO, '.webm'
+    if head.startswith(b'FLV'):
+        return VIDEO, '.flv'
+    if head.startswith(b'\x30\x26\xb2\x75\x8e\x66\xcf\x11'):  # ASF (WMV)
+        return VIDEO, '.wmv'
+    if head.startswith(b'OggS'):
+        return VIDEO, '.ogv'
+    return None, ''
+
+
+def resolve_media_type(head: bytes, fallback_type: str) -> Tuple[str, str]:
+    """
+    Sniffed media type, falling back to the URL-based guess for unknown
+    signatures. Text bodies (HTML error pages, JSON) are rejected.
+    """
+    media_type, extension = sniff_media_type(head)
+    if media_type is not None:
+        return media_type, extension
+    if head.lstrip()[:1] in (b'<', b'{', b'['):
+        raise UnsupportedMediaType("URL returned a text document, not an image or video")
+    print(f"   ⚠️ Unrecognized file signature - assuming {fallback_type} from URL")
+    return fallback_type, '.mp4' if fallback_type == VIDEO else ''
+
+
+def max_bytes_for(media_type: str) -> int:
+    return (INGEST_MAX_VIDEO_MB if media_type == VIDEO else INGEST_MAX_IMAGE_MB) * 1024 * 1024
+
+
+def _create_spool_file(extension: str) -> Tuple[int, str]:
+    return tempfile.mkstemp(prefix="truevibe-ingest-", suffix=extension or '.bin', dir=INGEST_SPOOL_DIR)
+
+
+class IngestedMedia:
+    """Downloaded media ready for analysis: bytes for images, a spool file for video."""
+
+    def __init__(self, media_type: str, content_hash: str, size: int, data: Optional[bytes] = None,
+                 path: Optional[str] = None, header: Optional[Tuple[str, Tuple[int, int]]] = None):
+        self.media_type = media_type
+        self.content_hash = content_hash
+        self.size = size
+        self.data = data
+        self.path = path
+        self.header = header  # (format, (width, height)) if parsed while streaming
+
+    def decode(self, max_size: int) -> DecodedImage:
+        """RGB working image with the longer side limited to `max_size`."""
+        return decode_image(self.data, max_size)
+
+    def cleanup(self) -> None:
+        """Delete the spool file (video)."""
+        if self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+class MediaSink:
+    """
+    Consumes a download chunk by chunk (see MediaDownloader.stream).
+
+    Raises UnsupportedMediaType on a text body and DownloadTooLarge once the
+    per-type cap is exceeded; abort() removes any partial spool file.
+    """
+
+    def __init__(self, fallback_type: str = IMAGE):
+        self._fallback_type = fallback_type
+        self._hash = hashlib.sha256()
+        self._head = bytearray()
+        self._declared_size: Optional[int] = None
+        self.media_type: Optional[str] = None
+        self.size = 0
+        self._limit = 0
+        self._data = bytearray()
+        self._parser: Optional[ImageFile.Parser] = None
+        self._header: Optional[Tuple[str, Tuple[int, int]]] = None
+        self._file = None
+        self._path: Optional[str] = None
+
+    def start(self, content_length: Optional[int]) -> None:
+        self._declared_size = content_length
+
+    def feed(self, chunk: bytes) -> None:
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if self.media_type is None:
+            self._head += chunk
+            if len(self._head) < SNIFF_BYTES:
+                return
+            chunk = bytes(self._head)
+            self._head = None
+            self._begin(chunk)
+        if self.size > self._limit:
+            raise DownloadTooLarge(self._limit, self.media_type)
+        self._write(chunk)
+
+    def _begin(self, head: bytes) -> None:
+        """Decide the media type from the first bytes and set up the destination."""
+        self.media_type, extension = resolve_media_type(head, self._fallback_type)
+        self._limit = max_bytes_for(self.media_type)
+        if self._declared_size is not None and self._declared_size > self._limit:
+            raise DownloadTooLarge(self._limit, self.media_type)
+        if self.media_type == VIDEO:
+            fd, self._path = _create_spool_file(extension)
+            self._file = os.fdopen(fd, 'wb')
+        else:
+            self._parser = ImageFile.Parser()
+
+    def _write(self, chunk: bytes) -> None:
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+        self._data += chunk
+        if self._parser is not None:
+            try:
+                self._parser.feed(chunk)
+            except Exception:
+                self._parser = None  # Unparseable header - decoding will report it
+                return
+            if self._parser.image is not None:
+                # PIL only buffers JPEG/PNG/WebP here, so stop once the header is known
+                self._header = (self._parser.image.format, self._parser.image.size)
+                print(f"   🖼️ {self._header[0]} {self._header[1][0]}x{self._header[1][1]} (header after {self.size / 1024:.0f} KB)")
+                self._parser = None
+
+    def close(self) -> IngestedMedia:
+        """Finish the download and return the ingested media."""
+        try:
+            if self.media_type is None:
+                # Body shorter than the sniff window
+                if not self._head:
+                    raise UnsupportedMediaType("URL returned an empty body")
+                head = bytes(self._head)
+                self._head = None
+                self._begin(head)
+                self._write(head)
+
+            content_hash = self._hash.hexdigest()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                path, self._path = self._path, None
+                return IngestedMedia(VIDEO, content_hash, self.size, path=path)
+
+            self._parser = None
+            return IngestedMedia(IMAGE, content_hash, self.size, data=bytes(self._data), header=self._header)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Drop partial data and delete the spool file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._path:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+        self._parser = None
+        self._data = bytearray()
+
+
+def ingest_bytes(content: bytes, fallback_type: str = IMAGE) -> IngestedMedia:
+    """Run already downloaded bytes (cache hits, blocking downloads) through the same checks."""
+    media_type, extension = resolve_media_type(content[:SNIFF_BYTES], fallback_type)
+    limit = max_bytes_for(media_type)
+    if len(content) > limit:
+        raise DownloadTooLarge(limit, media_type)
+    content_hash = hashlib.sha256(content).hexdigest()
+    if media_type == IMAGE:
+        return IngestedMedia(IMAGE, content_hash, len(content), data=content)
+
+    fd, path = _create_spool_file(extension)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(content)
+    return IngestedMedia(VIDEO, content_hash, len(content), path=path)
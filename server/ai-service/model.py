@@ -7,13 +7,36 @@ NEW in v8: Accuracy improvements - multi-face consistency, filter compensation,
 import os
 import time
 import torch
+import asyncio
+import threading
 import tempfile
+import uuid
 import numpy as np
 from PIL import Image, ImageOps, ImageEnhance, ImageFilter
 from transformers import AutoImageProcessor, SiglipForImageClassification
-from typing import Dict, Tuple, List, Optional, Union
+from typing import Callable, Dict, Tuple, List, Optional, Sequence, Union
 import requests
-from io import BytesIO
+
+from frequency_analysis import get_radial_geometry
+from batch_scheduler import MicroBatchScheduler, MICROBATCH_MAX_SIZE
+from onnx_backend import INFERENCE_BACKEND, load_onnx_classifier
+from quantization import MODEL_PRECISION, load_int8_model
+from preprocessing import TensorPreprocessor
+from media_cache import MediaCache
+from media_downloader import MediaDownloader
+from media_ingest import IngestedMedia, MediaSink, ingest_bytes
+from image_decode import DecodedImage, decode_image
+from image_features import ImageFeatures
+from analysis_graph import AnalyzerGraph
+from jpeg_bitstream import parse_jpeg
+from artifact_store import ArtifactStore, AnalysisArtifacts, LAZY_ARTIFACTS
+
+# psutil is optional - only used for per-request memory accounting
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
 
 # Try to import OpenCV for video support
 try:
@@ -26,10 +49,8 @@ except ImportError:
 # Import new enhancement modules
 try:
     from visual_annotations import (
-        create_full_annotated_image,
         ManipulationRegion,
-        ArtifactMarker,
-        image_to_base64
+        ArtifactMarker
     )
     ANNOTATIONS_AVAILABLE = True
 except ImportError:
@@ -116,7 +137,15 @@ HIST_EQUALIZE = not LIGHTWEIGHT_MODE  # Enable histogram equalization
 
 # Memory management - PRODUCTION SETTINGS
 MAX_IMAGE_SIZE = 1024 if LIGHTWEIGHT_MODE else 2560  # Support 2K images
-BATCH_SIZE = 1 if LIGHTWEIGHT_MODE else 4  # Process multiple frames
+# Screen-content check resolution (its statistics are ratios, so a smaller copy decides the same)
+SCREEN_ANALYSIS_SIZE = int(os.environ.get("SCREEN_ANALYSIS_SIZE", "1280"))
+BATCH_SIZE = 1 if LIGHTWEIGHT_MODE else 4  # Minimum frames per inference chunk
+# Activation memory allowed for one forward pass; frames are chunked to fit
+INFERENCE_MEMORY_BUDGET_MB = int(os.environ.get("INFERENCE_MEMORY_BUDGET_MB", "96" if LIGHTWEIGHT_MODE else "256"))
+# Build input batches from uint8 pixels instead of per-image AutoImageProcessor calls
+TENSOR_PREPROCESSING = os.environ.get("TENSOR_PREPROCESSING", "true").lower() == "true"
+# Run synthetic work through the model, face detector and FFT path after loading
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "true").lower() == "true"
 
 
 class MediaType:
@@ -146,6 +175,45 @@ class FaceInfo:
         return (x + w / 2, y + h / 2)
 
 
+class FaceDetection:
+    """
+    Faces detected in one image, computed once per analysis and passed to
+    content typing, frame generation, blending and landmark analysis.
+
+    Enhanced face crops (bilateral filter, CLAHE, unsharp mask) are memoized
+    per (face, size), so each is produced once however many stages read it.
+    """
+    def __init__(self, image: Image.Image, faces: List[FaceInfo],
+                 extract_crop: Callable[[Image.Image, FaceInfo, int], Image.Image]):
+        self.image = image
+        self.faces = faces
+        self._extract_crop = extract_crop
+        self._crops: Dict[Tuple[Tuple[int, int, int, int], int], Image.Image] = {}
+        self._lock = threading.Lock()
+        self.crop_stats = {'computed': 0, 'reused': 0}
+
+    def __len__(self) -> int:
+        return len(self.faces)
+
+    @property
+    def main_face(self) -> Optional[FaceInfo]:
+        """Largest face, or None."""
+        return max(self.faces, key=lambda f: f.bbox[2] * f.bbox[3]) if self.faces else None
+
+    def crop(self, face: FaceInfo, size: int) -> Image.Image:
+        """Enhanced `size` x `size` crop of `face` (shared - do not modify)."""
+        key = (face.bbox, size)
+        with self._lock:
+            crop = self._crops.get(key)
+            if crop is None:
+                crop = self._extract_crop(self.image, face, size)
+                self._crops[key] = crop
+                self.crop_stats['computed'] += 1
+            else:
+                self.crop_stats['reused'] += 1
+            return crop
+
+
 class DeepfakeDetector:
     """
     Production-ready Deepfake Detection v7.
@@ -159,19 +227,37 @@ class DeepfakeDetector:
     - Performance optimizations for video processing
     """
     
-    # Class-level cache for downloaded media (LRU with TTL)
-    _media_cache = {}
-    _cache_max_size = 50  # Max items in cache
-    _cache_ttl = 300  # Cache TTL in seconds (5 minutes)
+    # Class-level cache for downloaded media (byte-budgeted LRU with TTL, see media_cache.py)
+    _media_cache = MediaCache()
+    # Inputs of recent annotated images / heatmaps, rendered on request (see artifact_store.py)
+    artifacts = ArtifactStore()
+    # Shared keep-alive HTTP client for the async API path (see media_downloader.py)
+    _downloader = MediaDownloader()
+    # Pooled session for blocking downloads (scripts, classify_from_url)
+    _http = requests.Session()
     
     def __init__(self):
         self.model = None
         self.processor = None
+        self.scheduler: Optional[MicroBatchScheduler] = None
+        self.backend = "torch"
+        self.precision = "fp32"
+        self.onnx_classifier = None
+        self.preprocessor: Optional[TensorPreprocessor] = None
+        self.frame_bytes = 0  # Estimated forward-pass bytes per frame
+        self.chunk_size = BATCH_SIZE
+        self._buffers = threading.local()  # Per inference thread input buffer
         
         # Device selection - prefer GPU if available
         self.device = self._select_device()
         
         self._loaded = False
+        self.warmup_state = {
+            'status': 'pending' if WARMUP_ENABLED else 'skipped',  # pending | running | ready | failed | skipped
+            'duration_s': None,
+            'steps': {},
+            'error': None,
+        }
         self.optimal_size = 384  # Reduced from 512 for performance
         self.face_cascade = None
         self._face_detector_loaded = False
@@ -200,37 +286,20 @@ class DeepfakeDetector:
             pass
         return "cpu"
     
-    def _get_cached_media(self, url: str) -> bytes:
-        """Get media from cache if available and not expired."""
-        import time as time_module
-        
-        cache_key = hash(url)
-        if cache_key in self._media_cache:
-            cached_data, cached_time = self._media_cache[cache_key]
-            if time_module.time() - cached_time < self._cache_ttl:
-                self._perf_stats['cache_hits'] += 1
-                print(f"   📦 Cache hit")
-                return cached_data
-            else:
-                # Expired
-                del self._media_cache[cache_key]
-        
-        self._perf_stats['cache_misses'] += 1
-        return None
+    def _get_cached_media(self, url: str) -> Optional[bytes]:
+        """Get downloaded media from cache if available and not expired."""
+        data = self._media_cache.get(self.clean_cloudinary_url(url))
+        if data is not None:
+            self._perf_stats['cache_hits'] += 1
+            print(f"   📦 Cache hit ({len(data) / 1024:.0f} KB)")
+        else:
+            self._perf_stats['cache_misses'] += 1
+        return data
     
     def _set_cached_media(self, url: str, data: bytes) -> None:
-        """Store media in cache with eviction if needed."""
-        import time as time_module
-        
-        # Evict oldest entries if cache is full
-        if len(self._media_cache) >= self._cache_max_size:
-            oldest_key = min(self._media_cache.keys(), 
-                           key=lambda k: self._media_cache[k][1])
-            del self._media_cache[oldest_key]
-        
-        cache_key = hash(url)
-        self._media_cache[cache_key] = (data, time_module.time())
-        
+        """Store downloaded media (LRU eviction by total bytes, large items spill to disk)."""
+        self._media_cache.set(self.clean_cloudinary_url(url), data)
+    
     def load_model(self) -> None:
         """Load the detection model and face detector."""
         if self._loaded:
@@ -244,21 +313,111 @@ class DeepfakeDetector:
         
         if os.path.exists(MODEL_PATH):
             print(f"   Source: Local")
-            self.model = SiglipForImageClassification.from_pretrained(MODEL_PATH)
-            self.processor = AutoImageProcessor.from_pretrained(MODEL_PATH)
+            model_source = MODEL_PATH
         else:
             print(f"   Source: HuggingFace")
-            self.model = SiglipForImageClassification.from_pretrained(HUGGINGFACE_MODEL_ID)
-            self.processor = AutoImageProcessor.from_pretrained(HUGGINGFACE_MODEL_ID)
+            model_source = HUGGINGFACE_MODEL_ID
+        
+        # INT8 dynamic quantization applies to the torch CPU backend only
+        if MODEL_PRECISION == "int8":
+            if self.device == "cpu" and INFERENCE_BACKEND != "onnx":
+                self.model = load_int8_model(model_source)
+                if self.model is not None:
+                    self.precision = "int8"
+            else:
+                print(f"   ⚠️ MODEL_PRECISION=int8 ignored (device={self.device}, backend={INFERENCE_BACKEND})")
+        if self.model is None:
+            self.model = SiglipForImageClassification.from_pretrained(model_source)
+        self.processor = AutoImageProcessor.from_pretrained(model_source)
+        if TENSOR_PREPROCESSING:
+            self.preprocessor = TensorPreprocessor(self.processor)
+            if not self.preprocessor.supported:
+                print("   ⚠️ Processor config not supported by tensor preprocessing - using AutoImageProcessor")
+                self.preprocessor = None
         
         self.model.to(self.device)
         self.model.eval()
+        
+        # Optional ONNX Runtime backend (CPU only) - falls back to torch on any failure
+        if INFERENCE_BACKEND == "onnx" and self.device == "cpu":
+            image_size = getattr(getattr(self.model.config, 'vision_config', self.model.config), 'image_size', self.optimal_size)
+            self.onnx_classifier = load_onnx_classifier(self.model, model_source, image_size)
+            if self.onnx_classifier is not None:
+                self.backend = "onnx"
+        print(f"   Backend: {self.backend} ({self.precision})")
+        
+        # Size inference chunks so one forward pass stays inside the memory budget
+        self.frame_bytes = self._estimate_frame_bytes()
+        budget_bytes = INFERENCE_MEMORY_BUDGET_MB * 1024 * 1024
+        self.chunk_size = max(BATCH_SIZE, budget_bytes // self.frame_bytes)
+        print(f"   Inference chunk: {self.chunk_size} frames (~{self.frame_bytes / 1024**2:.1f} MB/frame, budget {INFERENCE_MEMORY_BUDGET_MB} MB)")
+        
+        # Batches merged across requests obey the same budget
+        self.scheduler = MicroBatchScheduler(self._forward_logits, max_batch_size=min(MICROBATCH_MAX_SIZE, self.chunk_size))
         self._loaded = True
         
         self._load_face_detector()
         
         print("✅ Model ready! (v7 Enhanced Detection)\n")
     
+    @property
+    def is_ready(self) -> bool:
+        """Model loaded and warmup finished (a failed warmup does not block traffic)."""
+        return self._loaded and self.warmup_state['status'] in ('ready', 'failed', 'skipped')
+    
+    def warmup(self) -> dict:
+        """
+        Run synthetic inputs through every lazily initialized path so the first
+        real request does not pay for it: one forward pass per configured batch
+        size (allocator + oneDNN kernel selection), tensor preprocessing, the
+        Haar cascades and the FFT geometry for the model resolution.
+        """
+        if not WARMUP_ENABLED:
+            return self.warmup_state
+        if not self._loaded:
+            self.load_model()
+        
+        self.warmup_state.update(status='running', steps={}, error=None)
+        steps = self.warmup_state['steps']
+        start = time.perf_counter()
+        print("🔥 Warming up detector...")
+        
+        try:
+            height, width = self.preprocessor.size if self.preprocessor else (self.optimal_size, self.optimal_size)
+            batch_sizes = sorted({1, BATCH_SIZE, self.scheduler.max_batch_size})
+            for batch in batch_sizes:
+                step_start = time.perf_counter()
+                self._forward_logits(torch.zeros((batch, 3, height, width), dtype=torch.float32))
+                steps[f'model_batch_{batch}'] = round(time.perf_counter() - step_start, 3)
+            
+            # Smooth gradient frame - enough structure for the cascades and FFT to do real work
+            yy, xx = np.mgrid[0:480, 0:640]
+            pixels = np.stack([xx * 255 // 639, yy * 255 // 479, (xx + yy) * 255 // 1118], axis=-1).astype(np.uint8)
+            frame = Image.fromarray(pixels)
+            crop = frame.resize((width, height))
+            
+            step_start = time.perf_counter()
+            self._infer_chunked([crop])
+            steps['preprocessing'] = round(time.perf_counter() - step_start, 3)
+            
+            step_start = time.perf_counter()
+            self.detect_faces(frame)
+            steps['face_detector'] = round(time.perf_counter() - step_start, 3)
+            
+            step_start = time.perf_counter()
+            self.analyze_frequency_domain(crop)
+            self.analyze_gan_fingerprint(crop)
+            steps['fft'] = round(time.perf_counter() - step_start, 3)
+            
+            self.warmup_state['status'] = 'ready'
+        except Exception as e:
+            self.warmup_state.update(status='failed', error=str(e))
+            print(f"   ⚠️ Warmup failed: {e}")
+        
+        self.warmup_state['duration_s'] = round(time.perf_counter() - start, 3)
+        print(f"✅ Warmup {self.warmup_state['status']} in {self.warmup_state['duration_s']:.2f}s {steps}")
+        return self.warmup_state
+    
     def _load_face_detector(self) -> None:
         """Load multi-detector face detection ensemble.
         
@@ -345,15 +504,10 @@ class DeepfakeDetector:
         # === NEW: GAN Fingerprint Detection ===
         # GAN-generated images often have periodic patterns in high frequencies
         h, w = magnitude.shape
-        center_h, center_w = h // 2, w // 2
+        geometry = get_radial_geometry(h, w)
         
         # Analyze high-frequency region (outer 30% of spectrum)
-        high_freq_mask = np.zeros_like(magnitude, dtype=bool)
-        for i in range(h):
-            for j in range(w):
-                dist = np.sqrt((i - center_h)**2 + (j - center_w)**2)
-                if dist > min(h, w) * 0.35:
-                    high_freq_mask[i, j] = True
+        high_freq_mask = geometry.high_frequency_mask(0.35)
         
         # Check for abnormal high-frequency peaks (GAN fingerprint)
         high_freq_values = magnitude[high_freq_mask]
@@ -372,20 +526,6 @@ class DeepfakeDetector:
             if peak_ratio > 0.01:  # More than 1% peaks indicates possible GAN
                 magnitude[high_freq_mask & (magnitude > peak_threshold)] *= 1.5
         
-        # === Radial Frequency Analysis ===
-        # Real images have natural 1/f falloff; GANs often don't
-        radial_profile = []
-        max_radius = min(center_h, center_w)
-        for r in range(1, max_radius, max_radius // 20):
-            ring_mask = np.zeros_like(magnitude, dtype=bool)
-            for i in range(h):
-                for j in range(w):
-                    dist = np.sqrt((i - center_h)**2 + (j - center_w)**2)
-                    if r - 2 <= dist <= r + 2:
-                        ring_mask[i, j] = True
-            if np.any(ring_mask):
-                radial_profile.append(np.mean(magnitude[ring_mask]))
-        
         # Log transform for visualization
         magnitude_log = np.log(magnitude + 1)
         
@@ -415,18 +555,8 @@ class DeepfakeDetector:
         
         # 1. Analyze radial frequency distribution
         radial_bins = 20
-        radial_means = []
-        for i in range(radial_bins):
-            r_min = i * min(center_h, center_w) / radial_bins
-            r_max = (i + 1) * min(center_h, center_w) / radial_bins
-            ring_values = []
-            for y in range(h):
-                for x in range(w):
-                    dist = np.sqrt((y - center_h)**2 + (x - center_w)**2)
-                    if r_min <= dist < r_max:
-                        ring_values.append(magnitude[y, x])
-            if ring_values:
-                radial_means.append(np.mean(ring_values))
+        band_edges = [i * min(center_h, center_w) / radial_bins for i in range(radial_bins + 1)]
+        radial_means = get_radial_geometry(h, w).band_means(magnitude, band_edges)
         
         # Check for natural 1/f decay (real images) vs flat spectrum (GANs)
         if len(radial_means) > 5:
@@ -545,7 +675,8 @@ class DeepfakeDetector:
         
         return suspicion, noise_image
     
-    def detect_screen_content(self, image: Image.Image) -> Tuple[bool, float, dict]:
+    def detect_screen_content(self, image: Image.Image, features: Optional[ImageFeatures] = None,
+                              max_size: Optional[int] = SCREEN_ANALYSIS_SIZE) -> Tuple[bool, float, dict]:
         """
         Detect if image contains screen/monitor content (gaming, coding, UI).
         
@@ -556,11 +687,20 @@ class DeepfakeDetector:
         - Consistent backlight glow
         - Text-like patterns
         
+        Images larger than `max_size` are checked on a downscaled copy, with
+        the pixel-sized thresholds (bright area, uniform block) scaled along.
+        
         Returns: (is_screen_content, confidence, details)
         """
-        img_array = np.array(image)
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+        scale = max(image.size) / max_size if max_size else 1.0
+        if scale > 1.0:
+            image = image.resize((max(1, round(image.width / scale)), max(1, round(image.height / scale))), Image.BOX)
+            features = features.derive(image) if features is not None else None
+        else:
+            scale = 1.0
+        features = features or ImageFeatures(image)
+        gray = features.gray
+        hsv = features.hsv
         
         indicators = []
         confidence = 0.0
@@ -572,7 +712,7 @@ class DeepfakeDetector:
             # Has distinct bright rectangular areas (like a monitor)
             contours, _ = cv2.findContours(bright_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
             for cnt in contours:
-                if cv2.contourArea(cnt) > 5000:  # Significant bright region
+                if cv2.contourArea(cnt) > 5000 / scale**2:  # Significant bright region
                     x, y, w, h = cv2.boundingRect(cnt)
                     aspect = w / h if h > 0 else 0
                     # Monitor aspect ratios: 16:9 (1.78), 16:10 (1.6), 21:9 (2.33), 4:3 (1.33)
@@ -595,15 +735,15 @@ class DeepfakeDetector:
             confidence += 0.2
         
         # 4. Check for sharp edges (UI elements, text)
-        edges = cv2.Canny(gray, 50, 150)
-        edge_ratio = np.sum(edges > 0) / edges.size
+        edges = features.canny(50, 150)
+        # Edges are lines, so their share of pixels grows with the downscale factor
+        edge_ratio = np.sum(edges > 0) / edges.size / scale
         if edge_ratio > 0.08:
             indicators.append("high_edge_density")
             confidence += 0.15
         
         # 5. Check for horizontal/vertical line dominance (UI grids, code)
-        sobel_h = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        sobel_v = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+        sobel_v, sobel_h = features.sobel()
         h_energy = np.sum(np.abs(sobel_h))
         v_energy = np.sum(np.abs(sobel_v))
         
@@ -614,18 +754,14 @@ class DeepfakeDetector:
         
         # 6. Check for uniform color blocks (solid UI backgrounds)
         # Divide image into blocks and check color uniformity
-        block_size = 32
+        block_size = max(8, round(32 / scale))
         h, w = gray.shape
-        uniform_blocks = 0
-        total_blocks = 0
-        for y in range(0, h - block_size, block_size):
-            for x in range(0, w - block_size, block_size):
-                block = gray[y:y+block_size, x:x+block_size]
-                if np.std(block) < 10:  # Very uniform block
-                    uniform_blocks += 1
-                total_blocks += 1
-        
+        # Blocks starting at range(0, h - block_size, block_size) (the last whole row / column is not counted)
+        rows, cols = len(range(0, h - block_size, block_size)), len(range(0, w - block_size, block_size))
+        total_blocks = rows * cols
         if total_blocks > 0:
+            _, block_variance = features.gray_block_moments(block_size)
+            uniform_blocks = int(np.sum(np.sqrt(block_variance[:rows, :cols]) < 10))  # Very uniform block
             uniform_ratio = uniform_blocks / total_blocks
             if uniform_ratio > 0.15:
                 indicators.append("uniform_color_blocks")
@@ -680,7 +816,7 @@ class DeepfakeDetector:
         
         return mouth_region
     
-    def detect_face_type(self, face_image: Image.Image) -> Tuple[str, float]:
+    def detect_face_type(self, face_image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[str, float]:
         """
         Detect if face is:
         - 'photographic': Real photo of human face
@@ -689,24 +825,21 @@ class DeepfakeDetector:
         
         Returns (face_type, confidence)
         """
-        img_array = np.array(face_image)
+        features = features or ImageFeatures(face_image)
         
         # 1. Check gradient complexity (AI and animated have smoother gradients)
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-        sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-        gradient_mag = np.sqrt(sobel_x**2 + sobel_y**2)
+        gradient_mag = features.gradient_magnitude()
         gradient_complexity = np.std(gradient_mag)
         
         # 2. Check color saturation distribution
-        hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+        hsv = features.hsv
         saturation = hsv[:, :, 1]
         sat_mean = np.mean(saturation)
         sat_std = np.std(saturation)
         
         # 3. Analyze skin tone realism
         # Convert to LAB for better skin analysis
-        lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
+        lab = features.lab
         l_channel = lab[:, :, 0]
         a_channel = lab[:, :, 1]  # Green-red
         b_channel = lab[:, :, 2]  # Blue-yellow
@@ -716,11 +849,11 @@ class DeepfakeDetector:
         a_in_skin_range = np.sum((a_channel > 120) & (a_channel < 160)) / a_channel.size
         
         # 4. Check for sharp color boundaries (common in cartoons)
-        edges = cv2.Canny(img_array, 50, 150)
+        edges = features.canny(50, 150, color=True)
         edge_density = np.sum(edges > 0) / edges.size
         
         # 5. Texture variance (photos have more micro-texture)
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+        laplacian_var = features.laplacian.var()
         
         # Decision logic
         animated_score = 0.0
@@ -763,14 +896,14 @@ class DeepfakeDetector:
         
         return face_type, confidence
     
-    def analyze_skin_naturalness(self, face_image: Image.Image) -> Tuple[float, str]:
+    def analyze_skin_naturalness(self, face_image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, str]:
         """
         Analyze if skin looks natural or AI-generated.
         AI skin is often too smooth, too uniform, or has subtle periodic patterns.
         Returns (suspicion_score, reason)
         """
-        img_array = np.array(face_image)
-        gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+        features = features or ImageFeatures(face_image)
+        gray = features.gray
         
         # 1. Check for excessive smoothness (low high-frequency content)
         blurred = cv2.GaussianBlur(gray, (7, 7), 0)
@@ -784,7 +917,7 @@ class DeepfakeDetector:
         pore_density = np.sum(tophat > 20) / tophat.size
         
         # 3. Check for unnatural color uniformity in face region
-        hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+        hsv = features.hsv
         hue_std = np.std(hsv[:, :, 0])
         
         suspicion = 0.0
@@ -808,7 +941,7 @@ class DeepfakeDetector:
         reason = "; ".join(reasons) if reasons else "natural skin"
         return min(suspicion, 1.0), reason
     
-    def detect_social_media_filters(self, image: Image.Image) -> Tuple[float, Dict]:
+    def detect_social_media_filters(self, image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
         """
         Detect Instagram/TikTok/Snapchat beauty filters and effects.
         
@@ -832,10 +965,10 @@ class DeepfakeDetector:
         }
         
         try:
-            img_array = np.array(image.convert('RGB'))
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
-            lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
+            features = features or ImageFeatures(image)
+            gray = features.gray
+            hsv = features.hsv
+            lab = features.lab
             
             h, w = gray.shape
             
@@ -849,7 +982,7 @@ class DeepfakeDetector:
             texture_mean = np.mean(texture)
             
             # Calculate edge sharpness
-            edges = cv2.Canny(gray, 50, 150)
+            edges = features.canny(50, 150)
             edge_density = np.sum(edges > 0) / edges.size
             
             # Smoothed skin: low texture BUT sharp edges (unnatural combination)
@@ -944,100 +1077,17 @@ class DeepfakeDetector:
             print(f"   ⚠️ Filter detection failed: {e}")
             return 0.0, {'error': str(e), 'filters_detected': []}
     
-    def analyze_image_content_type(self, image: Image.Image) -> Dict:
-        """
-        Comprehensive content type analysis for smart routing.
-        
-        Determines:
-        - has_face: Boolean
-        - face_type: 'photographic', 'animated', 'ai_generated', or None
-        - content_type: 'portrait', 'group', 'scene', 'object', 'abstract'
-        - has_filter: Boolean
-        - filter_intensity: 0.0 - 1.0
-        - recommended_analysis: List of analysis methods to apply
-        
-        """
-        result = {
-            'has_face': False,
-            'face_count': 0,
-            'face_type': None,
-            'content_type': 'unknown',
-            'has_filter': False,
-            'filter_intensity': 0.0,
-            'filter_details': {},
-            'recommended_analysis': []
-        }
-        
-        try:
-            # 1. Detect faces
-            faces = self.detect_faces(image)
-            result['face_count'] = len(faces)
-            result['has_face'] = len(faces) > 0
-            
-            # 2. Determine content type based on face count
-            if len(faces) == 0:
-                # No faces - analyze scene type
-                result['content_type'] = 'scene'
-                result['recommended_analysis'] = ['ai_art_detection', 'background_analysis', 'scene_consistency']
-                
-            elif len(faces) == 1:
-                result['content_type'] = 'portrait'
-                # Get face type for the primary face
-                face_img = self._extract_face(image, faces[0])
-                if face_img:
-                    face_type, confidence = self.detect_face_type(face_img)
-                    result['face_type'] = face_type
-                    result['recommended_analysis'] = ['face_analysis', 'eye_region', 'fft_analysis']
-                    
-            else:
-                result['content_type'] = 'group'
-                result['recommended_analysis'] = ['multi_face_analysis', 'fft_analysis', 'temporal_consistency']
-            
-            # 3. Detect filters
-            filter_score, filter_details = self.detect_social_media_filters(image)
-            result['has_filter'] = filter_score > 0.3
-            result['filter_intensity'] = round(filter_score, 3)
-            result['filter_details'] = filter_details
-            
-            # 4. Adjust recommendations if filter detected
-            if result['has_filter']:
-                result['recommended_analysis'].append('filter_compensation')
-            
-            return result
-            
-        except Exception as e:
-            print(f"   ⚠️ Content type analysis failed: {e}")
-            result['error'] = str(e)
-            return result
-    
-    def _extract_face(self, image: Image.Image, face_info: 'FaceInfo') -> Optional[Image.Image]:
-        """Extract face region from image with margin."""
-        try:
-            x, y, w, h = face_info.bbox
-            img_w, img_h = image.size
-            
-            margin_x = int(w * FACE_MARGIN)
-            margin_y = int(h * FACE_MARGIN)
-            
-            x1 = max(0, x - margin_x)
-            y1 = max(0, y - margin_y)
-            x2 = min(img_w, x + w + margin_x)
-            y2 = min(img_h, y + h + margin_y)
-            
-            return image.crop((x1, y1, x2, y2))
-        except:
-            return None
-    
-    def assess_image_quality(self, image: Image.Image) -> float:
+    def assess_image_quality(self, image: Image.Image, features: Optional[ImageFeatures] = None) -> float:
         """
         Assess image quality (0-1). Low quality = less reliable detection.
         Used to adjust confidence in final scoring.
         """
         try:
-            gray = np.array(image.convert('L'))
+            features = features or ImageFeatures(image)
+            gray = features.gray
             
             # Check for blur (Laplacian variance) - higher = sharper
-            blur_score = cv2.Laplacian(gray, cv2.CV_64F).var()
+            blur_score = features.laplacian.var()
             blur_quality = min(1.0, blur_score / 150.0)  # Normalize to 0-1
             
             # Check resolution - larger = more detail
@@ -1073,30 +1123,31 @@ class DeepfakeDetector:
             h, w = img_array.shape
             block_size = 8
             
-            # Calculate block boundary discontinuities
-            horizontal_discontinuity = 0
-            vertical_discontinuity = 0
-            block_count = 0
-            
-            for y in range(block_size, h - block_size, block_size):
-                for x in range(block_size, w - block_size, block_size):
-                    # Horizontal boundary
-                    left_block = img_array[y-block_size:y, x-block_size:x].astype(float)
-                    right_block = img_array[y-block_size:y, x:x+block_size].astype(float)
-                    if left_block.size > 0 and right_block.size > 0:
-                        h_diff = np.abs(left_block[:, -1].mean() - right_block[:, 0].mean())
-                        horizontal_discontinuity += h_diff
-                    
-                    # Vertical boundary
-                    top_block = img_array[y-block_size:y, x:x+block_size].astype(float)
-                    bottom_block = img_array[y:y+block_size, x:x+block_size].astype(float)
-                    if top_block.size > 0 and bottom_block.size > 0:
-                        v_diff = np.abs(top_block[-1, :].mean() - bottom_block[0, :].mean())
-                        vertical_discontinuity += v_diff
-                    
-                    block_count += 1
+            # Block grid: interior corners (y, x) at 8 px strides, as in
+            # range(block_size, h - block_size, block_size)
+            rows = len(range(block_size, h - block_size, block_size))
+            cols = len(range(block_size, w - block_size, block_size))
+            block_count = rows * cols
             
             if block_count > 0:
+                # Calculate block boundary discontinuities with whole-image
+                # reductions. Per corner: |mean of the 8 pixels left of the
+                # vertical boundary - mean of the 8 right of it| over the block
+                # rows above y, and the same across the horizontal boundary over
+                # the block columns right of x. Sums of uint8 are exact in int64,
+                # so the totals equal the per-block float accumulation exactly.
+                span_y, span_x = rows * block_size, cols * block_size
+                band = img_array[:span_y].reshape(rows, block_size, w)
+                left_sums = band[:, :, block_size - 1:span_x:block_size].sum(axis=1, dtype=np.int64)
+                right_sums = band[:, :, block_size:span_x + 1:block_size].sum(axis=1, dtype=np.int64)
+                top_rows = img_array[block_size - 1:span_y:block_size, block_size:span_x + block_size]
+                bottom_rows = img_array[block_size:span_y + 1:block_size, block_size:span_x + block_size]
+                top_sums = top_rows.reshape(rows, cols, block_size).sum(axis=2, dtype=np.int64)
+                bottom_sums = bottom_rows.reshape(rows, cols, block_size).sum(axis=2, dtype=np.int64)
+                
+                horizontal_discontinuity = np.float64(np.abs(left_sums - right_sums).sum()) / block_size
+                vertical_discontinuity = np.float64(np.abs(top_sums - bottom_sums).sum()) / block_size
+                
                 avg_h_disc = horizontal_discontinuity / block_count
                 avg_v_disc = vertical_discontinuity / block_count
                 
@@ -1125,15 +1176,19 @@ class DeepfakeDetector:
             print(f"   ⚠️ Compression analysis failed: {e}")
             return 0.0, {'compression_score': 0, 'double_compression_detected': False, 'error': str(e)}
     
-    def analyze_exif_metadata(self, image: Image.Image) -> Tuple[float, dict]:
+    def analyze_exif_metadata(self, image: Optional[Image.Image] = None, exif: Optional[Image.Exif] = None,
+                              xmp_tools: Sequence[str] = ()) -> Tuple[float, dict]:
         """
         Check for editing software traces and manipulation signs in EXIF data.
         Returns suspicion score and analysis details.
+        
+        `exif` (and the XMP creator tools) can come straight from the JPEG
+        bitstream (see jpeg_bitstream.py); `image` is only read without it.
         """
         try:
             from PIL.ExifTags import TAGS
             
-            exif_data = image.getexif()
+            exif_data = exif if exif is not None else image.getexif()
             details = {
                 'metadata_stripped': False,
                 'editing_software_detected': False,
@@ -1143,7 +1198,7 @@ class DeepfakeDetector:
                 'modification_date': None
             }
             
-            if not exif_data:
+            if not exif_data and not xmp_tools:
                 # Stripped metadata is common in edited images
                 details['metadata_stripped'] = True
                 return 0.3, details
@@ -1187,6 +1242,14 @@ class DeepfakeDetector:
                 if tag == 'DateTime':
                     details['modification_date'] = str(value)
             
+            # XMP creator tool / edit history (written by editors that leave EXIF Software alone)
+            for tool_name in xmp_tools:
+                details['software_name'] = details['software_name'] or tool_name
+                if any(tool in tool_name.lower() for tool in editing_tools):
+                    details['editing_software_detected'] = True
+                    details['suspicious_fields'].append(f"XMP: {tool_name[:50]}")
+                    suspicion = max(suspicion, 0.4)
+            
             # Check for date inconsistencies
             if details['original_date'] and details['modification_date']:
                 if details['original_date'] != details['modification_date']:
@@ -1199,10 +1262,14 @@ class DeepfakeDetector:
             print(f"   ⚠️ EXIF analysis failed: {e}")
             return 0.0, {'error': str(e)}
     
-    def detect_blending_boundaries(self, image: Image.Image, face: 'FaceInfo' = None) -> Tuple[float, dict]:
+    def detect_blending_boundaries(self, image: Image.Image, face: 'FaceInfo' = None,
+                                   source: Optional[DecodedImage] = None) -> Tuple[float, dict]:
         """
         Detect face-swap edges using gradient analysis.
         Returns suspicion score and analysis details.
+        
+        With `source`, the face border is read at native resolution when the
+        working image was downscaled at decode time.
         """
         try:
             img_array = np.array(image.convert('RGB'))
@@ -1216,7 +1283,10 @@ class DeepfakeDetector:
                 y1 = max(0, y - margin)
                 x2 = min(img_array.shape[1], x + w + margin)
                 y2 = min(img_array.shape[0], y + h + margin)
-                roi = img_array[y1:y2, x1:x2]
+                if source is not None and source.downscaled:
+                    roi = np.array(source.roi((x1, y1, x2, y2)))
+                else:
+                    roi = img_array[y1:y2, x1:x2]
             else:
                 # Use center region
                 h, w = img_array.shape[:2]
@@ -1425,14 +1495,20 @@ class DeepfakeDetector:
             print(f"   ⚠️ Ensemble check failed: {e}")
             return primary_score, {'ensemble_used': False, 'error': str(e)}
     
-    def analyze_image_content_type(self, image: Image.Image) -> dict:
+    def analyze_image_content_type(self, image: Image.Image, features: Optional[ImageFeatures] = None,
+                                   detection: Optional[FaceDetection] = None) -> dict:
         """
         Analyze what type of content the image contains:
         - has_face: Boolean
         - face_type: 'photographic', 'animated', 'ai_generated', or None
         - content_type: 'portrait', 'group', 'scene', 'object', 'abstract'
+        
+        Pass the analysis' `detection` to reuse its faces and face crops.
         """
-        faces = self.detect_faces(image)
+        features = features or ImageFeatures(image)
+        if detection is None:
+            detection = self.find_faces(image)
+        faces = detection.faces
         
         result = {
             'has_face': len(faces) > 0,
@@ -1446,29 +1522,26 @@ class DeepfakeDetector:
         
         if faces:
             # Analyze the largest/most prominent face
-            main_face = max(faces, key=lambda f: f.bbox[2] * f.bbox[3])
-            face_crop = self.extract_face_crop(image, main_face)
+            face_crop = detection.crop(detection.main_face, self.optimal_size)
+            crop_features = features.derive(face_crop)
             
-            face_type, type_confidence = self.detect_face_type(face_crop)
+            face_type, type_confidence = self.detect_face_type(face_crop, crop_features)
             result['face_type'] = face_type
             result['face_type_confidence'] = type_confidence
             
             if face_type == 'photographic':
-                skin_suspicion, skin_reason = self.analyze_skin_naturalness(face_crop)
+                skin_suspicion, skin_reason = self.analyze_skin_naturalness(face_crop, crop_features)
                 result['skin_suspicion'] = skin_suspicion
                 result['skin_reason'] = skin_reason
             
             result['content_type'] = 'portrait' if len(faces) == 1 else 'group'
         else:
             # Analyze non-face content
-            img_array = np.array(image.convert('RGB'))
-            
             # Check for text/abstract patterns
-            edges = cv2.Canny(img_array, 50, 150)
+            edges = features.canny(50, 150, color=True)
             edge_density = np.sum(edges > 0) / edges.size
             
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            texture_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+            texture_var = features.laplacian.var()
             
             if edge_density > 0.15:  # Very high edge content
                 result['content_type'] = 'abstract'
@@ -1531,8 +1604,13 @@ class DeepfakeDetector:
         
         return face_infos
     
-    def extract_face_crop(self, image: Image.Image, face: FaceInfo) -> Image.Image:
+    def find_faces(self, image: Image.Image) -> FaceDetection:
+        """Detect faces once for an image analysis (see FaceDetection)."""
+        return FaceDetection(image, self.detect_faces(image), self.extract_face_crop)
+    
+    def extract_face_crop(self, image: Image.Image, face: FaceInfo, size: Optional[int] = None) -> Image.Image:
         """Extract a face crop with margin from the image, with v6 enhanced preprocessing."""
+        size = size or self.optimal_size
         x, y, w, h = face.bbox
         img_w, img_h = image.size
         
@@ -1545,7 +1623,7 @@ class DeepfakeDetector:
         bottom = min(img_h, y + h + margin_y)
         
         face_crop = image.crop((left, top, right, bottom))
-        face_crop = face_crop.resize((self.optimal_size, self.optimal_size), Image.LANCZOS)
+        face_crop = face_crop.resize((size, size), Image.LANCZOS)
         
         # v6 Enhanced preprocessing for better clarity
         face_crop = self._enhance_face_crop(face_crop)
@@ -1656,9 +1734,7 @@ class DeepfakeDetector:
                 # Remove query parameters that might cause issues
                 if '?' in clean_path:
                     clean_path = clean_path.split('?')[0]
-                clean_url = base + clean_path
-                print(f"   📌 URL cleaned: removed transformations")
-                return clean_url
+                return base + clean_path
             
             # No version found - might be a different URL format
             # Try to remove common transformation prefixes
@@ -1696,7 +1772,7 @@ class DeepfakeDetector:
                 # Clean the URL before downloading
                 clean_url = self.clean_cloudinary_url(url)
                 
-                response = requests.get(clean_url, timeout=timeout)
+                response = self._http.get(clean_url, timeout=timeout)
                 
                 # Handle specific HTTP errors
                 if response.status_code == 404:
@@ -1705,7 +1781,7 @@ class DeepfakeDetector:
                     # Try original URL without cleaning
                     if clean_url != url:
                         print(f"   🔄 Retrying with original URL...")
-                        response = requests.get(url, timeout=timeout)
+                        response = self._http.get(url, timeout=timeout)
                         response.raise_for_status()
                     else:
                         response.raise_for_status()
@@ -1735,33 +1811,47 @@ class DeepfakeDetector:
         
         raise Exception(f"Download failed after {max_retries} attempts: {last_error}")
     
+    def download_cached(self, url: str, timeout: int = 60) -> bytes:
+        """Download with retry logic, served from the media cache when possible."""
+        content = self._get_cached_media(url)
+        if content is None:
+            content = self.download_with_retry(url, timeout=timeout)
+            self._set_cached_media(url, content)
+        return content
+    
     def download_media(self, url: str) -> Tuple[bytes, str]:
         """Download media from URL with retry logic."""
-        content = self.download_with_retry(url)
+        content = self.download_cached(url)
         return content, self.detect_media_type(url)
     
     def download_image(self, url: str) -> Image.Image:
         """Download image from URL with retry logic."""
-        content = self.download_with_retry(url, timeout=30)
-        return Image.open(BytesIO(content)).convert("RGB")
+        content = self.download_cached(url, timeout=30)
+        return decode_image(content, MAX_IMAGE_SIZE).image
     
     # ==================== IMAGE ANALYSIS v5 ====================
     
-    def generate_image_frames(self, image: Image.Image) -> Tuple[List[Tuple[Image.Image, str, float]], List[FaceInfo], dict]:
+    def generate_image_frames(self, image: Image.Image, detection: Optional[FaceDetection] = None,
+                              features: Optional[ImageFeatures] = None) -> Tuple[List[Tuple[Image.Image, str, float]], List[FaceInfo], dict]:
         """
         Generate analysis frames with v5 enhanced techniques.
         Now returns content_info dict for better classification.
+        Pass the analysis' `detection` and `features` to reuse its faces,
+        face crops and feature planes.
         """
+        features = features or ImageFeatures(image)
         frames = []
         w, h = image.size
         size = self.optimal_size
         
         # Detect faces
-        faces = self.detect_faces(image)
-        print(f"   👤 Detected {len(faces)} face(s)")
+        if detection is None:
+            detection = self.find_faces(image)
+            print(f"   👤 Detected {len(detection)} face(s)")
+        faces = detection.faces
         
         # Analyze content type for smarter processing
-        content_info = self.analyze_image_content_type(image) if VIDEO_SUPPORT else {
+        content_info = self.analyze_image_content_type(image, features, detection) if VIDEO_SUPPORT else {
             'has_face': len(faces) > 0,
             'face_count': len(faces),
             'face_type': None,
@@ -1782,7 +1872,7 @@ class DeepfakeDetector:
         
         if faces:
             for i, face in enumerate(faces):
-                face_crop = self.extract_face_crop(image, face)
+                face_crop = detection.crop(face, size)
                 base_weight = 5.0 - (i * 0.3)
                 
                 # 1. Original face at multiple scales
@@ -1847,7 +1937,7 @@ class DeepfakeDetector:
             # NEW v7: Run AI art signature detection for no-face images
             if AI_ART_DETECTION_AVAILABLE:
                 try:
-                    ai_art_result = comprehensive_no_face_analysis(image)
+                    ai_art_result = comprehensive_no_face_analysis(image, features)
                     content_info['ai_art_analysis'] = ai_art_result
                     
                     # Add boost for AI art detection
@@ -1903,14 +1993,23 @@ class DeepfakeDetector:
     
     # ==================== VIDEO ANALYSIS ====================
     
-    def extract_video_frames(self, video_data: bytes) -> Tuple[List[Tuple[Image.Image, str, float]], List[FaceInfo]]:
-        """Extract key frames from video with v5 enhanced analysis."""
+    def extract_video_frames(self, video: Union[bytes, str]) -> Tuple[List[Tuple[Image.Image, str, float]], List[FaceInfo]]:
+        """
+        Extract key frames from video with v5 enhanced analysis.
+        
+        Args:
+            video: Video bytes, or the path of a spooled video file (left in place)
+        """
         if not VIDEO_SUPPORT:
             raise RuntimeError("OpenCV not installed - cannot process video")
         
-        with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
-            f.write(video_data)
-            temp_path = f.name
+        owns_temp_file = not isinstance(video, str)
+        if owns_temp_file:
+            with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as f:
+                f.write(video)
+                temp_path = f.name
+        else:
+            temp_path = video
         
         try:
             cap = cv2.VideoCapture(temp_path)
@@ -2072,23 +2171,25 @@ class DeepfakeDetector:
                 cap.release()
             raise e
         finally:
-            # On Windows, we need to ensure the file handle is released
-            # before we can delete. Add a small delay and retry logic.
-            import time
-            import gc
-            gc.collect()  # Force garbage collection to release file handles
-            
-            for attempt in range(3):
-                try:
-                    time.sleep(0.1)  # Small delay for file handle release
-                    os.unlink(temp_path)
-                    break
-                except PermissionError:
-                    if attempt == 2:
-                        # Last attempt failed, log but don't crash
-                        print(f"   ⚠️  Warning: Could not delete temp file: {temp_path}")
-                    else:
-                        time.sleep(0.5)  # Longer wait before retry    
+            # Spooled files belong to the caller (IngestedMedia.cleanup)
+            if owns_temp_file:
+                # On Windows, we need to ensure the file handle is released
+                # before we can delete. Add a small delay and retry logic.
+                import time
+                import gc
+                gc.collect()  # Force garbage collection to release file handles
+                
+                for attempt in range(3):
+                    try:
+                        time.sleep(0.1)  # Small delay for file handle release
+                        os.unlink(temp_path)
+                        break
+                    except PermissionError:
+                        if attempt == 2:
+                            # Last attempt failed, log but don't crash
+                            print(f"   ⚠️  Warning: Could not delete temp file: {temp_path}")
+                        else:
+                            time.sleep(0.5)  # Longer wait before retry    
     def analyze_temporal_consistency(self, results: List[Dict[str, float]]) -> float:
         """Analyze temporal consistency across video frames."""
         if len(results) < 2:
@@ -2105,17 +2206,97 @@ class DeepfakeDetector:
     
     # ==================== CORE CLASSIFICATION ====================
     
+    def _estimate_frame_bytes(self) -> int:
+        """Rough peak bytes one frame costs in a forward pass (input + widest layer activations, fp32)."""
+        cfg = getattr(self.model.config, 'vision_config', self.model.config)
+        image_size = getattr(cfg, 'image_size', self.optimal_size)
+        patch_size = getattr(cfg, 'patch_size', 16)
+        hidden = getattr(cfg, 'hidden_size', 768)
+        intermediate = getattr(cfg, 'intermediate_size', hidden * 4)
+        heads = getattr(cfg, 'num_attention_heads', 12)
+        
+        tokens = (image_size // patch_size) ** 2
+        input_bytes = 3 * image_size * image_size * 4
+        # Residual stream + MLP hidden state + attention scores and probabilities
+        activation_bytes = tokens * (2 * hidden + intermediate) * 4 + 2 * heads * tokens * tokens * 4
+        return input_bytes + activation_bytes
+    
+    def _input_buffer(self, rows: int, shape: Tuple[int, ...]) -> torch.Tensor:
+        """Reusable pixel_values buffer for the calling thread, grown only when needed."""
+        buffer = getattr(self._buffers, 'pixel_values', None)
+        if buffer is None or buffer.shape[0] < rows or tuple(buffer.shape[1:]) != tuple(shape):
+            buffer = torch.empty((max(rows, self.chunk_size), *shape), dtype=torch.float32)
+            self._buffers.pixel_values = buffer
+        return buffer[:rows]
+    
+    def _infer_chunked(self, images: List[Image.Image]) -> Tuple[List[List[float]], dict]:
+        """
+        Run images through the model in chunks of self.chunk_size.
+        
+        Only one chunk of pixel_values is alive at a time, so memory is bounded by
+        the budget instead of the frame count. Returns per-frame probabilities and
+        memory accounting for the request.
+        """
+        process = psutil.Process() if PSUTIL_AVAILABLE else None
+        rss_start = process.memory_info().rss if process else 0
+        rss_peak = rss_start
+        
+        batch_probs = []
+        chunks = 0
+        buffer_bytes = 0
+        for offset in range(0, len(images), self.chunk_size):
+            chunk = images[offset:offset + self.chunk_size]
+            if self.preprocessor is not None:
+                # uint8 pixels written straight into the reusable batch buffer
+                buffer = self._input_buffer(len(chunk), self.preprocessor.shape)
+                self.preprocessor.fill(chunk, buffer)
+            else:
+                pixel_values = self.processor(images=chunk, return_tensors="pt")['pixel_values']
+                buffer = self._input_buffer(len(chunk), pixel_values.shape[1:])
+                buffer.copy_(pixel_values)
+                del pixel_values
+            buffer_bytes = max(buffer_bytes, buffer.nbytes)
+            
+            logits = self.scheduler.infer(buffer)
+            batch_probs.extend(torch.nn.functional.softmax(logits, dim=1).tolist())
+            chunks += 1
+            
+            if process:
+                rss_peak = max(rss_peak, process.memory_info().rss)
+        
+        mb = 1024 * 1024
+        memory = {
+            'budget_mb': INFERENCE_MEMORY_BUDGET_MB,
+            'chunk_size': self.chunk_size,
+            'chunks': chunks,
+            'input_buffer_mb': round(buffer_bytes / mb, 2),
+            'estimated_peak_mb': round(min(len(images), self.chunk_size) * self.frame_bytes / mb, 2),
+            'rss_start_mb': round(rss_start / mb, 2) if process else None,
+            'rss_peak_mb': round(rss_peak / mb, 2) if process else None,
+            'rss_delta_mb': round((rss_peak - rss_start) / mb, 2) if process else None,
+        }
+        return batch_probs, memory
+    
+    def _forward_logits(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        """One SigLIP forward pass (runs on the micro-batch scheduler thread)."""
+        if self.onnx_classifier is not None:
+            try:
+                return self.onnx_classifier(pixel_values)
+            except Exception as e:
+                print(f"   ⚠️ ONNX inference failed ({e}) - falling back to torch")
+                self.onnx_classifier = None
+                self.backend = "torch"
+        
+        with torch.no_grad():
+            return self.model(pixel_values=pixel_values.to(self.device)).logits.cpu()
+    
     def classify_single(self, image: Image.Image) -> Dict[str, float]:
         """Classify a single image."""
         if not self._loaded:
             self.load_model()
         
-        inputs = self.processor(images=image, return_tensors="pt")
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            probs = torch.nn.functional.softmax(outputs.logits, dim=1).squeeze().tolist()
+        batch_probs, _ = self._infer_chunked([image])
+        probs = batch_probs[0]
         
         return {ID2LABEL[i]: round(probs[i], 4) for i in range(len(probs))}
     
@@ -2144,17 +2325,12 @@ class DeepfakeDetector:
         print(f"🚀 Batch processing {total} frames...")
         start = time.time()
         
-        # BATCH INFERENCE: Process all frames in one model call
+        # BATCH INFERENCE: Memory-bounded chunks, shared with concurrent requests
         images_list = [f[0] for f in frames]
-        inputs = self.processor(images=images_list, return_tensors="pt")
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            batch_probs = torch.nn.functional.softmax(outputs.logits, dim=1).tolist()
+        batch_probs, inference_memory = self._infer_chunked(images_list)
         
         batch_time = time.time() - start
-        print(f"✅ Batch inference: {batch_time:.2f}s for {total} frames")
+        print(f"✅ Batch inference: {batch_time:.2f}s for {total} frames ({inference_memory['chunks']} chunks of ≤{self.chunk_size})")
         print(f"{'─'*70}")
         
         # Aggregate results from batch
@@ -2360,6 +2536,7 @@ class DeepfakeDetector:
             'avg_eye_score': sum(eye_scores) / len(eye_scores) if eye_scores else None,
             'multi_face_analysis': multi_face_analysis,
             'frame_breakdown': frame_breakdown,  # NEW: Individual frame analysis
+            'inference_memory': inference_memory,
             # v8 accuracy improvements metadata
             'v8_accuracy': {
                 'face_consistency_boost': face_consistency_boost,
@@ -2464,32 +2641,153 @@ class DeepfakeDetector:
     
     def classify_from_url(self, url: str) -> Tuple[Dict[str, float], str, float, dict]:
         """Main entry: Analyze image or video from URL."""
+        content, media_type = self.fetch_media(url)
+        return self.classify_content(content, media_type)
+    
+    def _start_fetch(self, url: str) -> Tuple[str, int]:
+        """Detect the media type and log the download; returns (media_type, timeout)."""
         media_type = self.detect_media_type(url)
         
         print(f"{'='*70}")
         print(f"📥 DOWNLOADING {'VIDEO' if media_type == MediaType.VIDEO else 'IMAGE'}...")
         print(f"   URL: {url[:60]}...")
         
-        if media_type == MediaType.VIDEO:
-            return self._analyze_video(url)
+        return media_type, 60 if media_type == MediaType.VIDEO else 30
+    
+    def fetch_media(self, url: str) -> Tuple[bytes, str]:
+        """Download raw media bytes and detect the media type (no analysis)."""
+        media_type, timeout = self._start_fetch(url)
+        content = self.download_cached(url, timeout=timeout)
+        return content, media_type
+    
+    async def fetch_media_async(self, url: str) -> IngestedMedia:
+        """
+        Stream media from the shared aiohttp connection pool into an
+        IngestedMedia (type sniffed from magic bytes, per-type size caps,
+        images decoded while downloading, videos spooled to a file).
+        The caller owns the result and must call cleanup() when done.
+        """
+        url_type, timeout = self._start_fetch(url)
+        # Spilled cache entries are files - keep their I/O off the event loop
+        content = await asyncio.to_thread(self._get_cached_media, url)
+        if content is not None:
+            return await asyncio.to_thread(ingest_bytes, content, url_type)
+        
+        clean_url = self.clean_cloudinary_url(url)
+        if clean_url != url:
+            print(f"   📌 URL cleaned: removed transformations")
+        sink = await self._downloader.stream(
+            url, lambda: MediaSink(url_type), clean_url=clean_url, timeout=timeout
+        )
+        media = await asyncio.to_thread(sink.close)
+        if media.media_type != url_type:
+            print(f"   🔎 File signature says {media.media_type.upper()} (URL suggested {url_type})")
+        try:
+            await asyncio.to_thread(self._set_cached_ingested, url, media)
+        except OSError as e:
+            print(f"   ⚠️ Could not cache download: {e}")
+        return media
+    
+    def _set_cached_ingested(self, url: str, media: IngestedMedia) -> None:
+        if media.path is not None:
+            self._media_cache.set_file(self.clean_cloudinary_url(url), media.path)
         else:
-            return self._analyze_image(url)
+            self._set_cached_media(url, media.data)
+    
+    def classify_content(self, content: bytes, media_type: str) -> Tuple[Dict[str, float], str, float, dict]:
+        """Analyze already downloaded media bytes (`media_type` is used if the signature is unknown)."""
+        media = ingest_bytes(content, media_type)
+        try:
+            return self.classify_media(media)
+        finally:
+            media.cleanup()
+    
+    def classify_media(self, media: IngestedMedia) -> Tuple[Dict[str, float], str, float, dict]:
+        """Analyze ingested media (see media_ingest.py)."""
+        if media.media_type == MediaType.VIDEO:
+            return self._analyze_video(media)
+        
+        decoded = media.decode(MAX_IMAGE_SIZE)
+        try:
+            return self._analyze_image(decoded.image, decoded, media.content_hash)
+        finally:
+            decoded.release()
     
-    def _analyze_image(self, url: str) -> Tuple[Dict[str, float], str, float, dict]:
-        """Analyze image with v7 enhanced techniques (Phase 1 Advanced Detection)."""
-        image = self.download_image(url)
-        print(f"✅ Downloaded: {image.size[0]}x{image.size[1]} pixels")
+    def _analyze_image(self, image: Image.Image, decoded: Optional[DecodedImage] = None,
+                       analysis_id: Optional[str] = None) -> Tuple[Dict[str, float], str, float, dict]:
+        """
+        Analyze image with v7 enhanced techniques (Phase 1 Advanced Detection).
+        
+        Args:
+            image: Working image (longer side <= MAX_IMAGE_SIZE)
+            decoded: Decode result, for the original EXIF and native-resolution regions
+            analysis_id: Key of the stored artifacts (the media content hash)
+        """
+        if decoded is not None and decoded.downscaled:
+            print(f"✅ Downloaded: {decoded.original_size[0]}x{decoded.original_size[1]} pixels "
+                  f"(working copy {image.size[0]}x{image.size[1]})")
+        else:
+            print(f"✅ Downloaded: {image.size[0]}x{image.size[1]} pixels")
         print(f"{'='*70}\n")
         
         print(f"🔬 DEEPFAKE ANALYSIS v7 (Advanced Detection)")
         
-        # NEW: Stylization Detection for 3D renders, cartoons, animated avatars
-        stylization_boost = 0.0
-        stylization_result = None
+        # Staged plan: faces (and screen content) decide the branch first, so
+        # no-face images skip the forensic passes only the face branch uses
+        timings: Dict[str, float] = {}
+        features = ImageFeatures(image)  # Gray/HSV/LAB/Sobel/... planes shared by the analyzers below
+        detection = self._timed(timings, 'faces', self.find_faces, image)
+        faces = detection.faces
+        print(f"   👤 Detected {len(faces)} face(s)")
+        
+        # ============ ACCURACY FIX: Early return for non-face content ============
+        # Screenshots, UI, graphics, landscapes should NOT be flagged as deepfakes
+        # Only run deepfake detection on images with actual human faces
+        if not faces:
+            return self._analyze_no_face_image(image, timings, features, detection)
+        
+        # Continue with face-based deepfake analysis...
+        print(f"   👤 Faces detected: {len(faces)} - Running deepfake analysis...")
+        
+        # JPEG marker segments: quantization tables, coding flags and metadata
+        # straight from the downloaded bytes, without decoding
+        bitstream = self._timed(timings, 'bitstream', parse_jpeg, decoded.source) if decoded is not None else None
+        if bitstream is not None:
+            exif, xmp_tools = bitstream.exif(), bitstream.xmp_tools()
+        else:
+            exif, xmp_tools = decoded.exif if decoded is not None else image.getexif(), ()
+        
+        # The forensic analyzers below are independent of each other; they run
+        # concurrently (see analysis_graph.py) and are reported in a fixed order
+        graph = AnalyzerGraph()
         if STYLIZATION_DETECTION_AVAILABLE:
-            print(f"   🎨 Running stylization detection...")
-            stylization_result = detect_stylization(image)
-            
+            # NEW: Stylization Detection for 3D renders, cartoons, animated avatars
+            graph.add('stylization', detect_stylization, image, features)
+        # Compression analysis (needs the native 8x8 JPEG block grid)
+        if decoded is not None:
+            graph.add('native_center', decoded.native_center, MAX_IMAGE_SIZE)
+            graph.add('compression', self.analyze_compression_artifacts, inputs=('native_center',))
+        else:
+            graph.add('compression', self.analyze_compression_artifacts, image)
+        graph.add('exif', self.analyze_exif_metadata, exif=exif, xmp_tools=xmp_tools)
+        # NEW: Filter detection for Instagram/TikTok/Snapchat effects
+        graph.add('filters', self.detect_social_media_filters, image, features)
+        graph.add('frames', self.generate_image_frames, image, detection, features)
+        # Blending boundary and landmark analysis on the first detected face
+        graph.add('blending', self.detect_blending_boundaries, image, faces[0], source=decoded)
+        graph.add('face_crop', detection.crop, faces[0], self.optimal_size)
+        graph.add('landmarks', self.analyze_facial_landmarks, inputs=('face_crop',))
+        
+        print(f"   📊 Running advanced analyses ({graph.workers} thread(s))...")
+        analyses = graph.run()
+        timings.update(graph.timings)
+        features.release()  # Full-image planes are not read past this point
+        if decoded is not None:
+            decoded.release()  # Native pixels are not needed past this point
+        
+        stylization_boost = 0.0
+        stylization_result = analyses.get('stylization')
+        if stylization_result is not None:
             if stylization_result.is_stylized:
                 style_name = stylization_result.style_type.value
                 print(f"   🤖 STYLIZED CONTENT DETECTED: {style_name}")
@@ -2502,82 +2800,30 @@ class DeepfakeDetector:
             else:
                 print(f"   ✅ Photorealistic content - no stylization detected")
         
-        # Phase 1: New advanced analyses
-        print(f"   📊 Running advanced analyses...")
-        
-        # Compression analysis
-        compression_score, compression_details = self.analyze_compression_artifacts(image)
+        compression_score, compression_details = analyses['compression']
         print(f"   📦 Compression: {compression_score*100:.1f}% suspicious")
-        
-        # EXIF metadata analysis
-        exif_score, exif_details = self.analyze_exif_metadata(image)
+        jpeg_details = bitstream.details() if bitstream is not None else None
+        if jpeg_details:
+            tables = 'standard' if jpeg_details['standard_tables'] else 'custom'
+            print(f"   🧬 JPEG: {jpeg_details['process']}, quality ~{jpeg_details['estimated_quality']} ({tables} tables)")
+            if jpeg_details['likely_resaved']:
+                print(f"      Re-save indicators: {', '.join(jpeg_details['resave_indicators'])}")
+        
+        exif_score, exif_details = analyses['exif']
         print(f"   📋 EXIF: {exif_score*100:.1f}% suspicious")
         
-        # NEW: Filter detection for Instagram/TikTok/Snapchat effects
-        filter_score, filter_details = self.detect_social_media_filters(image)
+        filter_score, filter_details = analyses['filters']
         print(f"   🎨 Filters: {filter_score*100:.1f}% filtered")
         if filter_details.get('filters_detected'):
             print(f"      Detected: {', '.join(filter_details['filters_detected'])}")
         
-        # Generate frames and run main analysis
-        frames, faces, content_info = self.generate_image_frames(image)
+        frames, faces, content_info = analyses['frames']
         
-        # ============ ACCURACY FIX: Early return for non-face content ============
-        # Screenshots, UI, graphics, landscapes should NOT be flagged as deepfakes
-        # Only run deepfake detection on images with actual human faces
-        if not faces or len(faces) == 0:
-            print(f"   ⚡ NO FACES DETECTED - Checking if screen/UI content...")
-            
-            # Check if this looks like screen content (website, code, gaming, UI)
-            is_screen, screen_conf, screen_details = self.detect_screen_content(image)
-            
-            if is_screen:
-                print(f"   ✅ SCREEN CONTENT DETECTED ({screen_conf*100:.0f}% confidence)")
-                print(f"      Indicators: {', '.join(screen_details.get('indicators', []))}")
-                print(f"   → Classifying as AUTHENTIC (not applicable for deepfake detection)")
-                
-                # Return as authentic - deepfake detection only applies to face content
-                probs = {'fake': 0.02, 'real': 0.98}
-                classification = 'real'
-                confidence = 0.98
-                details = {
-                    'faces_detected': 0,
-                    'content_type': 'screen',
-                    'screen_content': screen_details,
-                    'classification_reason': 'No faces detected - screen/UI content not applicable for deepfake analysis',
-                    'debug_frames': [],
-                    'model_version': 'deepfake-detector-v8'
-                }
-                return self._finalize(probs, details, MediaType.IMAGE, content_info)
-            
-            # No faces AND not obviously screen content - could be landscape, object, etc.
-            # Still mark as authentic since no face manipulation is possible
-            print(f"   ✅ NO FACE CONTENT - No faces to analyze")
-            print(f"   → Classifying as AUTHENTIC (deepfake detection requires faces)")
-            
-            probs = {'fake': 0.05, 'real': 0.95}
-            classification = 'real'
-            confidence = 0.95
-            details = {
-                'faces_detected': 0,
-                'content_type': content_info.get('content_type', 'scene'),
-                'classification_reason': 'No faces detected - deepfake analysis not applicable',
-                'debug_frames': [],
-                'model_version': 'deepfake-detector-v8'
-            }
-            return self._finalize(probs, details, MediaType.IMAGE, content_info)
+        blending_score, blending_details = analyses['blending']
+        print(f"   🎭 Blending: {blending_score*100:.1f}% suspicious")
         
-        # Continue with face-based deepfake analysis...
-        print(f"   👤 Faces detected: {len(faces)} - Running deepfake analysis...")
-        
-        # Blending boundary analysis (if faces detected)
-        blending_score = 0.0
-        blending_details = {}
-        if faces:
-            blending_score, blending_details = self.detect_blending_boundaries(image, faces[0])
-            print(f"   🎭 Blending: {blending_score*100:.1f}% suspicious")
-        
-        probs, results, details = self.analyze_frames(frames, faces, is_video=False, content_info=content_info)
+        probs, results, details = self._timed(
+            timings, 'inference', self.analyze_frames, frames, faces, is_video=False, content_info=content_info)
         
         # Apply Phase 1 boosts to fake score
         phase1_boost = 0.0
@@ -2616,19 +2862,16 @@ class DeepfakeDetector:
         phase2_boost = 0.0
         
         # Landmark analysis on first detected face
-        landmark_details = {}
-        if faces:
-            face_crop = self.extract_face_crop(image, faces[0])
-            landmark_score, landmark_details = self.analyze_facial_landmarks(face_crop)
-            print(f"   👤 Landmark: {landmark_score*100:.1f}% suspicious")
-            
-            if landmark_details.get('suspicious'):
-                phase2_boost += 0.15
-                print(f"   ⚡ Facial proportions suspicious: +15%")
-            
-            if landmark_details.get('texture_flag') == 'too_smooth':
-                phase2_boost += 0.08
-                print(f"   ⚡ Face too smooth (AI-like): +8%")
+        landmark_score, landmark_details = analyses['landmarks']
+        print(f"   👤 Landmark: {landmark_score*100:.1f}% suspicious")
+        
+        if landmark_details.get('suspicious'):
+            phase2_boost += 0.15
+            print(f"   ⚡ Facial proportions suspicious: +15%")
+        
+        if landmark_details.get('texture_flag') == 'too_smooth':
+            phase2_boost += 0.08
+            print(f"   ⚡ Face too smooth (AI-like): +8%")
         
         # Ensemble confidence check (use secondary analysis scores)
         secondary_scores = [
@@ -2653,6 +2896,7 @@ class DeepfakeDetector:
         
         # Add all analysis details to response
         details['compression_analysis'] = compression_details
+        details['jpeg_analysis'] = jpeg_details
         details['exif_analysis'] = exif_details
         details['blending_analysis'] = blending_details
         details['landmark_analysis'] = landmark_details
@@ -2673,84 +2917,156 @@ class DeepfakeDetector:
                 face_scores.append(round(r['fake'], 4))
         details['face_scores'] = face_scores
         
-        _, debug_frames = self.save_debug(frames, results, MediaType.IMAGE)
+        _, debug_frames = self._timed(timings, 'debug_frames', self.save_debug, frames, results, MediaType.IMAGE)
         details['debug_frames'] = debug_frames
         
-        # ========== NEW v7: Generate Annotated Image ==========
-        if ANNOTATIONS_AVAILABLE and faces:
-            try:
-                print(f"   🎨 Generating visual annotations...")
-                
-                # Create manipulation regions from face scores
-                face_scores_list = [r['fake'] for (_, name, _), r in zip(frames, results) 
-                                   if 'face' in name.lower() and 'fft' not in name.lower() 
-                                   and 'eye' not in name.lower()][:len(faces)]
-                
-                # Generate artifact markers from detected issues
-                artifact_detections = []
-                
-                # Add compression artifact marker if detected
-                if compression_details.get('double_compression_detected'):
-                    artifact_detections.append({
-                        'position': (image.width // 4, image.height // 4),
-                        'label': 'Compression',
-                        'severity': 'medium',
-                        'description': 'Double compression detected'
-                    })
-                
-                # Add blending artifact marker if detected
-                if blending_details.get('boundary_artifacts_detected'):
-                    artifact_detections.append({
-                        'position': (3 * image.width // 4, image.height // 2),
-                        'label': 'Blending',
-                        'severity': 'high',
-                        'description': 'Face blending boundary detected'
-                    })
-                
-                # Add landmark artifact if suspicious
-                if landmark_details.get('suspicious'):
-                    artifact_detections.append({
-                        'position': (image.width // 2, image.height // 3),
-                        'label': 'Proportions',
-                        'severity': 'medium',
-                        'description': f"Face symmetry: {landmark_details.get('symmetry_flag', 'unknown')}"
-                    })
-                
-                # Generate annotated image
-                annotated_img, heatmap_img = create_full_annotated_image(
-                    image,
-                    faces,
-                    face_scores_list,
-                    artifact_detections,
-                    include_heatmap=True,
-                    include_boxes=True,
-                    include_arrows=len(artifact_detections) > 0
-                )
-                
-                # Encode annotated image to base64
-                details['annotated_image'] = image_to_base64(annotated_img.convert('RGB'), 'JPEG')
-                if heatmap_img:
-                    details['heatmap_image'] = image_to_base64(heatmap_img.convert('RGB'), 'JPEG')
-                
-                print(f"   ✅ Visual annotations generated")
-                
-            except Exception as e:
-                print(f"   ⚠️ Annotation generation error: {e}")
+        # ========== NEW v7: Visual Annotation Inputs ==========
+        # Create manipulation regions from face scores
+        face_scores_list = [r['fake'] for (_, name, _), r in zip(frames, results) 
+                           if 'face' in name.lower() and 'fft' not in name.lower() 
+                           and 'eye' not in name.lower()][:len(faces)]
+        
+        # Generate artifact markers from detected issues
+        artifact_detections = []
+        
+        # Add compression artifact marker if detected
+        if compression_details.get('double_compression_detected'):
+            artifact_detections.append({
+                'position': (image.width // 4, image.height // 4),
+                'label': 'Compression',
+                'severity': 'medium',
+                'description': 'Double compression detected'
+            })
+        
+        # Add blending artifact marker if detected
+        if blending_details.get('boundary_artifacts_detected'):
+            artifact_detections.append({
+                'position': (3 * image.width // 4, image.height // 2),
+                'label': 'Blending',
+                'severity': 'high',
+                'description': 'Face blending boundary detected'
+            })
+        
+        # Add landmark artifact if suspicious
+        if landmark_details.get('suspicious'):
+            artifact_detections.append({
+                'position': (image.width // 2, image.height // 3),
+                'label': 'Proportions',
+                'severity': 'medium',
+                'description': f"Face symmetry: {landmark_details.get('symmetry_flag', 'unknown')}"
+            })
+        
+        # The annotated image and heatmap are rendered when requested
+        self._timed(timings, 'artifacts', self._store_artifacts, analysis_id or uuid.uuid4().hex, details,
+                    image, faces, face_scores_list, artifact_detections)
         
+        self._record_stages(details, 'face', timings, features, detection, graph)
         return self._finalize(probs, details, "IMAGE", content_info)
     
-    def _analyze_video(self, url: str) -> Tuple[Dict[str, float], str, float, dict]:
+    def _analyze_no_face_image(self, image: Image.Image, timings: Dict[str, float], features: ImageFeatures,
+                               detection: FaceDetection) -> Tuple[Dict[str, float], str, float, dict]:
+        """No-face branch: only the content type and screen check feed its fixed verdict."""
+        content_info = self._timed(
+            timings, 'content_type', self.analyze_image_content_type, image, features, detection) if VIDEO_SUPPORT else {
+            'has_face': False,
+            'face_count': 0,
+            'face_type': None,
+            'content_type': 'scene'
+        }
+        
+        print(f"   ⚡ NO FACES DETECTED - Checking if screen/UI content...")
+        
+        # Check if this looks like screen content (website, code, gaming, UI)
+        is_screen, screen_conf, screen_details = self._timed(timings, 'screen', self.detect_screen_content, image, features)
+        features.release()
+        
+        if is_screen:
+            print(f"   ✅ SCREEN CONTENT DETECTED ({screen_conf*100:.0f}% confidence)")
+            print(f"      Indicators: {', '.join(screen_details.get('indicators', []))}")
+            print(f"   → Classifying as AUTHENTIC (not applicable for deepfake detection)")
+            
+            # Return as authentic - deepfake detection only applies to face content
+            probs = {'fake': 0.02, 'real': 0.98}
+            details = {
+                'faces_detected': 0,
+                'content_type': 'screen',
+                'screen_content': screen_details,
+                'classification_reason': 'No faces detected - screen/UI content not applicable for deepfake analysis',
+                'debug_frames': [],
+                'model_version': 'deepfake-detector-v8'
+            }
+            self._record_stages(details, 'screen', timings, features)
+            return self._finalize(probs, details, MediaType.IMAGE, content_info)
+        
+        # No faces AND not obviously screen content - could be landscape, object, etc.
+        # Still mark as authentic since no face manipulation is possible
+        print(f"   ✅ NO FACE CONTENT - No faces to analyze")
+        print(f"   → Classifying as AUTHENTIC (deepfake detection requires faces)")
+        
+        probs = {'fake': 0.05, 'real': 0.95}
+        details = {
+            'faces_detected': 0,
+            'content_type': content_info.get('content_type', 'scene'),
+            'classification_reason': 'No faces detected - deepfake analysis not applicable',
+            'debug_frames': [],
+            'model_version': 'deepfake-detector-v8'
+        }
+        self._record_stages(details, 'no_face', timings, features)
+        return self._finalize(probs, details, MediaType.IMAGE, content_info)
+    
+    def _store_artifacts(self, analysis_id: str, details: dict, image: Image.Image, faces: List[FaceInfo],
+                         face_scores: List[float], markers: List[dict]) -> None:
+        """Keep the inputs of this analysis' annotated image and heatmap under its id (see artifact_store.py)."""
+        if not ANNOTATIONS_AVAILABLE:
+            return
+        self.artifacts.put(AnalysisArtifacts(analysis_id, image, faces, face_scores, markers))
+        details['analysis_id'] = analysis_id
+        if not LAZY_ARTIFACTS:
+            self.artifacts.embed(analysis_id, details)
+        else:
+            print(f"   🎨 Visual annotations deferred (analysis {analysis_id[:12]})")
+    
+    def _timed(self, timings: Dict[str, float], stage: str, fn, *args, **kwargs):
+        """Run one pipeline stage and record its wall time in ms."""
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+    
+    def _record_stages(self, details: dict, branch: str, timings: Dict[str, float],
+                       features: Optional[ImageFeatures] = None, detection: Optional[FaceDetection] = None,
+                       graph: Optional[AnalyzerGraph] = None) -> None:
+        """Attach the chosen branch, its per-stage latency and plane/crop reuse to the analysis details."""
+        total_ms = sum(timings.values())
+        details['pipeline'] = {'branch': branch, 'stages_ms': timings, 'total_ms': round(total_ms, 1)}
+        print(f"   ⏱️  {branch} branch: " + ", ".join(f"{stage} {ms:.0f}ms" for stage, ms in timings.items()))
+        if graph is not None:
+            # Concurrent analyzer nodes overlap: count their wall time, not their sum
+            summary = graph.summary()
+            total_ms += summary['wall_ms'] - summary['busy_ms']
+            details['pipeline']['total_ms'] = round(total_ms, 1)
+            details['pipeline']['analyzers'] = summary
+            print(f"   🧵 Analyzers: {summary['busy_ms']:.0f}ms of work in {summary['wall_ms']:.0f}ms "
+                  f"on {summary['workers']} thread(s)")
+        if features is not None:
+            details['pipeline']['planes'] = dict(features.stats)
+            print(f"   🧮 Feature planes: {features.stats['computed']} computed, {features.stats['reused']} reused")
+        if detection is not None and detection.crop_stats['computed']:
+            details['pipeline']['face_crops'] = dict(detection.crop_stats)
+            print(f"   🧮 Face crops: {detection.crop_stats['computed']} computed, {detection.crop_stats['reused']} reused")
+    
+    def _analyze_video(self, media: IngestedMedia) -> Tuple[Dict[str, float], str, float, dict]:
         """Analyze video with v7 enhanced techniques including motion blur and face tracking."""
         if not VIDEO_SUPPORT:
             raise RuntimeError("Video support requires OpenCV")
         
-        content, _ = self.download_media(url)
-        print(f"✅ Downloaded: {len(content) / 1024 / 1024:.1f} MB")
+        print(f"✅ Downloaded: {media.size / 1024 / 1024:.1f} MB")
         print(f"{'='*70}\n")
         
         print(f"🎬 VIDEO ANALYSIS v7 (Enhanced Detection)")
         
-        frames, faces = self.extract_video_frames(content)
+        frames, faces = self.extract_video_frames(media.path)
         print(f"   Extracted {len(frames)} analysis frames")
         
         probs, results, details = self.analyze_frames(frames, faces, is_video=True)
@@ -2816,7 +3132,7 @@ class DeepfakeDetector:
         
         print(f"   📊 Confidence: {confidence*100:.1f}%")
         print(f"   📈 Fake: {probs['fake']*100:.1f}% | Real: {probs['real']*100:.1f}%")
-        print(f"   🗳️  Votes: {details['fake_votes']}/{details['total_frames']} fake")
+        print(f"   🗳️  Votes: {details.get('fake_votes', 0)}/{details.get('total_frames', 0)} fake")
         print(f"   👤 Faces: {details['faces_detected']} detected")
         
         # Content info details
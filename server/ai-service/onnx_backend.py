@@ -0,0 +1,127 @@
+"""
+ONNX Runtime Backend for TrueVibe AI Service
+Optional CPU inference path for the SigLIP deepfake classifier.
+
+The torch model is exported to ONNX once (keyed by the model files, so a new
+checkpoint gets a new artifact) and cached on disk. Later startups load the
+cached graph straight into an ONNX Runtime session with all graph
+optimizations enabled. Any failure returns None so the detector keeps using
+torch.
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import Optional
+
+import numpy as np
+import torch
+
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Backend configuration
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "torch").lower()  # torch | onnx
+ONNX_CACHE_DIR = os.environ.get(
+    "ONNX_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "models", "onnx")
+)
+ONNX_THREADS = int(os.environ.get("ONNX_THREADS", "0"))  # 0 = let ONNX Runtime decide
+ONNX_OPSET = 17
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Export wrapper: pixel_values in, logits out (no ModelOutput dict)."""
+
+    def __init__(self, model: torch.nn.Module):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        return self.model(pixel_values=pixel_values).logits
+
+
+class OnnxClassifier:
+    """Callable with the same contract as the torch forward: pixel_values -> logits."""
+
+    def __init__(self, session: "ort.InferenceSession", path: str):
+        self.session = session
+        self.path = path
+        self._input_name = session.get_inputs()[0].name
+        self._output_name = session.get_outputs()[0].name
+
+    def __call__(self, pixel_values: torch.Tensor) -> torch.Tensor:
+        inputs = np.ascontiguousarray(pixel_values.detach().cpu().numpy(), dtype=np.float32)
+        logits = self.session.run([self._output_name], {self._input_name: inputs})[0]
+        return torch.from_numpy(logits)
+
+
+def model_fingerprint(model_source: str, *extra: str) -> str:
+    """Stable key for a checkpoint: file names, sizes and mtimes of a local dir, else the hub id."""
+    digest = hashlib.sha256(model_source.encode())
+    if os.path.isdir(model_source):
+        for name in sorted(os.listdir(model_source)):
+            stat = os.stat(os.path.join(model_source, name))
+            digest.update(f"{name}:{stat.st_size}:{int(stat.st_mtime)}".encode())
+    for item in extra:
+        digest.update(item.encode())
+    return digest.hexdigest()[:16]
+
+
+def export_onnx(model: torch.nn.Module, path: str, image_size: int) -> None:
+    """Export `model` to `path` with a dynamic batch axis (atomic rename, safe with several workers)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dummy = torch.zeros(1, 3, image_size, image_size, dtype=torch.float32)
+    fd, tmp_path = tempfile.mkstemp(suffix=".onnx", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                _LogitsOnly(model).eval(),
+                (dummy,),
+                tmp_path,
+                input_names=["pixel_values"],
+                output_names=["logits"],
+                dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+                opset_version=ONNX_OPSET,
+                dynamo=False,
+            )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def create_session(path: str) -> "ort.InferenceSession":
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ONNX_THREADS > 0:
+        options.intra_op_num_threads = ONNX_THREADS
+    return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def load_onnx_classifier(model: torch.nn.Module, model_source: str, image_size: int) -> Optional[OnnxClassifier]:
+    """
+    Get an ONNX Runtime classifier for `model`, exporting it on first use.
+
+    Returns None (caller stays on torch) if onnxruntime is missing or the
+    export/session creation fails.
+    """
+    if not ONNX_AVAILABLE:
+        print("   ⚠️ onnxruntime not installed - using torch backend")
+        return None
+
+    path = os.path.join(ONNX_CACHE_DIR, f"siglip-{model_fingerprint(model_source, f'opset{ONNX_OPSET}')}.onnx")
+    try:
+        if os.path.exists(path):
+            print(f"   📦 ONNX artifact: {path}")
+        else:
+            print(f"   🔄 Exporting ONNX artifact: {path}")
+            export_onnx(model, path, image_size)
+        return OnnxClassifier(create_session(path), path)
+    except Exception as e:
+        print(f"   ⚠️ ONNX backend unavailable ({e}) - using torch backend")
+        return None
@@ -7,7 +7,7 @@ import os
 import io
 import base64
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass
 
 # PDF Generation imports
@@ -88,16 +88,33 @@ class ReportData:
     landmark_analysis: Optional[Dict[str, Any]] = None
 
 
+def _with_artifacts(analysis_results: Dict[str, Any], artifacts: Callable[[str], Optional[str]]) -> Dict[str, Any]:
+    """Copy of the results with the annotated image rendered in (if the analysis is still stored)."""
+    results = dict(analysis_results)
+    if not results.get('annotated_image'):
+        results['annotated_image'] = artifacts('annotated')
+    return results
+
+
 def generate_pdf_report(
     analysis_results: Dict[str, Any],
     report_content: Dict[str, Any],
     debug_image_dir: Optional[str] = None,
-    analyzed_image_url: Optional[str] = None
+    analyzed_image_url: Optional[str] = None,
+    artifacts: Optional[Callable[[str], Optional[str]]] = None
 ) -> bytes:
-    """Generate a professional PDF report."""
+    """
+    Generate a professional PDF report.
+    
+    `artifacts` renders a named artifact of the analysis as base64 ('annotated');
+    it fills in the annotated image when the results do not carry one.
+    """
     if not PDF_SUPPORT:
         raise RuntimeError("ReportLab not installed - cannot generate PDF")
     
+    if artifacts is not None:
+        analysis_results = _with_artifacts(analysis_results, artifacts)
+    
     debug_images = []
     if debug_image_dir and os.path.exists(debug_image_dir):
         for f in sorted(os.listdir(debug_image_dir)):
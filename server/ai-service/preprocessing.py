@@ -0,0 +1,93 @@
+"""
+Tensor Preprocessing Module for TrueVibe AI Service
+Builds normalized SigLIP input batches straight from uint8 pixels.
+
+AutoImageProcessor converts, resizes, rescales and normalizes every frame
+separately in NumPy and then stacks the results. Frames produced by the
+detector are already RGB at the model resolution, so this path only wraps
+each frame's uint8 pixels with torch.from_numpy (no copy), writes them into a
+preallocated float32 batch and rescales/normalizes the whole batch in place.
+Mean, std, rescale factor, size and resample filter all come from the
+processor config. Frames of another size are resized once with PIL using the
+processor's resample filter.
+"""
+
+import warnings
+from typing import List, Optional, Tuple
+
+import numpy as np
+import torch
+from PIL import Image
+
+
+def _config_value(config, key: str):
+    """Read a key from a processor size config (plain dict or SizeDict)."""
+    if isinstance(config, dict):
+        return config.get(key)
+    return getattr(config, key, None)
+
+
+class TensorPreprocessor:
+    """
+    Fast replacement for `processor(images=..., return_tensors="pt")['pixel_values']`.
+
+    `supported` is False when the processor config uses options this path
+    does not reproduce (e.g. shortest-edge resizing or center cropping);
+    callers should then keep using the processor.
+    """
+
+    def __init__(self, processor):
+        size = getattr(processor, 'size', None)
+        height, width = _config_value(size, 'height'), _config_value(size, 'width')
+
+        self.supported = bool(
+            height and width
+            and getattr(processor, 'do_resize', True)
+            and not getattr(processor, 'do_center_crop', False)
+            and not getattr(processor, 'do_pad', False)
+        )
+        self.size: Tuple[int, int] = (int(height or 0), int(width or 0))
+        self.shape: Tuple[int, int, int] = (3, *self.size)
+        self.resample = getattr(processor, 'resample', Image.BICUBIC)
+
+        do_rescale = getattr(processor, 'do_rescale', True)
+        do_normalize = getattr(processor, 'do_normalize', True)
+        rescale = float(getattr(processor, 'rescale_factor', 1 / 255)) if do_rescale else 1.0
+        mean = getattr(processor, 'image_mean', None) if do_normalize else None
+        std = getattr(processor, 'image_std', None) if do_normalize else None
+
+        # Same operation order as the processor: x * rescale, then (x - mean) / std
+        self.rescale = rescale
+        self.mean = torch.tensor(mean if mean is not None else [0.0] * 3, dtype=torch.float32).view(1, 3, 1, 1)
+        self.std = torch.tensor(std if std is not None else [1.0] * 3, dtype=torch.float32).view(1, 3, 1, 1)
+        self.normalize = mean is not None and std is not None
+
+    def _pixels(self, image: Image.Image) -> np.ndarray:
+        """RGB uint8 (H, W, 3) array at the model resolution."""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        if image.size != (self.size[1], self.size[0]):
+            image = image.resize((self.size[1], self.size[0]), resample=self.resample)
+        return np.asarray(image)
+
+    def fill(self, images: List[Image.Image], out: Optional[torch.Tensor] = None) -> torch.Tensor:
+        """
+        Write the normalized batch for `images` into `out` (allocated if None).
+
+        Returns `out`, shape (len(images), 3, height, width), float32.
+        """
+        if out is None:
+            out = torch.empty((len(images), *self.shape), dtype=torch.float32)
+
+        with warnings.catch_warnings():
+            # PIL hands out read-only arrays; the tensor views are only ever read
+            warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+            for i, image in enumerate(images):
+                # HWC uint8 view -> CHW, converted to float32 by copy_ straight into the batch
+                out[i].copy_(torch.from_numpy(self._pixels(image)).permute(2, 0, 1))
+
+        if self.rescale != 1.0:
+            out.mul_(self.rescale)
+        if self.normalize:
+            out.sub_(self.mean).div_(self.std)
+        return out
@@ -0,0 +1,64 @@
+"""
+INT8 Quantization Module for TrueVibe AI Service
+Dynamic INT8 quantization of the SigLIP classifier for CPU inference.
+
+Every nn.Linear (attention projections, MLPs, classifier head) is replaced by
+a dynamically quantized INT8 layer: weights are stored as int8, activations
+are quantized per batch at run time. The quantized state dict is saved once,
+so later startups build the model from its config and load the int8 weights
+directly instead of reading and re-quantizing the fp32 checkpoint.
+"""
+
+import os
+from typing import Optional
+
+import torch
+from transformers import AutoConfig, SiglipForImageClassification
+
+from onnx_backend import model_fingerprint
+
+# Quantization configuration
+MODEL_PRECISION = os.environ.get("MODEL_PRECISION", "fp32").lower()  # fp32 | int8
+QUANTIZED_CACHE_DIR = os.environ.get(
+    "QUANTIZED_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "models", "quantized")
+)
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Apply dynamic INT8 quantization to all Linear layers (CPU only)."""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_artifact_path(model_source: str) -> str:
+    engine = torch.backends.quantized.engine
+    return os.path.join(QUANTIZED_CACHE_DIR, f"siglip-int8-{model_fingerprint(model_source, engine)}.pt")
+
+
+def load_int8_model(model_source: str) -> Optional[torch.nn.Module]:
+    """
+    Load the INT8 classifier for `model_source`, quantizing and caching it on first use.
+
+    Returns None (caller loads fp32) if quantization is unsupported here.
+    """
+    path = quantized_artifact_path(model_source)
+    try:
+        if os.path.exists(path):
+            print(f"   📦 INT8 weights: {path}")
+            config = AutoConfig.from_pretrained(model_source)
+            model = quantize_model(SiglipForImageClassification(config).eval())
+            model.load_state_dict(torch.load(path, map_location="cpu"))
+            return model.eval()
+
+        print(f"   🔄 Quantizing to INT8: {path}")
+        model = quantize_model(SiglipForImageClassification.from_pretrained(model_source).eval())
+
+        # Write to a temp name first so concurrent workers never read a partial file
+        os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+        return model.eval()
+    except Exception as e:
+        print(f"   ⚠️ INT8 quantization unavailable ({e}) - using fp32")
+        return None
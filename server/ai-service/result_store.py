@@ -0,0 +1,370 @@
+"""
+Result Store Module for TrueVibe AI Service
+Storage backends for the two-level analysis cache (URL index + results).
+
+Backends:
+- memory: per-process LRU bounded by serialized bytes (lost on restart)
+- sqlite: one SQLite database in WAL mode under RESULT_CACHE_DIR, shared by
+  every uvicorn worker and kept across restarts. WAL lets readers run while
+  another process writes; writers are serialized by SQLite's own file lock
+  (busy_timeout instead of failing fast).
+
+Both evict least recently used results first once the total size of stored
+results exceeds their byte budget.
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Store configuration
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "memory").lower()  # memory | sqlite
+RESULT_CACHE_DIR = os.environ.get(
+    "RESULT_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "cache")
+)
+RESULT_CACHE_MAX_MB = int(os.environ.get("RESULT_CACHE_MAX_MB", "256"))
+RESULT_CACHE_MEMORY_MB = int(os.environ.get("RESULT_CACHE_MEMORY_MB", "64"))
+RESULT_CACHE_COMPRESS = os.environ.get("RESULT_CACHE_COMPRESS", "true").lower() == "true"
+
+# Large base64 payloads kept compressed by the memory store
+HEAVY_RESULT_FIELDS = ('debug_frames', 'annotated_image', 'heatmap_image')
+
+
+class ResultStore(ABC):
+    """Interface shared by the cache backends. Timestamps are time.time() seconds."""
+
+    backend = "base"
+
+    @abstractmethod
+    def get_index(self, url_key: str, ttl: float) -> Optional[str]:
+        """Content hash a URL pointed to, or None if unknown/expired."""
+
+    @abstractmethod
+    def set_index(self, url_key: str, content_hash: str) -> None:
+        """Point a URL at a content hash."""
+
+    @abstractmethod
+    def delete_index(self, url_key: str) -> Optional[str]:
+        """Remove a URL entry and return the content hash it pointed to."""
+
+    @abstractmethod
+    def get_result(self, content_hash: str, ttl: float) -> Optional[Dict]:
+        """Stored result for a content hash, or None if unknown/expired."""
+
+    @abstractmethod
+    def set_result(self, content_hash: str, result: Dict) -> None:
+        """Store a result (evicting least recently used ones to fit the budget)."""
+
+    @abstractmethod
+    def delete_result(self, content_hash: str) -> None:
+        """Drop a stored result."""
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Backend, sizes and budget for /health."""
+
+
+class _MemoryEntry:
+    __slots__ = ('result', 'packed', 'size', 'stored_at')
+
+    def __init__(self, result: Dict, packed: Optional[bytes], size: int):
+        self.result = result  # Light fields (everything when not compressed)
+        self.packed = packed  # zlib-compressed JSON of the heavy fields, if any
+        self.size = size
+        self.stored_at = time.time()
+
+
+class MemoryResultStore(ResultStore):
+    """
+    In-process LRU (not shared between workers) bounded by serialized bytes.
+
+    Both maps are OrderedDicts, so lookups, inserts and evictions are O(1).
+    Heavy base64 fields (debug frames, annotated images, heatmaps) are kept
+    zlib-compressed and only inflated on a hit. Packing and inflating run on
+    the calling thread; main.py calls the cache through asyncio.to_thread.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_results: int = 100, max_urls: int = 1000,
+                 max_bytes: int = RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+                 compress: bool = RESULT_CACHE_COMPRESS):
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()  # {url_key: (content_hash, timestamp)}
+        self._results: "OrderedDict[str, _MemoryEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_results = max_results
+        self._max_urls = max_urls
+        self._max_bytes = max_bytes
+        self._compress = compress
+        self._bytes = 0
+        self._evictions = 0
+
+    def get_index(self, url_key: str, ttl: float) -> Optional[str]:
+        with self._lock:
+            entry = self._index.get(url_key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] < ttl:
+                return entry[0]
+            del self._index[url_key]
+            return None
+
+    def set_index(self, url_key: str, content_hash: str) -> None:
+        with self._lock:
+            self._index.pop(url_key, None)
+            self._index[url_key] = (content_hash, time.time())
+            # Oldest first; re-linking a URL moves it to the end
+            while len(self._index) > self._max_urls:
+                self._index.popitem(last=False)
+
+    def delete_index(self, url_key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._index.pop(url_key, None)
+            return entry[0] if entry else None
+
+    def get_result(self, content_hash: str, ttl: float) -> Optional[Dict]:
+        with self._lock:
+            entry = self._results.get(content_hash)
+            if entry is None:
+                return None
+            if time.time() - entry.stored_at >= ttl:
+                self._remove(content_hash)
+                return None
+            self._results.move_to_end(content_hash)
+        if entry.packed is None:
+            return entry.result
+        # Inflate outside the lock; entries are immutable once stored
+        return {**entry.result, **json.loads(zlib.decompress(entry.packed))}
+
+    def _pack(self, result: Dict) -> Tuple[Dict, Optional[bytes], int]:
+        """Split off and compress heavy fields; returns (light, packed, serialized size)."""
+        heavy = {k: result[k] for k in HEAVY_RESULT_FIELDS if result.get(k)} if self._compress else {}
+        if not heavy:
+            return result, None, len(json.dumps(result, separators=(',', ':')))
+        light = {k: v for k, v in result.items() if k not in heavy}
+        packed = zlib.compress(json.dumps(heavy, separators=(',', ':')).encode(), 1)
+        return light, packed, len(json.dumps(light, separators=(',', ':'))) + len(packed)
+
+    def set_result(self, content_hash: str, result: Dict) -> None:
+        light, packed, size = self._pack(result)
+        if size > self._max_bytes:
+            return  # Larger than the whole budget - not worth caching
+        with self._lock:
+            if content_hash in self._results:
+                self._remove(content_hash)
+            self._results[content_hash] = _MemoryEntry(light, packed, size)
+            self._bytes += size
+            while len(self._results) > 1 and (
+                    self._bytes > self._max_bytes or len(self._results) > self._max_results):
+                self._remove(next(iter(self._results)))
+                self._evictions += 1
+
+    def _remove(self, content_hash: str) -> None:
+        """Drop a result and its byte accounting (caller holds the lock)."""
+        self._bytes -= self._results.pop(content_hash).size
+
+    def delete_result(self, content_hash: str) -> None:
+        with self._lock:
+            if content_hash in self._results:
+                self._remove(content_hash)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'backend': self.backend,
+                'urls': len(self._index),
+                'results': len(self._results),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'evictions': self._evictions,
+                'compressed': self._compress,
+            }
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    SQLite (WAL) store shared across processes and restarts.
+
+    Results are stored as JSON and evicted least-recently-used first once
+    their total size exceeds `max_bytes`. That total is kept in `cache_meta`
+    by triggers on `results`, so a write never sums the table. Access times
+    are refreshed at most once per `touch_interval` seconds so cache hits
+    rarely need a write lock.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, directory: str = RESULT_CACHE_DIR, max_bytes: int = RESULT_CACHE_MAX_MB * 1024 * 1024,
+                 max_urls: int = 100000, touch_interval: float = 60.0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "analysis_cache.sqlite3")
+        self._max_bytes = max_bytes
+        self._max_urls = max_urls
+        self._prune_every = max(1, max_urls // 10)  # URL index writes between trims (per process)
+        self._index_writes = 0
+        self._writes_lock = threading.Lock()
+        self._touch_interval = touch_interval
+        self._local = threading.local()  # One connection per thread
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS url_index (
+                    url_key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS url_index_created ON url_index (created_at);
+                CREATE TABLE IF NOT EXISTS results (
+                    content_hash TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at);
+                CREATE TABLE IF NOT EXISTS cache_meta (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    result_bytes INTEGER NOT NULL
+                );
+                -- Seeded once from existing rows, then maintained by the triggers
+                INSERT OR IGNORE INTO cache_meta (id, result_bytes)
+                    SELECT 0, COALESCE(SUM(size), 0) FROM results;
+                CREATE TRIGGER IF NOT EXISTS results_bytes_insert AFTER INSERT ON results BEGIN
+                    UPDATE cache_meta SET result_bytes = result_bytes + NEW.size WHERE id = 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS results_bytes_update AFTER UPDATE OF size ON results BEGIN
+                    UPDATE cache_meta SET result_bytes = result_bytes + NEW.size - OLD.size WHERE id = 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS results_bytes_delete AFTER DELETE ON results BEGIN
+                    UPDATE cache_meta SET result_bytes = result_bytes - OLD.size WHERE id = 0;
+                END;
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def get_index(self, url_key: str, ttl: float) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT content_hash, created_at FROM url_index WHERE url_key = ?", (url_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[1] < ttl:
+            return row[0]
+        self.delete_index(url_key)
+        return None
+
+    def set_index(self, url_key: str, content_hash: str) -> None:
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO url_index (url_key, content_hash, created_at) VALUES (?, ?, ?)",
+            (url_key, content_hash, time.time())
+        )
+        # Trim back to 90% of max_urls once every 10% of max_urls writes,
+        # keeping the newest entries (no table count on the write path)
+        with self._writes_lock:
+            self._index_writes += 1
+            prune = self._index_writes % self._prune_every == 0
+        if prune:
+            conn.execute(
+                "DELETE FROM url_index WHERE url_key IN "
+                "(SELECT url_key FROM url_index ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (int(self._max_urls * 0.9),)
+            )
+
+    def delete_index(self, url_key: str) -> Optional[str]:
+        conn = self._connect()
+        row = conn.execute("SELECT content_hash FROM url_index WHERE url_key = ?", (url_key,)).fetchone()
+        conn.execute("DELETE FROM url_index WHERE url_key = ?", (url_key,))
+        return row[0] if row else None
+
+    def get_result(self, content_hash: str, ttl: float) -> Optional[Dict]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT payload, created_at, accessed_at FROM results WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] >= ttl:
+            self.delete_result(content_hash)
+            return None
+        if now - row[2] > self._touch_interval:
+            conn.execute("UPDATE results SET accessed_at = ? WHERE content_hash = ?", (now, content_hash))
+        return json.loads(row[0])
+
+    def set_result(self, content_hash: str, result: Dict) -> None:
+        payload = json.dumps(result, separators=(',', ':')).encode()
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # An upsert rather than INSERT OR REPLACE: REPLACE deletes without
+            # firing the delete trigger, which would leave the byte total stale
+            conn.execute(
+                "INSERT INTO results (content_hash, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (content_hash) DO UPDATE SET payload = excluded.payload, size = excluded.size, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                (content_hash, payload, len(payload), now, now)
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drop least recently used results until the total size fits the budget."""
+        total = conn.execute("SELECT result_bytes FROM cache_meta WHERE id = 0").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        excess = total - self._max_bytes
+        freed = 0
+        victims = []
+        for content_hash, size in conn.execute("SELECT content_hash, size FROM results ORDER BY accessed_at"):
+            if freed >= excess:
+                break
+            victims.append((content_hash,))
+            freed += size
+        conn.executemany("DELETE FROM results WHERE content_hash = ?", victims)
+
+    def delete_result(self, content_hash: str) -> None:
+        self._connect().execute("DELETE FROM results WHERE content_hash = ?", (content_hash,))
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        urls = conn.execute("SELECT COUNT(*) FROM url_index").fetchone()[0]
+        results = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        size = conn.execute("SELECT result_bytes FROM cache_meta WHERE id = 0").fetchone()[0]
+        return {
+            'backend': self.backend,
+            'urls': urls,
+            'results': results,
+            'bytes': size,
+            'max_bytes': self._max_bytes,
+        }
+
+
+def create_result_store(max_results: int = 100, max_urls: int = 1000) -> ResultStore:
+    """Build the store selected by RESULT_CACHE_BACKEND (falls back to memory on errors)."""
+    if RESULT_CACHE_BACKEND == "sqlite":
+        try:
+            return SQLiteResultStore()
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ SQLite result cache unavailable ({e}) - using in-memory cache")
+    return MemoryResultStore(max_results=max_results, max_urls=max_urls)
@@ -0,0 +1,51 @@
+"""
+Single-Flight Registry for TrueVibe AI Service
+Coalesces concurrent work for the same key into one shared computation.
+
+The first caller for a key starts the work as its own asyncio task; callers
+arriving while it runs await the same task instead of starting another one.
+Waiters are shielded, so a client disconnecting (and its request being
+cancelled) does not cancel the computation the others are waiting on.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Per-process in-flight registry (all calls must come from one event loop)."""
+
+    def __init__(self):
+        self._flights: Dict[str, asyncio.Task] = {}
+        self._stats = {
+            'flights': 0,    # Computations started
+            'coalesced': 0,  # Requests that joined an existing computation
+            'max_waiters': 0,
+        }
+        self._waiters: Dict[str, int] = {}
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await `fn()` for `key`, sharing the result with concurrent callers of the same key."""
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._flights[key] = task
+            self._waiters[key] = 1
+            self._stats['flights'] += 1
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+        else:
+            self._waiters[key] += 1
+            self._stats['coalesced'] += 1
+            self._stats['max_waiters'] = max(self._stats['max_waiters'], self._waiters[key])
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+            self._waiters.pop(key, None)
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {'in_flight': len(self._flights), **self._stats}
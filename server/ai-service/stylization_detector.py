@@ -12,10 +12,12 @@ such as:
 
 import numpy as np
 from PIL import Image, ImageFilter
-from typing import Dict, Tuple, List, Any
+from typing import Dict, Tuple, List, Any, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from image_features import ImageFeatures
+
 # Try to import OpenCV
 try:
     import cv2
@@ -47,7 +49,7 @@ class StylizationResult:
     details: Dict[str, Any]
 
 
-def analyze_skin_texture(image: Image.Image) -> Tuple[float, Dict]:
+def analyze_skin_texture(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Analyze skin texture to detect 3D renders and cartoons.
     Real human skin has texture, pores, and imperfections.
@@ -60,10 +62,10 @@ def analyze_skin_texture(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available'}
     
-    img_array = np.array(image.convert('RGB'))
+    features = features or ImageFeatures(image)
     
     # Convert to LAB for better skin detection
-    lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
+    lab = features.lab
     
     # Detect potential skin regions (rough approximation)
     l_channel = lab[:, :, 0]
@@ -77,7 +79,7 @@ def analyze_skin_texture(image: Image.Image) -> Tuple[float, Dict]:
         (b_channel > 110) & (b_channel < 180)
     )
     
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    gray = features.gray
     
     # Calculate local variance (texture) with smaller kernel for finer detail
     kernel_size = 3
@@ -86,7 +88,7 @@ def analyze_skin_texture(image: Image.Image) -> Tuple[float, Dict]:
     local_variance = local_sq_mean - local_mean ** 2
     
     # Also use Laplacian for texture detection
-    laplacian = cv2.Laplacian(gray, cv2.CV_64F)
+    laplacian = features.laplacian
     laplacian_var = np.var(laplacian)
     
     # Analyze texture in skin regions
@@ -121,7 +123,7 @@ def analyze_skin_texture(image: Image.Image) -> Tuple[float, Dict]:
     return smoothness_score, details
 
 
-def analyze_edge_quality(image: Image.Image) -> Tuple[float, Dict]:
+def analyze_edge_quality(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Analyze edge quality to detect computer-generated content.
     3D renders have unnaturally perfect, anti-aliased edges.
@@ -129,19 +131,16 @@ def analyze_edge_quality(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available'}
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    features = features or ImageFeatures(image)
     
     # Detect edges at multiple thresholds
-    edges_low = cv2.Canny(gray, 20, 60)
-    edges_high = cv2.Canny(gray, 60, 150)
+    edges_low = features.canny(20, 60)
+    edges_high = features.canny(60, 150)
     
     edge_ratio = np.sum(edges_high > 0) / (np.sum(edges_low > 0) + 1)
     
     # Analyze edge gradients
-    sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-    sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-    gradient_mag = np.sqrt(sobel_x**2 + sobel_y**2)
+    gradient_mag = features.gradient_magnitude()
     
     # Edge uniformity (synthetic content has more uniform gradients)
     edge_mask = edges_low > 0
@@ -178,7 +177,7 @@ def analyze_edge_quality(image: Image.Image) -> Tuple[float, Dict]:
     return synthetic_score, details
 
 
-def analyze_color_palette(image: Image.Image) -> Tuple[float, Dict]:
+def analyze_color_palette(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Analyze color palette characteristics.
     3D renders and cartoons often have limited, saturated palettes.
@@ -186,10 +185,11 @@ def analyze_color_palette(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available'}
     
-    img_array = np.array(image.convert('RGB'))
+    features = features or ImageFeatures(image)
+    img_array = features.rgb
     
     # Check saturation distribution (3D renders often have very uniform saturation)
-    hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+    hsv = features.hsv
     saturation = hsv[:, :, 1]
     sat_std = np.std(saturation)
     sat_mean = np.mean(saturation)
@@ -209,6 +209,9 @@ def analyze_color_palette(image: Image.Image) -> Tuple[float, Dict]:
     k = 12
     
     try:
+        # Random centers come from OpenCV's per-thread RNG; reseed so the palette
+        # does not depend on which analyzer thread runs this or what it ran before
+        cv2.setRNGSeed(0)
         _, labels, centers = cv2.kmeans(pixels, k, None, criteria, 3, cv2.KMEANS_RANDOM_CENTERS)
         
         label_counts = np.bincount(labels.flatten(), minlength=k)
@@ -234,8 +237,7 @@ def analyze_color_palette(image: Image.Image) -> Tuple[float, Dict]:
         top_5_concentration = 0.0
     
     # Check for flat color regions (very important for 3D detection)
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
+    laplacian_var = features.laplacian.var()
     
     # Low laplacian variance = flat smooth colors = 3D render
     if laplacian_var < 500:
@@ -260,7 +262,7 @@ def analyze_color_palette(image: Image.Image) -> Tuple[float, Dict]:
     return final_score, details
 
 
-def detect_3d_render_characteristics(image: Image.Image) -> Tuple[float, Dict]:
+def detect_3d_render_characteristics(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[float, Dict]:
     """
     Detect specific 3D render characteristics:
     - Perfect specular highlights
@@ -271,9 +273,8 @@ def detect_3d_render_characteristics(image: Image.Image) -> Tuple[float, Dict]:
     if not CV2_AVAILABLE:
         return 0.0, {'error': 'OpenCV not available'}
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-    hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
+    features = features or ImageFeatures(image)
+    gray = features.gray
     
     score = 0.0
     indicators = []
@@ -298,9 +299,7 @@ def detect_3d_render_characteristics(image: Image.Image) -> Tuple[float, Dict]:
     
     # Check for gradient smoothness
     # Calculate gradient in small regions
-    sobel_x = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-    sobel_y = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-    gradient_mag = np.sqrt(sobel_x**2 + sobel_y**2)
+    gradient_mag = features.gradient_magnitude()
     
     # Very smooth gradients = 3D render
     gradient_mean = np.mean(gradient_mag)
@@ -312,7 +311,7 @@ def detect_3d_render_characteristics(image: Image.Image) -> Tuple[float, Dict]:
     
     # Check skin-like regions for subsurface scattering
     # 3D renders with SSS have very uniform reddish tones in skin
-    a_channel = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)[:, :, 1]
+    a_channel = features.lab[:, :, 1]
     skin_a_std = np.std(a_channel[a_channel > 128])  # Red-ish pixels
     
     if skin_a_std < 10 and np.sum(a_channel > 128) > 1000:
@@ -329,19 +328,21 @@ def detect_3d_render_characteristics(image: Image.Image) -> Tuple[float, Dict]:
     return min(score, 1.0), details
 
 
-def detect_stylization(image: Image.Image) -> StylizationResult:
+def detect_stylization(image: Image.Image, features: Optional[ImageFeatures] = None) -> StylizationResult:
     """
     Comprehensive stylization detection v2 - AGGRESSIVE.
     Determines if an image is a real photograph or stylized content.
+    Pass the request's `features` to reuse planes other analyzers computed.
     """
     indicators = []
     all_details = {}
+    features = features or ImageFeatures(image)
     
     # Run all detections
-    skin_score, skin_details = analyze_skin_texture(image)
-    edge_score, edge_details = analyze_edge_quality(image)
-    color_score, color_details = analyze_color_palette(image)
-    render3d_score, render3d_details = detect_3d_render_characteristics(image)
+    skin_score, skin_details = analyze_skin_texture(image, features)
+    edge_score, edge_details = analyze_edge_quality(image, features)
+    color_score, color_details = analyze_color_palette(image, features)
+    render3d_score, render3d_details = detect_3d_render_characteristics(image, features)
     
     all_details['skin_texture'] = skin_details
     all_details['edge_quality'] = edge_details
@@ -410,19 +411,18 @@ def detect_stylization(image: Image.Image) -> StylizationResult:
     )
 
 
-def quick_stylization_check(image: Image.Image) -> Tuple[bool, float]:
+def quick_stylization_check(image: Image.Image, features: Optional[ImageFeatures] = None) -> Tuple[bool, float]:
     """
     Quick check for stylization without full analysis.
     """
     if not CV2_AVAILABLE:
         return False, 0.0
     
-    img_array = np.array(image.convert('RGB'))
-    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+    features = features or ImageFeatures(image)
+    gray = features.gray
     
     # Quick texture check - very effective for 3D renders
-    laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-    texture_var = laplacian.var()
+    texture_var = features.laplacian.var()
     
     # Check for dark background (avatar indicator)
     dark_ratio = np.sum(gray < 20) / gray.size
@@ -68,6 +68,73 @@ def get_severity_color(score: float, as_rgba: bool = False) -> Tuple:
     return color
 
 
+# Heatmap colormap: RGBA of get_severity_color for scores quantized to 1/SEVERITY_LEVELS
+# (transparent at and below the 0.1 display threshold)
+SEVERITY_LEVELS = 1000
+_SEVERITY_LUT = np.array([
+    get_severity_color(level / SEVERITY_LEVELS, as_rgba=True) if level / SEVERITY_LEVELS > 0.1 else (0, 0, 0, 0)
+    for level in range(SEVERITY_LEVELS + 1)
+], dtype=np.uint8)
+
+# Heatmaps are blurred on a copy with at most this many pixels on the longer side
+HEATMAP_BLUR_SIZE = 640
+# Reach of the heatmap blur in pixels (31x31 kernel; 3 sigma of the PIL radius-15 fallback)
+HEATMAP_BLUR_MARGIN = 48
+
+
+def _region_gradient(heatmap_array: np.ndarray, region: ManipulationRegion) -> None:
+    """
+    Fill a region's box with its severity color, fading from full alpha at
+    the center to transparent at the edge. The alpha follows the chessboard
+    distance to the box edge - the same as drawing min(w, h) // 2 nested
+    rectangles with decreasing inset, computed in one pass.
+    """
+    x, y, w, h = region.bbox
+    steps = min(w, h) // 2
+    height, width = heatmap_array.shape[:2]
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + w, width - 1), min(y + h, height - 1)
+    if steps <= 0 or x0 > x1 or y0 > y1:
+        return
+    color = get_severity_color(region.score, as_rgba=True)
+    alpha_by_inset = (color[3] * (1 - np.arange(steps) / steps)).astype(np.uint8)
+    
+    xs, ys = np.arange(x0, x1 + 1), np.arange(y0, y1 + 1)
+    inset_x = np.minimum(np.minimum(xs - x, x + w - xs), steps - 1)
+    inset_y = np.minimum(np.minimum(ys - y, y + h - ys), steps - 1)
+    
+    box = heatmap_array[y0:y1 + 1, x0:x1 + 1]
+    box[..., :3] = color[:3]
+    box[..., 3] = alpha_by_inset[np.minimum.outer(inset_y, inset_x)]
+
+
+def _regions_window(regions: List[ManipulationRegion], width: int, height: int) -> Tuple[int, int, int, int]:
+    """(left, top, right, bottom) around all region boxes plus the blur reach, within the image."""
+    left = min(region.bbox[0] for region in regions) - HEATMAP_BLUR_MARGIN
+    top = min(region.bbox[1] for region in regions) - HEATMAP_BLUR_MARGIN
+    right = max(region.bbox[0] + region.bbox[2] for region in regions) + 1 + HEATMAP_BLUR_MARGIN
+    bottom = max(region.bbox[1] + region.bbox[3] for region in regions) + 1 + HEATMAP_BLUR_MARGIN
+    return max(left, 0), max(top, 0), min(right, width), min(bottom, height)
+
+
+def _blur_heatmap(heatmap_array: np.ndarray) -> np.ndarray:
+    """
+    31x31 Gaussian blur (sigma 5) of the RGBA heatmap. Large heatmaps are
+    blurred at HEATMAP_BLUR_SIZE with the kernel scaled down and upsampled
+    again; the heatmap is smooth, so this looks the same at a fraction of
+    the cost.
+    """
+    height, width = heatmap_array.shape[:2]
+    scale = min(1.0, HEATMAP_BLUR_SIZE / max(height, width))
+    if scale == 1.0:
+        return cv2.GaussianBlur(heatmap_array, (31, 31), 0)
+    
+    small_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    small = cv2.resize(heatmap_array, small_size, interpolation=cv2.INTER_AREA)
+    ksize = max(3, int(31 * scale) | 1)
+    small = cv2.GaussianBlur(small, (ksize, ksize), 5.0 * scale)
+    return cv2.resize(small, (width, height), interpolation=cv2.INTER_LINEAR)
+
+
 def generate_heatmap(
     image: Image.Image,
     suspicion_map: np.ndarray = None,
@@ -90,7 +157,8 @@ def generate_heatmap(
         image = image.convert('RGBA')
     
     width, height = image.size
-    heatmap = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    heatmap_array = np.zeros((height, width, 4), dtype=np.uint8)
+    window = (0, 0, width, height)
     
     if suspicion_map is not None:
         # Resize suspicion map to match image if needed
@@ -103,44 +171,29 @@ def generate_heatmap(
                 zoom_factors = (height / suspicion_map.shape[0], width / suspicion_map.shape[1])
                 suspicion_map = zoom(suspicion_map, zoom_factors)
         
-        # Create colormap (green -> yellow -> red)
-        heatmap_array = np.zeros((height, width, 4), dtype=np.uint8)
-        
-        for y in range(height):
-            for x in range(width):
-                score = suspicion_map[y, x]
-                if score > 0.1:  # Only color scores above threshold
-                    color = get_severity_color(score, as_rgba=True)
-                    heatmap_array[y, x] = color
-        
-        heatmap = Image.fromarray(heatmap_array, 'RGBA')
+        # Create colormap (green -> yellow -> red); scores at or below 0.1 stay transparent
+        levels = np.rint(np.clip(np.nan_to_num(suspicion_map), 0.0, 1.0) * SEVERITY_LEVELS).astype(np.intp)
+        heatmap_array = _SEVERITY_LUT[levels]
     
     elif regions:
-        draw = ImageDraw.Draw(heatmap)
-        
         for region in regions:
-            x, y, w, h = region.bbox
-            color = get_severity_color(region.score, as_rgba=True)
-            
-            # Create gradient fill for region
-            for i in range(min(w, h) // 2):
-                alpha = int(color[3] * (1 - i / (min(w, h) // 2)))
-                layer_color = (*color[:3], alpha)
-                draw.rectangle(
-                    [(x + i, y + i), (x + w - i, y + h - i)],
-                    fill=layer_color
-                )
+            # Later regions are drawn over earlier ones
+            _region_gradient(heatmap_array, region)
+        # Everything outside the boxes stays transparent, even after blurring
+        window = _regions_window(regions, width, height)
+    
+    left, top, right, bottom = window
+    heatmap_array = heatmap_array[top:bottom, left:right]
     
     # Blur heatmap for smoother visualization
     if CV2_AVAILABLE:
-        heatmap_np = np.array(heatmap)
-        heatmap_np = cv2.GaussianBlur(heatmap_np, (31, 31), 0)
-        heatmap = Image.fromarray(heatmap_np)
+        heatmap = Image.fromarray(_blur_heatmap(heatmap_array), 'RGBA')
     else:
-        heatmap = heatmap.filter(ImageFilter.GaussianBlur(radius=15))
+        heatmap = Image.fromarray(heatmap_array, 'RGBA').filter(ImageFilter.GaussianBlur(radius=15))
     
     # Composite with original
-    result = Image.alpha_composite(image, heatmap)
+    result = image.copy()
+    result.alpha_composite(heatmap, dest=(left, top))
     
     return result
 
@@ -90,6 +90,8 @@ interface AIServiceResponse {
         status: string;
         image_base64: string;
     }>;
+    // Key for rendering the annotated image / heatmap on the AI service
+    analysis_id?: string;
 }
 
 async function analyzeMedia(mediaUrl: string): Promise<AIAnalysisResult> {
@@ -175,6 +177,7 @@ async function analyzeMedia(mediaUrl: string): Promise<AIAnalysisResult> {
                     temporalBoost: result.temporal_boost,
                     // Debug frames for PDF report
                     debugFrames: result.debug_frames || [],
+                    analysisId: result.analysis_id,
                 },
                 processingTimeMs: result.processing_time_ms || (Date.now() - startTime),
             };
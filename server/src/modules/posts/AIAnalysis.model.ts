@@ -45,6 +45,8 @@ export interface IAnalysisDetails {
         status: string;
         image_base64: string;
     }>;
+    // AI service key for the lazily rendered annotated image / heatmap
+    analysisId?: string;
 }
 
 export interface IAdminOverride {
@@ -134,6 +136,7 @@ const aiAnalysisSchema = new Schema<IAIAnalysis>(
                 status: { type: String },
                 image_base64: { type: String },
             }],
+            analysisId: { type: String },
         },
         processingTimeMs: {
             type: Number,
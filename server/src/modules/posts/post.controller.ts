@@ -1478,6 +1478,7 @@ export const downloadPDFReport = async (
             model_version: analysis_results?.model_version ?? analysis.modelVersion,
             // Include debug frames from stored analysis for PDF report
             debug_frames: analysis.analysisDetails?.debugFrames || [],
+            analysis_id: analysis.analysisDetails?.analysisId,
         };
 
         // Get or generate report content
@@ -1660,6 +1661,7 @@ export const emailPDFReport = async (
             model_version: analysis_results?.model_version ?? analysis.modelVersion,
             // Include debug frames from stored analysis for PDF report (same as download)
             debug_frames: (analysis.analysisDetails as any)?.debugFrames || [],
+            analysis_id: (analysis.analysisDetails as any)?.analysisId,
         };
 
         // Get analyzed image URL (same logic as downloadPDFReport)